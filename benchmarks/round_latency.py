@@ -0,0 +1,314 @@
+"""
+端到端回合延迟基准测试
+在进程内驱动 create_app()，使用离线模拟的 LLM 和 TTS，测量一个回合的各项延迟
+
+测量指标（每个场景分别统计 p50 / p95 / max / mean）：
+- 回合耗时：从请求 stream-round 到收到最后一帧
+- 首个发言块延迟：从请求到第一个 speech_chunk
+- 首个音频块延迟：从请求到第一个 audio_chunk
+- 每回合 SSE 字节数
+- 事件循环延迟：监控协程按固定间隔休眠，实际唤醒时间与预期的差值
+
+结果写入 JSON 文件（默认 data/benchmarks/round_latency_<时间>.json），便于不同提交之间对比
+
+用法：
+    python benchmarks/round_latency.py                 # 1、10、100 局并发
+    python benchmarks/round_latency.py --games 1 10 --rounds 2
+    python benchmarks/round_latency.py --pacing turbo  # 不含展示停顿
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到路径
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# 使用离线模拟提供商（需在加载配置前设置，可通过环境变量覆盖）
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("TTS_PROVIDER", "fake")
+os.environ.setdefault("TTS_ENABLED", "true")
+
+import httpx
+
+from src.utils.config import get_config
+from src.web.api import create_app
+
+
+# ==================== 进程内 ASGI 调用 ====================
+
+async def stream_asgi(app, path: str, headers: Optional[Dict[str, str]] = None):
+    """
+    以流式方式请求 ASGI 应用，逐块产出 (时间戳, 数据)
+
+    httpx.ASGITransport 会等响应结束后才返回全部内容，无法测量首块延迟，
+    所以流式接口直接调用 ASGI 接口。
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body:
+                queue.put_nowait(body)
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "server": ("bench", 80),
+        "client": ("bench", 0),
+    }
+
+    async def _run():
+        try:
+            await app(scope, receive, send)
+        finally:
+            finished.set()
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(_run())
+    try:
+        while True:
+            body = await queue.get()
+            if body is None:
+                break
+            yield time.perf_counter(), body
+    finally:
+        finished.set()
+        await task
+
+
+def parse_sse_types(buffer: str):
+    """从SSE文本中解析出完整帧的类型，返回 (类型列表, 剩余文本)"""
+    types = []
+    while "\n\n" in buffer:
+        block, buffer = buffer.split("\n\n", 1)
+        for line in block.split("\n"):
+            if line.startswith("data: "):
+                try:
+                    types.append(json.loads(line[6:]).get("type"))
+                except json.JSONDecodeError:
+                    types.append(None)
+    return types, buffer
+
+
+# ==================== 事件循环延迟监控 ====================
+
+class LoopLagMonitor:
+    """按固定间隔休眠，记录实际唤醒的延迟（毫秒）"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            self.samples.append(max(0.0, lag) * 1000)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# ==================== 单局 / 场景 ====================
+
+async def play_rounds(app, client: httpx.AsyncClient, rounds: int, pacing: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """创建一局游戏并运行指定回合数，返回每回合的测量结果"""
+    response = await client.post("/api/games", json={"num_players": 6, **pacing})
+    game_id = response.json()["game_id"]
+    await client.post(f"/api/games/{game_id}/start")
+
+    results = []
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            measurement = {
+                "round_seconds": None,
+                "first_speech_chunk_seconds": None,
+                "first_audio_seconds": None,
+                "sse_bytes": 0,
+                "frames": 0,
+                "error": None,
+            }
+            buffer = ""
+            finished = False
+
+            async for timestamp, body in stream_asgi(app, f"/api/games/{game_id}/stream-round"):
+                measurement["sse_bytes"] += len(body)
+                types, buffer = parse_sse_types(buffer + body.decode("utf-8"))
+                for frame_type in types:
+                    measurement["frames"] += 1
+                    elapsed = timestamp - started
+                    if frame_type == "speech_chunk" and measurement["first_speech_chunk_seconds"] is None:
+                        measurement["first_speech_chunk_seconds"] = elapsed
+                    elif frame_type == "audio_chunk" and measurement["first_audio_seconds"] is None:
+                        measurement["first_audio_seconds"] = elapsed
+                    elif frame_type == "error":
+                        measurement["error"] = "error frame"
+                    elif frame_type == "game_end":
+                        finished = True
+
+            measurement["round_seconds"] = time.perf_counter() - started
+            results.append(measurement)
+            if finished or measurement["error"]:
+                break
+    finally:
+        await client.delete(f"/api/games/{game_id}")
+
+    return results
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Dict[str, float]]:
+    """统计 p50 / p95 / max / mean"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+
+    def percentile(p: float) -> float:
+        return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+    return {
+        "count": len(values),
+        "p50": round(percentile(0.5), 4),
+        "p95": round(percentile(0.95), 4),
+        "max": round(values[-1], 4),
+        "mean": round(statistics.fmean(values), 4),
+    }
+
+
+async def run_scenario(app, num_games: int, rounds: int, pacing: Dict[str, Any]) -> Dict[str, Any]:
+    """并发运行 num_games 局游戏"""
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        monitor.start()
+        outcomes = await asyncio.gather(
+            *(play_rounds(app, client, rounds, pacing) for _ in range(num_games)),
+            return_exceptions=True
+        )
+        await monitor.stop()
+
+    wall_seconds = time.perf_counter() - started
+    measurements = [m for outcome in outcomes if isinstance(outcome, list) for m in outcome]
+    errors = sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+    errors += sum(1 for m in measurements if m["error"])
+
+    return {
+        "games": num_games,
+        "rounds_per_game": rounds,
+        "pacing": pacing,
+        "rounds_measured": len(measurements),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "round_seconds": summarize([m["round_seconds"] for m in measurements]),
+        "first_speech_chunk_seconds": summarize([m["first_speech_chunk_seconds"] for m in measurements]),
+        "first_audio_seconds": summarize([m["first_audio_seconds"] for m in measurements]),
+        "sse_bytes_per_round": summarize([m["sse_bytes"] for m in measurements]),
+        "frames_per_round": summarize([m["frames"] for m in measurements]),
+        "loop_lag_ms": summarize(monitor.samples),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """当前提交（用于对比不同提交的结果）"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def _without_secrets(values: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉 API Key 等敏感字段"""
+    return {k: v for k, v in values.items() if "key" not in k.lower()}
+
+
+async def main(args):
+    config = get_config()
+    app = create_app()
+    pacing = {"pacing": args.pacing, "pacing_scale": args.pacing_scale}
+
+    report = {
+        "benchmark": "round_latency",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "llm_provider": config.llm_provider,
+            "llm": _without_secrets(config.get_llm_config()),
+            "tts_enabled": config.tts_enabled,
+            "tts_provider": config.tts_provider,
+            "tts": _without_secrets(config.get_tts_config()),
+        },
+        "scenarios": [],
+    }
+
+    for num_games in args.games:
+        print(f"\n⏱️  场景: {num_games} 局并发, 每局 {args.rounds} 回合, 节奏 {args.pacing}")
+        scenario = await run_scenario(app, num_games, args.rounds, pacing)
+        report["scenarios"].append(scenario)
+        print(f"   回合耗时: {scenario['round_seconds']}")
+        print(f"   首个发言块: {scenario['first_speech_chunk_seconds']}")
+        print(f"   首个音频块: {scenario['first_audio_seconds']}")
+        print(f"   事件循环延迟(ms): {scenario['loop_lag_ms']}")
+
+    output = Path(args.output) if args.output else \
+        ROOT_DIR / "data" / "benchmarks" / f"round_latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="端到端回合延迟基准测试")
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 10, 100], help="并发局数（可指定多个场景）")
+    parser.add_argument("--rounds", type=int, default=1, help="每局运行的回合数")
+    parser.add_argument("--pacing", default="live", choices=["live", "accelerated", "turbo"], help="展示节奏")
+    parser.add_argument("--pacing-scale", type=float, help="accelerated 模式的停顿缩放比例（0-1）")
+    parser.add_argument("-o", "--output", help="结果文件路径（JSON）")
+    asyncio.run(main(parser.parse_args()))
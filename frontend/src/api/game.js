@@ -30,9 +30,9 @@ export const gameAPI = {
     return api.post('/games', data)
   },
 
-  // 获取游戏列表
-  getGames() {
-    return api.get('/games')
+  // 获取游戏列表（摘要，按创建时间倒序；params: status, cursor, limit）
+  getGames(params = {}) {
+    return api.get('/games', { params })
   },
 
   // 获取游戏详情
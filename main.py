@@ -1,10 +1,18 @@
 """
-AI狼人杀 - Web服务器入口
+AI狼人杀 - 程序入口
+
+用法：
+    python main.py                 # 启动Web服务器
+    python main.py serve           # 同上
+    python main.py simulate -n 1000 --workers 8 --concurrency 16
+                                   # 无界面批量模拟，结果写入JSONL
 """
 
 import sys
 import os
+import argparse
 from pathlib import Path
+from typing import Dict
 
 # 设置标准输出编码为 UTF-8（解决 Windows GBK 编码问题）
 if sys.platform == "win32":
@@ -45,9 +53,75 @@ def run_web_server():
     )
 
 
+def parse_roles(value: str) -> Dict[str, int]:
+    """解析 --roles 参数（格式: werewolf=2,villager=2,seer=1,witch=1）"""
+    roles = {}
+    for item in value.split(","):
+        name, sep, count = item.partition("=")
+        if not sep or not count.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"无效的角色配置: {item}（格式: werewolf=2,villager=2,seer=1）")
+        roles[name.strip()] = int(count)
+    return roles
+
+
+def run_simulation(args: argparse.Namespace, parser: argparse.ArgumentParser):
+    """运行无界面批量模拟"""
+    from src.simulation import SimulationRunner, SimulationOptions
+    from src.utils.config import get_config
+    
+    config = get_config()
+    num_players = args.players or (sum(args.roles.values()) if args.roles else config.game_num_players)
+    options = SimulationOptions(
+        num_players=num_players,
+        roles=args.roles,
+        provider=args.provider,
+        max_rounds=args.max_rounds,
+        concurrency=args.concurrency,
+        vote_concurrency=config.game_vote_concurrency,
+        round_thinking=config.agent_round_thinking,
+    )
+    
+    try:
+        runner = SimulationRunner(
+            num_games=args.games,
+            workers=args.workers,
+            output=args.output,
+            options=options
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    runner.run()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="AI狼人杀")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    subparsers.add_parser("serve", help="启动Web服务器（默认）")
+    
+    simulate = subparsers.add_parser("simulate", help="无界面批量模拟对局")
+    simulate.add_argument("-n", "--games", type=int, default=100, help="对局总数")
+    simulate.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+    simulate.add_argument("--concurrency", type=int, default=8, help="每个进程同时运行的对局数")
+    simulate.add_argument("--players", type=int, default=None, help="每局玩家数（默认使用配置；与配置的角色人数不同时按人数生成默认角色）")
+    simulate.add_argument("--roles", type=parse_roles, default=None, help="角色配置，如 werewolf=2,villager=2,seer=1,witch=1（默认使用配置）")
+    simulate.add_argument("--provider", type=str, default=None, help="LLM提供商（默认使用配置）")
+    simulate.add_argument("--max-rounds", type=int, default=10, help="每局最大回合数")
+    simulate.add_argument("-o", "--output", type=str, default=None, help="结果文件（JSONL）")
+    
+    return parser
+
+
 def main():
     """主函数"""
-    run_web_server()
+    parser = build_parser()
+    args = parser.parse_args()
+    
+    if args.command == "simulate":
+        run_simulation(args, parser)
+    else:
+        run_web_server()
 
 
 if __name__ == "__main__":
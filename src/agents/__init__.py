@@ -5,10 +5,18 @@ AI Agent模块
 from .base_agent import BaseAgent
 from .langchain_agent import LangChainAgent
 from .agent_factory import AgentFactory
+from .voting import collect_votes
+from .thinking import start_round_thinking, cancel_round_thinking
+from .history import ConversationHistory, start_history_summaries
 
 __all__ = [
     'BaseAgent',
     'LangChainAgent',
     'AgentFactory',
+    'collect_votes',
+    'start_round_thinking',
+    'cancel_round_thinking',
+    'ConversationHistory',
+    'start_history_summaries',
 ]
 
@@ -7,9 +7,14 @@ Agent工厂
 - DashScope (通义千问)
 - ModelScope (免费推理服务)
 - Anthropic (Claude系列)
+- Fake (离线模拟，用于测试和压测)
 """
 
-from typing import Optional, List
+import json
+import threading
+from typing import Any, Dict, Optional, List, Tuple
+
+import httpx
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
@@ -18,17 +23,37 @@ from .langchain_agent import LangChainAgent
 from src.core.models import Player
 from src.utils.config import get_config
 
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持需要 h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+SUPPORTED_PROVIDERS = ("openai", "dashscope", "modelscope", "anthropic", "fake")
+
+# 连接池中的LLM实例的键：(provider, 合并后的全部配置参数的规范化JSON)
+PoolKey = Tuple[str, str]
+
 
 class LLMFactory:
     """LLM工厂类 - 用于创建不同提供商的LLM实例"""
     
+    # 共享的LLM实例（相同配置的游戏共用）
+    _pool: Dict[PoolKey, BaseChatModel] = {}
+    # 共享的HTTP客户端（按 base_url，保持长连接）
+    _http_clients: Dict[Optional[str], Tuple[httpx.Client, httpx.AsyncClient]] = {}
+    # 共享的游戏LLM（经过调度器、可选路由；所属游戏取自调用上下文，所有游戏共用同一实例和已编译的链）
+    _game_llms: Dict[Tuple, BaseChatModel] = {}
+    _pool_lock = threading.Lock()
+    _pool_hits = 0
+    
     @staticmethod
     def create_llm(provider: Optional[str] = None, **kwargs) -> BaseChatModel:
         """
         创建LLM实例
         
         Args:
-            provider: LLM提供商（openai, dashscope, modelscope, anthropic）
+            provider: LLM提供商（openai, dashscope, modelscope, anthropic, fake）
                      如果为None，使用配置文件中的默认提供商
             **kwargs: 额外的LLM参数（会覆盖配置文件中的参数）
         
@@ -38,33 +63,194 @@ class LLMFactory:
         Raises:
             ValueError: 如果提供商不支持或配置无效
         """
+        provider, llm_config = LLMFactory._resolve_config(provider, kwargs)
+        return LLMFactory._create(provider, llm_config)
+    
+    @staticmethod
+    def get_llm(provider: Optional[str] = None, **kwargs) -> BaseChatModel:
+        """
+        获取共享的LLM实例
+        
+        合并后配置完全相同（含 api_key、timeout 等全部参数）的调用返回同一个实例，
+        OpenAI 兼容接口共用按 base_url 划分的 HTTP 连接池（长连接，安装 h2 时使用 HTTP/2），
+        避免每局游戏重新建立连接和 TLS 握手。
+        
+        Args:
+            provider: LLM提供商（None 表示默认提供商）
+            **kwargs: 额外的LLM参数（值为 None 或空字符串的参数会被忽略）
+        
+        Returns:
+            LangChain BaseChatModel 实例
+        
+        Raises:
+            ValueError: 如果提供商不支持或配置无效
+        """
+        provider, llm_config = LLMFactory._resolve_config(provider, kwargs)
+        key: PoolKey = (provider, json.dumps(llm_config, sort_keys=True, default=str))
+        
+        with LLMFactory._pool_lock:
+            llm = LLMFactory._pool.get(key)
+            if llm is not None:
+                LLMFactory._pool_hits += 1
+                return llm
+            
+            llm = LLMFactory._create(provider, llm_config, shared_http=True)
+            LLMFactory._pool[key] = llm
+            return llm
+    
+    @staticmethod
+    def get_game_llm(provider: Optional[str] = None, model: Optional[str] = None) -> BaseChatModel:
+        """
+        获取游戏使用的共享LLM
+        
+        - 调用经过进程级调度器（按提供商限流、各局游戏公平轮转）
+        - 启用多提供商路由且游戏未指定模型时，在 llm.routing.backends 之间按延迟和错误率路由，
+          游戏选择的提供商在统计相同时优先
+        - 相同 (provider, model) 的游戏共用同一个实例；调用所属的游戏由 game_context 设置
+        
+        Args:
+            provider: 游戏选择的提供商（None 表示默认提供商）
+            model: 游戏指定的模型（指定时不路由）
+        
+        Returns:
+            LangChain BaseChatModel 实例
+        """
+        from .scheduled_llm import ScheduledChatModel
+        
+        provider = provider or get_config().llm_provider
+        routed = bool(get_config().llm_routing.get("enabled")) and not model
+        key = (provider, model, routed)
+        
+        with LLMFactory._pool_lock:
+            llm = LLMFactory._game_llms.get(key)
+        if llm is not None:
+            return llm
+        
+        if routed:
+            llm = LLMFactory.create_routed_llm(preferred=provider)
+        else:
+            llm = ScheduledChatModel(llm=LLMFactory.get_llm(provider, model=model), provider=provider)
+        
+        with LLMFactory._pool_lock:
+            return LLMFactory._game_llms.setdefault(key, llm)
+    
+    @staticmethod
+    def create_routed_llm(
+        backends: Optional[List[Any]] = None,
+        preferred: Optional[str] = None
+    ) -> BaseChatModel:
+        """
+        创建多提供商路由LLM（各后端经过调度器，所属游戏取自调用上下文）
+        
+        Args:
+            backends: 后端列表，元素为提供商名称，或 {"provider": ..., "model": ..., "name": ..., 其他覆盖参数}；
+                      为None时使用 llm.routing.backends
+            preferred: 统计相同时优先的提供商
+        
+        Returns:
+            RoutedChatModel 实例（只有一个可用后端时直接返回该后端）
+        
+        Raises:
+            ValueError: 如果没有可用的后端
+        """
+        from .routed_llm import RoutedChatModel
+        from .scheduled_llm import ScheduledChatModel
+        
+        routing = get_config().llm_routing
+        specs = [spec if isinstance(spec, dict) else {"provider": spec} for spec in (backends or routing.get("backends") or [])]
+        if preferred:
+            specs.sort(key=lambda spec: spec["provider"] != preferred)
+        
+        models: List[BaseChatModel] = []
+        names: List[str] = []
+        for spec in specs:
+            overrides = {key: value for key, value in spec.items() if key not in ("provider", "name")}
+            try:
+                llm = LLMFactory.get_llm(spec["provider"], **overrides)
+            except (ValueError, ImportError) as e:
+                print(f"⚠️ 跳过路由后端 {spec['provider']}: {e}")
+                continue
+            model_name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+            models.append(ScheduledChatModel(llm=llm, provider=spec["provider"]))
+            names.append(spec.get("name") or f"{spec['provider']}/{model_name}")
+        
+        if not models:
+            raise ValueError("多提供商路由没有可用的后端（检查 llm.routing.backends 和各提供商的 API Key）")
+        if len(models) == 1:
+            return models[0]
+        
+        params = {key: routing[key] for key in (
+            "hedge", "hedge_percentile", "hedge_min_delay", "hedge_default_delay",
+            "max_error_rate", "explore_rate", "ewma_alpha"
+        ) if routing.get(key) is not None}
+        
+        return RoutedChatModel(backends=models, backend_names=names, **params)
+    
+    @staticmethod
+    def pool_stats() -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        return {
+            "llm_instances": len(LLMFactory._pool),
+            "game_llms": len(LLMFactory._game_llms),
+            "http_clients": len(LLMFactory._http_clients),
+            "http2": HTTP2_AVAILABLE,
+            "hits": LLMFactory._pool_hits,
+        }
+    
+    @staticmethod
+    async def aclose_pool():
+        """关闭共享的HTTP客户端并清空连接池"""
+        with LLMFactory._pool_lock:
+            clients = list(LLMFactory._http_clients.values())
+            LLMFactory._http_clients.clear()
+            LLMFactory._pool.clear()
+            LLMFactory._game_llms.clear()
+        
+        for client, async_client in clients:
+            client.close()
+            await async_client.aclose()
+    
+    @staticmethod
+    def _resolve_config(provider: Optional[str], kwargs: Dict[str, Any]) -> Tuple[str, dict]:
+        """合并配置文件和调用参数"""
         config = get_config()
         provider = provider or config.llm_provider
         
+        if provider not in SUPPORTED_PROVIDERS:
+            raise ValueError(f"不支持的LLM提供商: {provider}")
+        
         # 获取提供商配置
         llm_config = config.get_llm_config(provider)
         
         # 合并用户提供的参数
-        llm_config.update(kwargs)
+        llm_config.update({key: value for key, value in kwargs.items() if value not in (None, "")})
         
-        # 根据提供商创建LLM
+        return provider, llm_config
+    
+    @staticmethod
+    def _create(provider: str, llm_config: dict, shared_http: bool = False) -> BaseChatModel:
+        """根据提供商创建LLM"""
         if provider in ["openai", "dashscope", "modelscope"]:
-            return LLMFactory._create_openai_compatible_llm(llm_config)
+            return LLMFactory._create_openai_compatible_llm(llm_config, shared_http)
         
         elif provider == "anthropic":
             return LLMFactory._create_anthropic_llm(llm_config)
         
+        elif provider == "fake":
+            return LLMFactory._create_fake_llm(llm_config)
+        
         else:
             raise ValueError(f"不支持的LLM提供商: {provider}")
     
     @staticmethod
-    def _create_openai_compatible_llm(config: dict) -> ChatOpenAI:
+    def _create_openai_compatible_llm(config: dict, shared_http: bool = False) -> ChatOpenAI:
         """
         创建OpenAI兼容的LLM实例
         支持: OpenAI, DashScope, ModelScope
         
         Args:
             config: LLM配置
+            shared_http: 是否使用共享的HTTP客户端
         
         Returns:
             ChatOpenAI 实例
@@ -93,10 +279,32 @@ class LLMFactory:
         if config.get("streaming"):
             llm_params["streaming"] = True
         
+        # 流式输出最后一块附带用量（含提示词缓存命中），自定义 base_url 需提供商支持 stream_options
+        if config.get("stream_usage") is not None:
+            llm_params["stream_usage"] = config["stream_usage"]
+        
+        # 共享的HTTP客户端只提供连接池；超时由上面的 timeout 逐个请求设置，各模型互不影响
+        if shared_http:
+            llm_params["http_client"], llm_params["http_async_client"] = \
+                LLMFactory._get_http_clients(config.get("base_url"))
+        
         print(f"✅ 创建LLM实例: {config.get('provider')} - {config['model']}")
         
         return ChatOpenAI(**llm_params)
     
+    @staticmethod
+    def _get_http_clients(base_url: Optional[str]) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        """获取（或创建）某个 base_url 的共享HTTP客户端（调用方持有 _pool_lock；不设超时，由调用方逐请求指定）"""
+        clients = LLMFactory._http_clients.get(base_url)
+        if clients is None:
+            limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+            clients = (
+                httpx.Client(http2=HTTP2_AVAILABLE, limits=limits),
+                httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits),
+            )
+            LLMFactory._http_clients[base_url] = clients
+        return clients
+    
     @staticmethod
     def _create_anthropic_llm(config: dict) -> BaseChatModel:
         """
@@ -135,6 +343,36 @@ class LLMFactory:
         return ChatAnthropic(**llm_params)
 
 
+    @staticmethod
+    def _create_fake_llm(config: dict) -> BaseChatModel:
+        """
+        创建离线模拟LLM实例（不访问网络）
+        
+        Args:
+            config: LLM配置
+        
+        Returns:
+            FakeChatModel 实例
+        """
+        from .fake_llm import FakeChatModel
+        
+        llm_params = {
+            "model_name": config.get("model", "fake-werewolf"),
+            "max_tokens": config.get("max_tokens"),
+        }
+        
+        for key in (
+            "responses", "seed", "time_to_first_token", "time_to_first_token_jitter",
+            "slow_rate", "slow_factor", "tokens_per_second", "error_rate"
+        ):
+            if config.get(key) is not None:
+                llm_params[key] = config[key]
+        
+        print(f"✅ 创建LLM实例: Fake - {llm_params['model_name']}")
+        
+        return FakeChatModel(**llm_params)
+
+
 class AgentFactory:
     """Agent工厂类 - 用于创建不同类型的Agent"""
     
@@ -3,8 +3,9 @@ Agent基类
 定义Agent的接口和基础功能
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from src.core.models import Player, AgentMemory, GameState
 
@@ -15,6 +16,9 @@ class BaseAgent(ABC):
     def __init__(self, player: Player):
         self.player = player
         self.memory = AgentMemory(player_id=player.id)
+        
+        # 回合开始时在后台进行的思考：(回合, 任务)
+        self.thinking: Optional[Tuple[int, asyncio.Task]] = None
     
     @abstractmethod
     def think(self, game_state: GameState) -> str:
@@ -31,6 +35,36 @@ class BaseAgent(ABC):
         """投票"""
         pass
     
+    async def athink(self, game_state: GameState) -> str:
+        """异步思考（默认在线程池中执行同步思考，子类可覆盖为原生异步实现）"""
+        return await asyncio.to_thread(self.think, game_state)
+    
+    def start_thinking(self, game_state: GameState) -> Optional[asyncio.Task]:
+        """
+        在后台开始本轮的思考（上一轮未完成的思考会被取消）
+        
+        Returns:
+            思考任务（不需要思考时返回None）
+        """
+        if self.thinking is not None and not self.thinking[1].done():
+            self.thinking[1].cancel()
+        task = asyncio.ensure_future(self.athink(game_state))
+        self.thinking = (game_state.round, task)
+        return task
+    
+    def start_summarizing(self) -> Optional[asyncio.Task]:
+        """
+        在后台整理对话历史（回合之间调用）
+        
+        Returns:
+            摘要任务（没有需要整理的历史时返回None）
+        """
+        return None
+    
+    async def avote(self, game_state: GameState) -> int:
+        """异步投票（默认在线程池中执行同步投票，子类可覆盖为原生异步实现）"""
+        return await asyncio.to_thread(self.vote, game_state)
+    
     def use_skill(self, game_state: GameState) -> Optional[Dict]:
         """使用技能（特殊角色）"""
         return None
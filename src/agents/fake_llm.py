@@ -0,0 +1,270 @@
+"""
+离线模拟LLM
+不访问网络、不产生费用的 BaseChatModel 实现，用于压测和复现延迟问题
+
+- 支持 invoke / ainvoke / stream / astream
+- 发言：按脚本循环返回，或用带种子的随机数从内置台词中生成
+- 投票：从提示词中的存活玩家列表里选出一个合法编号
+- 回合模式：按 【思考】【投票】【发言】 格式同时输出思考、预投票和发言
+- 对话摘要：返回一段简短的摘要
+- 可配置首token延迟（含抖动和慢请求尾部）、输出速度和错误率
+- 返回 usage_metadata，并模拟提供商的提示词前缀缓存（与近期请求相同的前缀计为缓存命中）
+"""
+
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.messages.ai import UsageMetadata, add_usage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+# 内置台词（{target} 会被替换为随机的玩家编号）
+FAKE_SPEECHES = [
+    "我觉得{target}号的发言有些问题，逻辑前后不太一致。大家可以多关注一下。",
+    "我是好人，这一轮我没有太多信息。先听听后面几位怎么说。",
+    "{target}号刚才一直在带节奏，我怀疑他是狼。今天我会投他。",
+    "目前场上信息太少了，我建议大家先不要乱投票。重点看一下{target}号。",
+    "我站边前面的判断，{target}号的状态很像狼人。希望好人团结起来。",
+]
+
+FAKE_THOUGHTS = [
+    "从发言来看，{target}号的立场比较可疑，需要继续观察。",
+    "场上暂时没有明确的信息，我应该保持低调，先听其他人的发言。",
+]
+
+FAKE_SUMMARIES = [
+    "前几轮我一直在观察，{target}号的发言前后矛盾，我投过他一票。",
+    "之前的讨论没有明确结论，我对{target}号保持怀疑。",
+]
+
+# 投票提示词中的存活玩家列表
+_ALIVE_PLAYERS_PATTERN = re.compile(r"存活的玩家ID：([\d,\s]+)")
+
+# 回合模式提示词中的可投票玩家列表
+_TURN_CANDIDATES_PATTERN = re.compile(r"可投票的玩家ID：([\d,\s]+)")
+
+# 游戏状态中列出的玩家编号（"  - 3号 玩家3"）
+_PLAYER_LINE_PATTERN = re.compile(r"-\s*(\d+)号")
+
+# 分词：连续的字母数字、连续空白、其余单个字符各算一个token
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+|\s+|.", re.S)
+
+
+class FakeSimulatedError(RuntimeError):
+    """模拟的上游错误（如 429 限流）"""
+
+
+class FakeChatModel(BaseChatModel):
+    """离线模拟LLM"""
+
+    model_name: str = "fake-werewolf"
+    responses: Optional[List[str]] = None     # 脚本化发言（循环使用），为空时随机生成
+    seed: Optional[int] = None                # 随机种子（None 表示不固定）
+    time_to_first_token: float = 0.3          # 首token平均延迟（秒）
+    time_to_first_token_jitter: float = 0.1   # 首token延迟标准差（秒）
+    slow_rate: float = 0.0                    # 慢请求比例（0-1）
+    slow_factor: float = 5.0                  # 慢请求的首token延迟倍数
+    tokens_per_second: float = 40.0           # 输出速度（0 表示不限速）
+    error_rate: float = 0.0                   # 错误率（0-1）
+    max_tokens: Optional[int] = None
+    prefix_cache: bool = True                 # 是否模拟提示词前缀缓存
+    cache_block_tokens: int = 64              # 缓存命中按块计算（不足一块的部分不计）
+    cache_recent_prompts: int = 64            # 参与前缀匹配的近期请求数
+
+    _rng: Optional[random.Random] = PrivateAttr(default=None)
+    _script_index: int = PrivateAttr(default=0)
+    _recent_prompts: Optional[Deque[str]] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-werewolf"
+
+    # ==================== 内容生成 ====================
+
+    def _get_rng(self) -> random.Random:
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
+
+    def _build_reply(self, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> str:
+        """根据提示词生成回复文本"""
+        rng = self._get_rng()
+        prompt = str(messages[-1].content) if messages else ""
+
+        alive = _ALIVE_PLAYERS_PATTERN.search(prompt)
+        turn = _TURN_CANDIDATES_PATTERN.search(prompt)
+        if turn:
+            # 回合模式：思考 + 预投票 + 发言
+            candidates = [int(x) for x in re.findall(r"\d+", turn.group(1))] or [1]
+            target = rng.choice(candidates)
+            thought = rng.choice(FAKE_THOUGHTS).format(target=target)
+            speech = rng.choice(FAKE_SPEECHES).format(target=target)
+            text = f"【思考】{thought}\n【投票】{target}\n【发言】{speech}"
+        elif alive:
+            # 投票：只回复一个存活玩家编号
+            candidates = [int(x) for x in re.findall(r"\d+", alive.group(1))]
+            text = str(rng.choice(candidates)) if candidates else "1"
+        elif self.responses:
+            text = self.responses[self._script_index % len(self.responses)]
+            self._script_index += 1
+        else:
+            if "分析当前局势" in prompt:
+                templates = FAKE_THOUGHTS
+            elif "对话摘要" in prompt:
+                templates = FAKE_SUMMARIES
+            else:
+                templates = FAKE_SPEECHES
+            players = [int(x) for x in _PLAYER_LINE_PATTERN.findall(prompt)]
+            target = rng.choice(players) if players else rng.randint(1, 9)
+            text = rng.choice(templates).format(target=target)
+
+        for stop_sequence in stop or []:
+            index = text.find(stop_sequence)
+            if index >= 0:
+                text = text[:index]
+
+        tokens = _TOKEN_PATTERN.findall(text)
+        max_tokens = kwargs.get("max_tokens") or self.max_tokens
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        return "".join(tokens)
+
+    def _input_usage(self, messages: List[BaseMessage]) -> UsageMetadata:
+        """输入用量：与近期请求的最长公共前缀按块计为缓存命中"""
+        prompt = "\n".join(f"{message.type}: {message.content}" for message in messages)
+        input_tokens = len(_TOKEN_PATTERN.findall(prompt))
+
+        cached = 0
+        if self.prefix_cache:
+            if self._recent_prompts is None:
+                self._recent_prompts = deque(maxlen=self.cache_recent_prompts)
+            longest = max((_common_prefix_length(prompt, recent) for recent in self._recent_prompts), default=0)
+            cached = len(_TOKEN_PATTERN.findall(prompt[:longest]))
+            cached -= cached % self.cache_block_tokens
+            self._recent_prompts.append(prompt)
+
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": 0,
+            "total_tokens": input_tokens,
+            "input_token_details": {"cache_read": cached},
+        }
+
+    def _sample_first_token_delay(self) -> float:
+        """采样首token延迟"""
+        rng = self._get_rng()
+        delay = max(0.0, rng.gauss(self.time_to_first_token, self.time_to_first_token_jitter))
+        if self.slow_rate and rng.random() < self.slow_rate:
+            delay *= self.slow_factor
+        return delay
+
+    def _maybe_fail(self):
+        """按错误率抛出模拟错误"""
+        if self.error_rate and self._get_rng().random() < self.error_rate:
+            raise FakeSimulatedError("429 Too Many Requests (simulated by fake provider)")
+
+    def _token_interval(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    # ==================== BaseChatModel 接口 ====================
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, usage = "", None
+        for chunk in self._stream(messages, stop, run_manager, **kwargs):
+            text += chunk.text
+            usage = add_usage(usage, chunk.message.usage_metadata)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, usage = "", None
+        async for chunk in self._astream(messages, stop, run_manager, **kwargs):
+            text += chunk.text
+            usage = add_usage(usage, chunk.message.usage_metadata)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._sample_first_token_delay())
+        self._maybe_fail()
+
+        interval = self._token_interval()
+        tokens = _TOKEN_PATTERN.findall(self._build_reply(messages, stop, **kwargs))
+        for index, token in enumerate(tokens):
+            if index and interval:
+                time.sleep(interval)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=token, usage_metadata=_chunk_usage(self, messages, index, len(tokens))
+            ))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._sample_first_token_delay())
+        self._maybe_fail()
+
+        interval = self._token_interval()
+        tokens = _TOKEN_PATTERN.findall(self._build_reply(messages, stop, **kwargs))
+        for index, token in enumerate(tokens):
+            if index and interval:
+                await asyncio.sleep(interval)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=token, usage_metadata=_chunk_usage(self, messages, index, len(tokens))
+            ))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def _chunk_usage(model: FakeChatModel, messages: List[BaseMessage], index: int, count: int) -> Optional[UsageMetadata]:
+    """
+    流式输出中各块附带的用量：首块带输入用量，末块带输出用量（与 Anthropic 流式接口相同），
+    调用方提前停止时输入用量也已计入
+    """
+    usage = model._input_usage(messages) if index == 0 else None
+    if index == count - 1:
+        usage = add_usage(usage, {"input_tokens": 0, "output_tokens": count, "total_tokens": count})
+    return usage
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """两个字符串的公共前缀长度"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,176 @@
+"""
+按token预算管理的对话历史
+每次调用都会把对话历史放进提示词，历史无限增长时提示词长度（以及延迟和费用）随回合数线性增加。
+
+- 最近 K 轮对话原样保留，总长度不超过 token 预算
+- 更早的对话移入待摘要队列，在并入摘要之前仍然原样放进提示词
+- 回合之间在后台（后台优先级）把待摘要的对话与已有摘要合并成新的摘要并缓存，
+  新摘要保存后才移除这些对话（摘要失败时留到下一次，但超出token预算的最早对话会被丢弃），
+  之后每次调用只附带这份摘要，
+  提示词长度在长对局中保持稳定
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+
+from .base_agent import BaseAgent
+from src.utils.rate_limiter import PRIORITY_BACKGROUND, scheduling_priority
+
+# 预估token数时假设的每token字符数（中英文混合的粗略值）
+_CHARS_PER_TOKEN = 2
+
+# 摘要占 token 预算的比例
+_SUMMARY_SHARE = 0.3
+
+
+def _estimate_tokens(messages: List[BaseMessage]) -> int:
+    """粗略预估消息的token数"""
+    return sum(len(str(message.content)) for message in messages) // _CHARS_PER_TOKEN
+
+
+class ConversationHistory:
+    """按token预算管理的对话历史（接口与 ChatMessageHistory 兼容）"""
+
+    def __init__(self, max_tokens: int = 1500, keep_turns: int = 6):
+        """
+        初始化对话历史
+
+        Args:
+            max_tokens: 放进提示词的历史（摘要 + 最近对话）的token预算
+            keep_turns: 原样保留的最近对话轮数（一问一答为一轮）
+        """
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summary = ""
+
+        self._turns: Deque[List[BaseMessage]] = deque()
+        self._pending: List[List[BaseMessage]] = []
+        self._all: List[BaseMessage] = []
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """放进提示词的历史：摘要 + 尚未并入摘要的对话 + 最近对话"""
+        messages: List[BaseMessage] = []
+        if self.summary:
+            messages.append(HumanMessage(content=f"【之前的对话摘要】\n{self.summary}"))
+        for turn in self._pending:
+            messages.extend(turn)
+        for turn in self._turns:
+            messages.extend(turn)
+        return messages
+
+    @property
+    def all_messages(self) -> List[BaseMessage]:
+        """完整的对话记录（用于导出，不放进提示词）"""
+        return list(self._all)
+
+    @property
+    def needs_summary(self) -> bool:
+        """是否有尚未并入摘要的对话"""
+        return bool(self._pending)
+
+    @property
+    def summary_max_chars(self) -> int:
+        """摘要的最大字数"""
+        return int(self.max_tokens * _SUMMARY_SHARE) * _CHARS_PER_TOKEN
+
+    def add_user_message(self, content: str):
+        """添加用户消息（开始新的一轮）"""
+        message = HumanMessage(content=content)
+        self._all.append(message)
+        self._turns.append([message])
+        self._fold()
+
+    def add_ai_message(self, content: str):
+        """添加AI消息（结束当前一轮）"""
+        message = AIMessage(content=content)
+        self._all.append(message)
+        if self._turns:
+            self._turns[-1].append(message)
+        else:
+            self._turns.append([message])
+        self._fold()
+
+    def clear(self):
+        """清除全部历史和摘要"""
+        self.summary = ""
+        self._turns.clear()
+        self._pending.clear()
+        self._all.clear()
+
+    def _fold(self):
+        """超过轮数或token预算时，把最早的对话移入待摘要队列（至少保留最近一轮；并入摘要前仍在提示词中）"""
+        budget = self.max_tokens - self.summary_max_chars // _CHARS_PER_TOKEN
+        while len(self._turns) > 1 and (
+            len(self._turns) > self.keep_turns
+            or _estimate_tokens([m for turn in self._turns for m in turn]) > budget
+        ):
+            self._pending.append(self._turns.popleft())
+
+    def _trim_pending(self):
+        """丢弃最早的待摘要对话，直到放进提示词的历史不超过token预算"""
+        while self._pending and _estimate_tokens(self.messages) > self.max_tokens:
+            self._pending.pop(0)
+
+    async def summarize(self, chain: Runnable, player_name: str, role: str) -> str:
+        """
+        把待摘要的对话并入摘要
+
+        Args:
+            chain: 摘要链（输入 prompts.SUMMARY_PROMPT 的变量，输出文本）
+            player_name: 玩家名称
+            role: 角色名称
+
+        Returns:
+            新的摘要
+        """
+        pending = list(self._pending)
+        if not pending:
+            return self.summary
+
+        conversation = "\n".join(
+            f"{'我' if message.type == 'ai' else '提示'}：{message.content}"
+            for turn in pending for message in turn
+        )
+        try:
+            summary = await chain.ainvoke({
+                "player_name": player_name,
+                "role": role,
+                "summary": self.summary or "（无）",
+                "conversation": conversation,
+                "max_chars": self.summary_max_chars,
+            })
+        except Exception:
+            # 摘要连续失败时待摘要的对话不能无限增长
+            self._trim_pending()
+            raise
+
+        # 新摘要保存后才移除已摘要的对话；摘要期间新移入的对话留到下一次
+        self.summary = summary.strip()[:self.summary_max_chars]
+        del self._pending[:len(pending)]
+        return self.summary
+
+
+def start_history_summaries(agents: List[BaseAgent]) -> List[asyncio.Task]:
+    """
+    回合结束后在后台为所有Agent更新对话摘要（不等待完成）
+
+    Args:
+        agents: Agent列表
+
+    Returns:
+        摘要任务列表
+    """
+    tasks = []
+    with scheduling_priority(PRIORITY_BACKGROUND):
+        for agent in agents:
+            if not agent.player.is_alive:
+                continue
+            task = agent.start_summarizing()
+            if task is not None:
+                tasks.append(task)
+    return tasks
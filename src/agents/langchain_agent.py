@@ -3,17 +3,30 @@
 采用LangChain标准模式和最佳实践
 """
 
+import asyncio
 import re
-from typing import Dict, Optional, AsyncGenerator, List
+from collections import Counter
+from typing import Dict, Optional, AsyncGenerator, List, Tuple
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.runnables import RunnablePassthrough, RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
 
 from .base_agent import BaseAgent
+from .history import ConversationHistory
+from .prompts import get_chain
 from src.core.models import Player, GameState, Role
+from src.utils.config import get_config
+from src.utils.sentence_splitter import find_sentence_end
+
+# 每种动作使用独立的生成参数（max_tokens, temperature, stop）
+AGENT_ACTIONS = ("think", "speak", "vote", "turn", "summary")
+
+# 回合模式输出的分段标记 -> 分段名称
+TURN_SECTIONS = {"思考": "reasoning", "投票": "vote", "发言": "speech"}
+
+# 分段标记的最大长度（"【" 之后超过该长度仍未闭合，视为普通文本）
+_MAX_MARKER_LEN = 6
+
+# 发言中提到的玩家编号
+_MENTION_PATTERN = re.compile(r"(\d+)号")
 
 
 class LangChainAgent(BaseAgent):
@@ -21,13 +34,23 @@ class LangChainAgent(BaseAgent):
     LangChain AI Agent
     
     采用LangChain标准模式：
-    - 使用 ChatPromptTemplate 管理提示词
+    - 使用 ChatPromptTemplate 管理提示词（模板和链在所有Agent之间共用，见 prompts.py）
     - 使用 MessageHistory 管理对话历史
     - 使用 LCEL (LangChain Expression Language) 构建链
     - 支持流式输出
+    - 思考、发言、投票各自使用独立的生成参数（通过 llm.bind 绑定）
+    - 回合模式：一次调用同时生成私下思考、预投票和公开发言，
+      投票阶段只有后续发言改变了局势才重新调用LLM
     """
     
-    def __init__(self, player: Player, llm: BaseChatModel, enable_memory: bool = True):
+    def __init__(
+        self,
+        player: Player,
+        llm: BaseChatModel,
+        enable_memory: bool = True,
+        profiles: Optional[Dict[str, Dict]] = None,
+        turn_mode: Optional[bool] = None
+    ):
         """
         初始化 LangChain Agent
         
@@ -35,131 +58,68 @@ class LangChainAgent(BaseAgent):
             player: 玩家对象
             llm: LangChain LLM 实例
             enable_memory: 是否启用对话记忆
+            profiles: 各动作的生成参数（覆盖配置文件 agent.profiles）
+            turn_mode: 是否启用回合模式（None 表示使用配置文件 agent.turn_mode）
         """
         super().__init__(player)
         self.llm = llm
         self.enable_memory = enable_memory
         
-        # 初始化消息历史
-        self.message_history = ChatMessageHistory()
+        config = get_config()
+        self.profiles = {action: config.get_agent_profile(action) for action in AGENT_ACTIONS}
+        for action, profile in (profiles or {}).items():
+            self.profiles.setdefault(action, {}).update(profile)
+        
+        self.turn_mode = config.agent_turn_mode if turn_mode is None else turn_mode
         
-        # 设置提示词模板
-        self._setup_prompts()
+        # 回合模式的预投票：(回合, 玩家ID)
+        self.provisional_vote: Optional[Tuple[int, int]] = None
+        
+        # 初始化消息历史（最近几轮原样保留，更早的在回合之间合并为摘要）
+        self.message_history = ConversationHistory(**config.agent_history)
+        self.summarizing: Optional[asyncio.Task] = None
+        
+        # 提示词中的玩家信息（位于共用的游戏规则之后）
+        self._player_inputs = {
+            "player_id": player.id,
+            "player_name": player.name,
+            "role_name": player.role_name_cn,
+            "role_description": player.role_description,
+        }
         
         # 设置链
         self._setup_chains()
     
-    def _setup_prompts(self):
-        """设置提示词模板"""
-        
-        # 系统提示词
-        self.system_message = f"""你是一名狼人杀游戏玩家。
-
-【你的信息】
-玩家编号：{self.player.id}
-玩家名称：{self.player.name}
-你的角色：{self.player.role_name_cn}
-角色说明：{self.player.role_description}
-
-【游戏规则】
-1. 狼人的目标是消灭所有好人
-2. 好人的目标是找出并投票淘汰所有狼人
-3. 白天所有人发言和投票
-4. 你需要根据角色特点进行策略性发言
-5. 不要直接透露你的真实身份（除非策略需要）
-
-【你的策略】
-- 如果你是狼人：隐藏身份，误导好人，保护队友
-- 如果你是预言家：谨慎透露身份，引导投票方向
-- 如果你是女巫：合理使用解药和毒药
-- 如果你是猎人：威慑狼人，关键时刻发挥作用
-- 如果你是村民：通过逻辑推理，找出可疑玩家
-
-请保持角色扮演，根据当前局势做出合理的推理和决策。"""
-        
-        # 思考提示模板
-        self.think_prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_message),
-            MessagesPlaceholder(variable_name="history", optional=True),
-            ("human", """当前游戏状态：
-{game_state}
-
-最近发生的事件：
-{recent_events}
-
-你的记忆：
-{memory_summary}
-
-请分析当前局势，思考你的策略。""")
-        ])
-        
-        # 发言提示模板
-        self.speak_prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_message),
-            MessagesPlaceholder(variable_name="history", optional=True),
-            ("human", """当前游戏状态：
-{game_state}
-
-最近发生的事件：
-{recent_events}
-
-你的记忆：
-{memory_summary}
-
-请基于当前局势，发表一段简短的发言（2-3句话）。
-注意：
-1. 要符合你的角色身份，进行策略性发言
-2. 语言要简洁、自然、口语化
-3. 不要透露过多信息，保持神秘感""")
-        ])
-        
-        # 投票提示模板
-        self.vote_prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_message),
-            MessagesPlaceholder(variable_name="history", optional=True),
-            ("human", """当前游戏状态：
-{game_state}
-
-最近发生的事件：
-{recent_events}
-
-你的记忆：
-{memory_summary}
-
-存活的玩家ID：{alive_players}
-
-现在需要投票淘汰一名玩家。
-请分析局势并选择你要投票的玩家编号。
-
-要求：
-1. 只回复一个数字（玩家编号）
-2. 不要有其他内容
-3. 必须是存活玩家的编号""")
-        ])
-    
     def _setup_chains(self):
-        """设置 LangChain 链"""
-        
-        # 思考链
-        self.think_chain = (
-            self.think_prompt 
-            | self.llm 
-            | StrOutputParser()
-        )
-        
-        # 发言链
-        self.speak_chain = (
-            self.speak_prompt 
-            | self.llm 
-            | StrOutputParser()
-        )
-        
-        # 投票链
-        self.vote_chain = (
-            self.vote_prompt 
-            | self.llm 
-            | StrOutputParser()
-        )
+        """获取各动作的链（提示模板和已编译的链在所有Agent之间共用）"""
+        self.think_chain = self._chain("think")
+        self.speak_chain = self._chain("speak")
+        self.vote_chain = self._chain("vote")
+        self.summary_chain = self._chain("summary")
+        self.turn_chain = self._chain("turn")
+    
+    def _chain(self, action: str):
+        """获取动作的链，绑定该动作的生成参数（max_tokens, temperature, stop）"""
+        profile = self.profiles.get(action, {})
+        params = {key: profile[key] for key in ("max_tokens", "temperature", "stop") if profile.get(key) is not None}
+        return get_chain(self.llm, action, **params)
+    
+    def _truncate_speech(self, text: str, action: str = "speak") -> Optional[str]:
+        """
+        按 max_sentences 截断发言
+        
+        Args:
+            text: 发言文本
+            action: 使用哪个动作的 max_sentences（speak 或 turn）
+        
+        Returns:
+            截断后的文本，未超过句数时返回None
+        """
+        max_sentences = self.profiles.get(action, {}).get("max_sentences")
+        if not max_sentences:
+            return None
+        end = find_sentence_end(text, max_sentences)
+        return text[:end] if end >= 0 else None
     
     def _get_chain_inputs(self, game_state: GameState) -> Dict:
         """
@@ -171,10 +131,12 @@ class LangChainAgent(BaseAgent):
         Returns:
             输入参数字典
         """
+        # 游戏状态和事件的文本对所有Agent相同，按状态版本缓存
         inputs = {
-            "game_state": self._format_game_state(game_state),
-            "recent_events": self._format_events(game_state.events),
+            "game_state": game_state.render("game_state", self._format_game_state),
+            "recent_events": game_state.render("recent_events", lambda state: self._format_events(state.events)),
             "memory_summary": self.get_memory_summary(),
+            **self._player_inputs,
         }
         
         # 如果启用记忆，添加历史消息
@@ -183,6 +145,62 @@ class LangChainAgent(BaseAgent):
         
         return inputs
     
+    def _get_speak_inputs(self, game_state: GameState) -> Dict:
+        """获取发言链的输入参数（含本轮已完成的后台思考）"""
+        inputs = self._get_chain_inputs(game_state)
+        inputs["thought"] = self._round_thought(game_state) or "（暂无）"
+        return inputs
+    
+    def _round_thought(self, game_state: GameState) -> str:
+        """本轮后台思考的结果（尚未完成或失败时返回空字符串）"""
+        if self.thinking is None:
+            return ""
+        round_num, task = self.thinking
+        if round_num != game_state.round or not task.done() or task.cancelled() or task.exception():
+            return ""
+        return task.result()
+    
+    def start_summarizing(self) -> Optional[asyncio.Task]:
+        """把移出预算的旧对话在后台合并进摘要（上一次摘要尚未完成时跳过，留到下一回合）"""
+        if not self.enable_memory or not self.message_history.needs_summary:
+            return None
+        if self.summarizing is not None and not self.summarizing.done():
+            return None
+        self.summarizing = asyncio.ensure_future(self._summarize())
+        return self.summarizing
+    
+    async def _summarize(self):
+        try:
+            await self.message_history.summarize(self.summary_chain, self.player.name, self.player.role_name_cn)
+        except Exception as e:
+            print(f"  ⚠️ 对话摘要失败: {e}")
+    
+    def start_thinking(self, game_state: GameState) -> Optional[asyncio.Task]:
+        """回合模式的发言调用本身包含思考，不再单独思考"""
+        if self.turn_mode:
+            return None
+        return super().start_thinking(game_state)
+    
+    async def athink(self, game_state: GameState) -> str:
+        """
+        异步思考（回合开始时在后台运行），结果写入记忆供发言使用
+        
+        Args:
+            game_state: 游戏状态
+        
+        Returns:
+            思考内容（失败时为空字符串）
+        """
+        try:
+            response = await self.think_chain.ainvoke(self._get_chain_inputs(game_state))
+        except Exception as e:
+            print(f"  ⚠️ 思考失败: {e}")
+            return ""
+        
+        thought = response.strip()
+        self.memory.add_strategy(f"第{game_state.round}轮：{thought}")
+        return thought
+    
     def think(self, game_state: GameState) -> str:
         """
         思考当前局势
@@ -218,9 +236,13 @@ class LangChainAgent(BaseAgent):
         Returns:
             发言内容
         """
+        if self.turn_mode:
+            return self._speak_turn(game_state)
+        
         try:
-            inputs = self._get_chain_inputs(game_state)
+            inputs = self._get_speak_inputs(game_state)
             response = self.speak_chain.invoke(inputs)
+            response = self._truncate_speech(response) or response
             
             # 记录观察
             self.observe(f"我在第{game_state.round}轮发言了")
@@ -246,15 +268,30 @@ class LangChainAgent(BaseAgent):
         Yields:
             发言内容的文本块
         """
+        if self.turn_mode:
+            async for chunk in self._speak_turn_stream(game_state):
+                yield chunk
+            return
+        
         try:
-            inputs = self._get_chain_inputs(game_state)
+            # 不等待后台思考：只使用已经完成的思考，首句发言不被延后
+            inputs = self._get_speak_inputs(game_state)
             
-            # 使用 LangChain 的流式 API
+            # 使用 LangChain 的流式 API，超过句数上限时立即停止生成
             full_response = ""
-            
-            async for chunk in self.speak_chain.astream(inputs):
-                full_response += chunk
-                yield chunk
+            stream = self.speak_chain.astream(inputs)
+            try:
+                async for chunk in stream:
+                    truncated = self._truncate_speech(full_response + chunk)
+                    if truncated is not None:
+                        if len(truncated) > len(full_response):
+                            yield truncated[len(full_response):]
+                        full_response = truncated
+                        break
+                    full_response += chunk
+                    yield chunk
+            finally:
+                await stream.aclose()
             
             # 记录观察
             self.observe(f"我在第{game_state.round}轮发言了")
@@ -271,6 +308,120 @@ class LangChainAgent(BaseAgent):
             for char in fallback_text:
                 yield char
     
+    # ==================== 回合模式 ====================
+    
+    def _speak_turn(self, game_state: GameState) -> str:
+        """回合模式发言（同步）：一次调用生成思考、预投票和发言"""
+        candidates = self._get_vote_candidates(game_state)
+        try:
+            parser = _TurnParser()
+            parser.feed(self.turn_chain.invoke(self._get_vote_inputs(game_state, candidates)))
+            parser.finish()
+            speech = parser.sections["speech"].strip()
+            speech = self._truncate_speech(speech, "turn") or speech
+            return self._finish_turn(game_state, parser, candidates, speech)
+        
+        except Exception as e:
+            print(f"  ⚠️ LLM调用失败: {e}")
+            return self._fallback_speak()
+    
+    async def _speak_turn_stream(self, game_state: GameState) -> AsyncGenerator[str, None]:
+        """回合模式流式发言：思考和预投票在发言之前输出，只有发言部分流式产出"""
+        candidates = self._get_vote_candidates(game_state)
+        try:
+            parser = _TurnParser()
+            speech = ""
+            stream = self.turn_chain.astream(self._get_vote_inputs(game_state, candidates))
+            try:
+                async for chunk in stream:
+                    delta = parser.feed(chunk)
+                    if not delta:
+                        continue
+                    # 预投票已在发言之前输出，发言超过句数上限即可停止生成
+                    truncated = self._truncate_speech(speech + delta, "turn")
+                    if truncated is not None:
+                        if len(truncated) > len(speech):
+                            yield truncated[len(speech):]
+                        speech = truncated
+                        break
+                    speech += delta
+                    yield delta
+                else:
+                    delta = parser.finish()
+                    speech += delta
+                    if delta:
+                        yield delta
+            finally:
+                await stream.aclose()
+            
+            if not speech.strip():
+                # 模型没有按格式输出发言
+                speech = self._fallback_speak()
+                yield speech
+            
+            self._finish_turn(game_state, parser, candidates, speech)
+        
+        except Exception as e:
+            print(f"  ⚠️ LLM流式调用失败: {e}")
+            fallback_text = self._fallback_speak()
+            for char in fallback_text:
+                yield char
+    
+    def _finish_turn(self, game_state: GameState, parser: "_TurnParser", candidates: List[int], speech: str) -> str:
+        """记录回合模式的思考、预投票和发言"""
+        speech = speech.strip() or self._fallback_speak()
+        
+        reasoning = parser.sections["reasoning"].strip()
+        if reasoning:
+            self.observe(f"第{game_state.round}轮我的判断：{reasoning}")
+        
+        vote_id = _find_vote(parser.sections["vote"], candidates, complete=True)
+        self.provisional_vote = (game_state.round, vote_id) if vote_id is not None else None
+        
+        self.observe(f"我在第{game_state.round}轮发言了")
+        
+        if self.enable_memory:
+            self.message_history.add_user_message(f"第{game_state.round}轮发言")
+            self.message_history.add_ai_message(speech)
+        
+        return speech
+    
+    def _use_provisional_vote(self, game_state: GameState, candidates: List[int]) -> Optional[int]:
+        """
+        判断能否沿用预投票
+        
+        以下情况视为局势改变，需要重新投票：
+        - 预投票的目标已不可投票
+        - 之后的发言提到了自己
+        - 之后至少两位玩家发言，且过半数集中提到了另一名玩家
+        
+        Returns:
+            可沿用的预投票目标，需要重新投票时返回None
+        """
+        if self.provisional_vote is None:
+            return None
+        vote_round, target = self.provisional_vote
+        if vote_round != game_state.round or target not in candidates:
+            return None
+        
+        speeches = [speech for player_id, speech in game_state.get_round_speeches()]
+        order = [player_id for player_id, speech in game_state.get_round_speeches()]
+        if self.player.id not in order:
+            return None
+        later = speeches[order.index(self.player.id) + 1:]
+        
+        mentioned = [{int(x) for x in _MENTION_PATTERN.findall(speech)} for speech in later]
+        if any(self.player.id in ids for ids in mentioned):
+            return None
+        
+        counts = Counter(player_id for ids in mentioned for player_id in ids if player_id in candidates)
+        if counts:
+            top, count = counts.most_common(1)[0]
+            if top != target and len(later) >= 2 and count * 2 > len(later):
+                return None
+        
+        return target
+    
     def vote(self, game_state: GameState) -> int:
         """
         投票
@@ -281,47 +432,108 @@ class LangChainAgent(BaseAgent):
         Returns:
             投票的玩家ID
         """
+        alive_players = self._get_vote_candidates(game_state)
+        if not alive_players:
+            return self.player.id
+        
+        if self.turn_mode:
+            vote_id = self._use_provisional_vote(game_state, alive_players)
+            if vote_id is not None:
+                return self._record_vote(vote_id, game_state)
+        
         try:
-            alive_players = [
-                p.id for p in game_state.get_alive_players() 
-                if p.id != self.player.id
-            ]
-            
-            if not alive_players:
-                return self.player.id
-            
-            inputs = self._get_chain_inputs(game_state)
-            inputs["alive_players"] = ", ".join(map(str, alive_players))
-            
+            inputs = self._get_vote_inputs(game_state, alive_players)
             response = self.vote_chain.invoke(inputs)
+            return self._parse_vote(response, alive_players, game_state)
+        
+        except Exception as e:
+            print(f"  ⚠️ 投票失败: {e}")
+            # 降级：选择第一个存活玩家
+            return alive_players[0]
+    
+    async def avote(self, game_state: GameState) -> int:
+        """
+        异步投票（使用 ainvoke，不阻塞事件循环）
+        
+        Args:
+            game_state: 游戏状态
+        
+        Returns:
+            投票的玩家ID
+        """
+        alive_players = self._get_vote_candidates(game_state)
+        if not alive_players:
+            return self.player.id
+        
+        if self.turn_mode:
+            vote_id = self._use_provisional_vote(game_state, alive_players)
+            if vote_id is not None:
+                return self._record_vote(vote_id, game_state)
+        
+        try:
+            inputs = self._get_vote_inputs(game_state, alive_players)
             
-            # 解析投票结果
-            numbers = re.findall(r'\d+', response)
-            if numbers:
-                vote_id = int(numbers[0])
-                if vote_id in alive_players:
-                    self.observe(f"我在第{game_state.round}轮投票给{vote_id}号")
-                    
-                    # 记录到消息历史
-                    if self.enable_memory:
-                        self.message_history.add_user_message(f"第{game_state.round}轮投票")
-                        self.message_history.add_ai_message(f"投票给{vote_id}号")
-                    
-                    return vote_id
+            # 流式解析：出现有效的存活玩家编号即停止生成
+            response = ""
+            stream = self.vote_chain.astream(inputs)
+            try:
+                async for chunk in stream:
+                    response += chunk
+                    if _find_vote(response, alive_players, complete=False) is not None:
+                        break
+            finally:
+                await stream.aclose()
             
-            # 如果解析失败，返回第一个存活玩家
-            fallback_vote = alive_players[0]
-            print(f"  ⚠️ 投票解析失败，默认投给{fallback_vote}号")
-            return fallback_vote
+            return self._parse_vote(response, alive_players, game_state)
         
         except Exception as e:
             print(f"  ⚠️ 投票失败: {e}")
-            # 降级：随机选择
-            alive_players = [
-                p.id for p in game_state.get_alive_players() 
-                if p.id != self.player.id
-            ]
-            return alive_players[0] if alive_players else self.player.id
+            # 降级：选择第一个存活玩家
+            return alive_players[0]
+    
+    def _get_vote_candidates(self, game_state: GameState) -> List[int]:
+        """获取可投票的玩家ID（除自己外的存活玩家）"""
+        return [
+            p.id for p in game_state.get_alive_players() 
+            if p.id != self.player.id
+        ]
+    
+    def _get_vote_inputs(self, game_state: GameState, alive_players: List[int]) -> Dict:
+        """获取投票链的输入参数"""
+        inputs = self._get_chain_inputs(game_state)
+        inputs["alive_players"] = ", ".join(map(str, alive_players))
+        return inputs
+    
+    def _parse_vote(self, response: str, alive_players: List[int], game_state: GameState) -> int:
+        """
+        解析投票结果并记录
+        
+        Args:
+            response: LLM 回复
+            alive_players: 可投票的玩家ID
+            game_state: 游戏状态
+        
+        Returns:
+            投票的玩家ID（解析失败时返回第一个存活玩家）
+        """
+        vote_id = _find_vote(response, alive_players, complete=True)
+        if vote_id is not None:
+            return self._record_vote(vote_id, game_state)
+        
+        # 如果解析失败，返回第一个存活玩家
+        fallback_vote = alive_players[0]
+        print(f"  ⚠️ 投票解析失败，默认投给{fallback_vote}号")
+        return fallback_vote
+    
+    def _record_vote(self, vote_id: int, game_state: GameState) -> int:
+        """记录投票到记忆和消息历史"""
+        self.observe(f"我在第{game_state.round}轮投票给{vote_id}号")
+        
+        if self.enable_memory:
+            self.message_history.add_user_message(f"第{game_state.round}轮投票")
+            self.message_history.add_ai_message(f"投票给{vote_id}号")
+        
+        return vote_id
     
     def _format_game_state(self, game_state: GameState) -> str:
         """
@@ -410,7 +622,101 @@ class LangChainAgent(BaseAgent):
                     "type": msg.type,
                     "content": msg.content
                 }
-                for msg in self.message_history.messages
+                for msg in self.message_history.all_messages
             ]
+            base_dict["history_summary"] = self.message_history.summary
         
         return base_dict
+
+
+def _find_vote(text: str, alive_players: List[int], complete: bool) -> Optional[int]:
+    """
+    从（可能尚未生成完的）回复中找出第一个有效的存活玩家编号
+    
+    Args:
+        text: 回复文本
+        alive_players: 可投票的玩家ID
+        complete: 回复是否已完整（未完整时末尾的数字可能还没写完，例如 "1" 之后还有 "0"）
+    
+    Returns:
+        玩家ID，没有有效编号时返回None
+    """
+    for match in re.finditer(r'\d+', text):
+        if not complete and match.end() == len(text):
+            break
+        vote_id = int(match.group())
+        if vote_id in alive_players:
+            return vote_id
+    return None
+
+
+class _TurnParser:
+    """
+    回合模式输出的增量解析器
+    
+    按 【思考】【投票】【发言】 标记把流式输出拆成各个分段，
+    标记可能被拆在多个文本块中，未闭合的 "【" 之后的内容暂缓处理。
+    """
+    
+    def __init__(self):
+        self.sections: Dict[str, str] = {name: "" for name in TURN_SECTIONS.values()}
+        self._current: Optional[str] = None
+        self._buffer = ""
+    
+    def feed(self, chunk: str) -> str:
+        """
+        输入一个文本块
+        
+        Returns:
+            新增的发言文本
+        """
+        self._buffer += chunk
+        speech = ""
+        
+        while self._buffer:
+            start = self._buffer.find("【")
+            if start < 0:
+                speech += self._append(self._buffer)
+                self._buffer = ""
+                break
+            
+            end = self._buffer.find("】", start)
+            if end < 0:
+                if len(self._buffer) - start <= _MAX_MARKER_LEN:
+                    # 标记可能尚未输出完整
+                    speech += self._append(self._buffer[:start])
+                    self._buffer = self._buffer[start:]
+                    break
+                end = start
+            
+            section = TURN_SECTIONS.get(self._buffer[start + 1:end].strip()) if end > start else None
+            if section is None:
+                # 不是分段标记，按普通文本处理
+                speech += self._append(self._buffer[:max(end, start) + 1])
+                self._buffer = self._buffer[max(end, start) + 1:]
+                continue
+            
+            speech += self._append(self._buffer[:start])
+            self._buffer = self._buffer[end + 1:]
+            self._current = section
+        
+        return speech
+    
+    def finish(self) -> str:
+        """
+        输出结束，处理剩余内容
+        
+        Returns:
+            新增的发言文本
+        """
+        rest, self._buffer = self._buffer, ""
+        return self._append(rest)
+    
+    def _append(self, text: str) -> str:
+        """把文本追加到当前分段，返回其中属于发言的部分"""
+        if self._current is None or not text:
+            return ""
+        if not self.sections[self._current]:
+            text = text.lstrip()
+        self.sections[self._current] += text
+        return text if self._current == "speech" else ""
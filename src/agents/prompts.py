@@ -0,0 +1,186 @@
+"""
+提示词模板
+所有Agent、所有对局共用同一组模板和已编译的链，不再为每个Agent单独构建。
+
+模板按"静态在前、动态在后"排列，便于提供商的提示词前缀缓存命中：
+系统提示词开头是所有玩家相同的游戏规则，玩家自己的信息放在规则之后，
+再往后才是每个玩家各自的对话历史和每次调用不同的局势信息。
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import Runnable
+
+# 游戏规则（所有玩家相同，位于提示词最前面）
+GAME_RULES = """你是一名狼人杀游戏玩家。
+
+【游戏规则】
+1. 狼人的目标是消灭所有好人
+2. 好人的目标是找出并投票淘汰所有狼人
+3. 白天所有人发言和投票
+4. 你需要根据角色特点进行策略性发言
+5. 不要直接透露你的真实身份（除非策略需要）
+
+【你的策略】
+- 如果你是狼人：隐藏身份，误导好人，保护队友
+- 如果你是预言家：谨慎透露身份，引导投票方向
+- 如果你是女巫：合理使用解药和毒药
+- 如果你是猎人：威慑狼人，关键时刻发挥作用
+- 如果你是村民：通过逻辑推理，找出可疑玩家
+
+请保持角色扮演，根据当前局势做出合理的推理和决策。"""
+
+# 玩家信息（每个玩家不同，位于规则之后）
+PLAYER_INFO = """【你的信息】
+玩家编号：{player_id}
+玩家名称：{player_name}
+你的角色：{role_name}
+角色说明：{role_description}"""
+
+SYSTEM_TEMPLATE = GAME_RULES + "\n\n" + PLAYER_INFO
+
+
+def _agent_prompt(human: str) -> ChatPromptTemplate:
+    """Agent动作的提示模板：系统提示词 + 对话历史 + 本次的局势和要求"""
+    return ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_TEMPLATE),
+        MessagesPlaceholder(variable_name="history", optional=True),
+        ("human", human),
+    ])
+
+
+# 思考提示模板
+THINK_PROMPT = _agent_prompt("""当前游戏状态：
+{game_state}
+
+最近发生的事件：
+{recent_events}
+
+你的记忆：
+{memory_summary}
+
+请分析当前局势，思考你的策略。""")
+
+# 发言提示模板
+SPEAK_PROMPT = _agent_prompt("""当前游戏状态：
+{game_state}
+
+最近发生的事件：
+{recent_events}
+
+你的记忆：
+{memory_summary}
+
+你这一轮的思考（只有你自己知道）：
+{thought}
+
+请基于当前局势，发表一段简短的发言（2-3句话）。
+注意：
+1. 要符合你的角色身份，进行策略性发言
+2. 语言要简洁、自然、口语化
+3. 不要透露过多信息，保持神秘感""")
+
+# 投票提示模板
+VOTE_PROMPT = _agent_prompt("""当前游戏状态：
+{game_state}
+
+最近发生的事件：
+{recent_events}
+
+你的记忆：
+{memory_summary}
+
+存活的玩家ID：{alive_players}
+
+现在需要投票淘汰一名玩家。
+请分析局势并选择你要投票的玩家编号。
+
+要求：
+1. 只回复一个数字（玩家编号）
+2. 不要有其他内容
+3. 必须是存活玩家的编号""")
+
+# 回合模式（思考、预投票、发言一次生成）提示模板
+TURN_PROMPT = _agent_prompt("""当前游戏状态：
+{game_state}
+
+最近发生的事件：
+{recent_events}
+
+你的记忆：
+{memory_summary}
+
+可投票的玩家ID：{alive_players}
+
+轮到你发言了。请严格按以下格式回复，不要输出其他内容：
+【思考】私下分析当前局势（1-2句话，其他玩家看不到）
+【投票】你目前打算投票淘汰的玩家编号（只写一个数字，必须是可投票的玩家）
+【发言】公开发言（2-3句话，符合角色身份，简洁、自然、口语化，不要透露过多信息）""")
+
+# 对话摘要提示模板
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("human", """请把下面的对话摘要和之后的对话记录合并为一份新的对话摘要，保留对后续推理有用的信息：
+各玩家的立场和可疑之处、你的发言要点、你的投票及理由。只输出摘要内容。
+
+你是狼人杀玩家{player_name}（{role}），摘要不超过{max_chars}字。
+
+之前的对话摘要：
+{summary}
+
+之后的对话记录：
+{conversation}"""),
+])
+
+PROMPTS: Dict[str, ChatPromptTemplate] = {
+    "think": THINK_PROMPT,
+    "speak": SPEAK_PROMPT,
+    "vote": VOTE_PROMPT,
+    "turn": TURN_PROMPT,
+    "summary": SUMMARY_PROMPT,
+}
+
+_OUTPUT_PARSER = StrOutputParser()
+
+# 缓存链的LLM实例数上限（游戏使用 LLMFactory 共享的实例，通常只有几个；超过时淘汰最久未用的）
+_MAX_CACHED_LLMS = 256
+
+# 已编译的链：id(LLM实例) -> (LLM实例, (动作, 生成参数) -> 链)
+# 链本身持有LLM实例，缓存条目同时保存实例，保证 id 不会被复用
+_chains: "OrderedDict[int, Tuple[BaseChatModel, Dict[Tuple, Runnable]]]" = OrderedDict()
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def get_chain(llm: BaseChatModel, action: str, **params: Any) -> Runnable:
+    """
+    获取动作的链（同一LLM实例和生成参数只编译一次，所有Agent共用）
+
+    Args:
+        llm: LLM实例
+        action: 动作（think, speak, vote, turn, summary）
+        **params: 绑定到LLM的生成参数（max_tokens, temperature, stop）
+
+    Returns:
+        提示模板 | LLM | 文本输出 的链
+    """
+    entry = _chains.get(id(llm))
+    if entry is None:
+        entry = _chains[id(llm)] = (llm, {})
+        while len(_chains) > _MAX_CACHED_LLMS:
+            _chains.popitem(last=False)
+    else:
+        _chains.move_to_end(id(llm))
+    chains = entry[1]
+
+    key = (action, tuple(sorted((name, _freeze(value)) for name, value in params.items())))
+    chain = chains.get(key)
+    if chain is None:
+        bound = llm.bind(**params) if params else llm
+        chain = chains[key] = PROMPTS[action] | bound | _OUTPUT_PARSER
+    return chain
@@ -0,0 +1,327 @@
+"""
+多提供商路由
+在多个LLM后端（提供商/模型）之间按实时表现选择：
+
+- 每个后端记录首响应延迟的 EWMA（流式调用为首块延迟，非流式为总耗时）和错误率的 EWMA，
+  统计在进程内共享，所有游戏共同积累
+- 每次调用按得分（延迟 × 错误率惩罚）选择最快的健康后端，失败时依次换下一个后端重试
+- 少量调用随机探索其他健康后端，使统计保持更新
+- 实时发言（调度优先级为 PRIORITY_LIVE 的流式调用）可选对冲：主后端在其 p95 首块延迟内
+  没有输出时，向第二个后端发出同样的请求，先输出者胜出，另一个请求被取消
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from src.utils.rate_limiter import PRIORITY_LIVE, current_priority
+
+# 计算 p95 前需要的最少样本数（不足时使用默认对冲延迟）
+_MIN_LATENCY_SAMPLES = 20
+_LATENCY_WINDOW = 200
+
+
+class BackendStats:
+    """单个后端的延迟和错误率统计"""
+
+    def __init__(self, name: str, alpha: float):
+        self.name = name
+        self.alpha = alpha
+        self.latency: Optional[float] = None   # 首响应延迟 EWMA（秒）
+        self.error_rate = 0.0                  # 错误率 EWMA
+        self.calls = 0
+        self.errors = 0
+        self.hedges_won = 0
+        self._first_chunk_samples: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def record_success(self, latency: float, streamed: bool = False):
+        self.calls += 1
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate *= 1 - self.alpha
+        if streamed:
+            self._first_chunk_samples.append(latency)
+
+    def record_abandoned(self, elapsed: float):
+        """请求输给对冲请求被取消：以已等待时间作为延迟的下限计入统计"""
+        self.latency = elapsed if self.latency is None else self.alpha * elapsed + (1 - self.alpha) * self.latency
+        self._first_chunk_samples.append(elapsed)
+
+    def record_error(self):
+        self.calls += 1
+        self.errors += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+
+    def first_chunk_percentile(self, percentile: float) -> Optional[float]:
+        """首块延迟的分位数（样本不足时返回None）"""
+        if len(self._first_chunk_samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        samples = sorted(self._first_chunk_samples)
+        return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+    def score(self, max_error_rate: float) -> Tuple[bool, float]:
+        """排序键：(是否不健康, 延迟 × 错误率惩罚)；没有样本的后端优先尝试"""
+        latency = self.latency or 0.0
+        return self.error_rate > max_error_rate, latency * (1 + 4 * self.error_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        p95 = self.first_chunk_percentile(0.95)
+        return {
+            "latency_ewma": round(self.latency, 3) if self.latency is not None else None,
+            "first_chunk_p95": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "calls": self.calls,
+            "errors": self.errors,
+            "hedges_won": self.hedges_won,
+        }
+
+
+# 进程内共享的后端统计（后端名称 -> 统计）
+_backend_stats: Dict[str, BackendStats] = {}
+
+
+def get_backend_stats(name: str, alpha: float = 0.2) -> BackendStats:
+    """获取（或创建）后端统计"""
+    stats = _backend_stats.get(name)
+    if stats is None:
+        stats = _backend_stats[name] = BackendStats(name, alpha)
+    return stats
+
+
+def routing_stats() -> Dict[str, Any]:
+    """所有后端的统计信息"""
+    return {name: stats.to_dict() for name, stats in _backend_stats.items()}
+
+
+class RoutedChatModel(BaseChatModel):
+    """按延迟和错误率在多个后端之间路由的LLM"""
+
+    backends: List[BaseChatModel]       # 后端LLM（按配置顺序，统计相同时靠前者优先）
+    backend_names: List[str]            # 后端名称（统计的键）
+    hedge: bool = True                  # 是否对实时发言对冲
+    hedge_percentile: float = 0.95      # 对冲延迟取主后端首块延迟的分位数
+    hedge_min_delay: float = 0.5        # 最小对冲延迟（秒）
+    hedge_default_delay: float = 3.0    # 样本不足时的对冲延迟（秒）
+    max_error_rate: float = 0.5         # 错误率超过该值视为不健康
+    explore_rate: float = 0.05          # 随机探索其他健康后端的比例
+    ewma_alpha: float = 0.2
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    def _stats(self, index: int) -> BackendStats:
+        return get_backend_stats(self.backend_names[index], self.ewma_alpha)
+
+    def _ranked(self) -> List[int]:
+        """按得分排序的后端下标（偶尔把一个随机的健康后端提到最前以更新统计）"""
+        order = sorted(range(len(self.backends)), key=lambda i: self._stats(i).score(self.max_error_rate))
+        healthy = [i for i in order[1:] if not self._stats(i).score(self.max_error_rate)[0]]
+        if healthy and random.random() < self.explore_rate:
+            explored = random.choice(healthy)
+            order.remove(explored)
+            order.insert(0, explored)
+        return order
+
+    def _hedge_delay(self, index: int) -> float:
+        p95 = self._stats(index).first_chunk_percentile(self.hedge_percentile)
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    # ==================== BaseChatModel 接口 ====================
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[BaseException] = None
+        for index in self._ranked():
+            started = time.monotonic()
+            try:
+                result = self.backends[index]._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                self._stats(index).record_error()
+                last_error = e
+                continue
+            self._stats(index).record_success(time.monotonic() - started)
+            return result
+        raise last_error
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # 同步流式不对冲：按排名依次尝试，首块之前失败时切换到下一个后端
+        last_error: Optional[BaseException] = None
+        for index in self._ranked():
+            started = time.monotonic()
+            # 与 _astream 相同，回调只由外层 stream 对实际输出的块发出
+            stream = self.backends[index]._stream(messages, stop=stop, run_manager=None, **kwargs)
+            try:
+                first_chunk = next(stream, None)
+            except Exception as e:
+                self._stats(index).record_error()
+                print(f"  ⚠️ LLM后端 {self.backend_names[index]} 流式调用失败，尝试下一个: {e}")
+                last_error = e
+                continue
+            self._stats(index).record_success(time.monotonic() - started, streamed=True)
+
+            # 已经输出首块后不再切换后端
+            if first_chunk is not None:
+                yield first_chunk
+                yield from stream
+            return
+        raise last_error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[BaseException] = None
+        for index in self._ranked():
+            started = time.monotonic()
+            try:
+                result = await self.backends[index]._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats(index).record_error()
+                print(f"  ⚠️ LLM后端 {self.backend_names[index]} 调用失败，尝试下一个: {e}")
+                last_error = e
+                continue
+            self._stats(index).record_success(time.monotonic() - started)
+            return result
+        raise last_error
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        ranked = self._ranked()
+        hedge = self.hedge and len(ranked) > 1 and current_priority.get() == PRIORITY_LIVE
+
+        def open_stream(index: int) -> "_BackendStream":
+            # 后端不接收回调：对冲时输掉的后端不会产生回调，胜者的块由外层 astream 对本次调用的回调逐块通知
+            stream = self.backends[index]._astream(messages, stop=stop, run_manager=None, **kwargs)
+            return _BackendStream(index, stream)
+
+        winner: Optional[_BackendStream] = None
+        last_error: Optional[BaseException] = None
+        pending: List[_BackendStream] = []
+        candidates = iter(ranked)
+        hedged_from: Optional[int] = None
+
+        try:
+            while winner is None:
+                if not pending:
+                    index = next(candidates, None)
+                    if index is None:
+                        raise last_error
+                    pending.append(open_stream(index))
+
+                # 对冲：主后端在 p95 首块延迟内没有输出时，再向下一个后端发出请求
+                timeout = None
+                if hedge and len(pending) == 1:
+                    timeout = max(0.0, self._hedge_delay(pending[0].index) - pending[0].elapsed)
+
+                done, _ = await asyncio.wait([s.first for s in pending], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    index = next(candidates, None)
+                    if index is None:
+                        hedge = False
+                    else:
+                        hedged_from = pending[0].index
+                        pending.append(open_stream(index))
+                    continue
+
+                for stream in [s for s in pending if s.first.done()]:
+                    pending.remove(stream)
+                    error = stream.first.exception()
+                    if error is None and winner is None:
+                        winner = stream
+                        continue
+                    if error is not None:
+                        last_error = error
+                        self._stats(stream.index).record_error()
+                        print(f"  ⚠️ LLM后端 {self.backend_names[stream.index]} 流式调用失败: {error}")
+                    await stream.aclose()
+
+            self._stats(winner.index).record_success(winner.elapsed_first, streamed=True)
+            if hedged_from is not None and winner.index != hedged_from:
+                self._stats(winner.index).hedges_won += 1
+
+            # 输给胜者的请求立即取消
+            for stream in pending:
+                self._stats(stream.index).record_abandoned(stream.elapsed)
+                await stream.aclose()
+            pending = []
+
+            first_chunk = winner.first.result()
+            if first_chunk is not None:
+                yield first_chunk
+                async for chunk in winner.stream:
+                    yield chunk
+
+        finally:
+            for stream in pending:
+                await stream.aclose()
+            if winner is not None:
+                await winner.aclose()
+
+
+class _BackendStream:
+    """正在等待首块的后端流"""
+
+    def __init__(self, index: int, stream: AsyncIterator[ChatGenerationChunk]):
+        self.index = index
+        self.stream = stream
+        self.started = time.monotonic()
+        self.elapsed_first = 0.0
+        self.first: asyncio.Task = asyncio.ensure_future(self._first_chunk())
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    async def _first_chunk(self) -> Optional[ChatGenerationChunk]:
+        """等待首块（空流返回None）"""
+        try:
+            chunk = await self.stream.__anext__()
+        except StopAsyncIteration:
+            chunk = None
+        self.elapsed_first = self.elapsed
+        return chunk
+
+    async def aclose(self):
+        """取消等待并关闭流"""
+        if not self.first.done():
+            self.first.cancel()
+            try:
+                await self.first
+            except BaseException:
+                pass
+        aclose = getattr(self.stream, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
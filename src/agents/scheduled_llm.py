@@ -0,0 +1,166 @@
+"""
+经过调度器的LLM
+包装共享的LLM实例（所有游戏共用同一个包装），调用前向进程级调度器申请名额：
+
+- 按提供商的请求数/token数限额排队，而不是直接发出后被 429 拒绝
+- 同一提供商的请求在各局游戏之间轮转（所属游戏取自发起调用的上下文，见 game_context）
+- 优先级取自发起调用的上下文（发言流水线为实时优先级，投票为普通优先级）
+
+token 用量在调用前按提示词长度和 max_tokens 粗略预估，
+返回结果中带有 usage 信息时按实际用量修正，并按提供商累计用量和提示词缓存命中情况。
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.ai import UsageMetadata, add_usage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from src.utils.rate_limiter import FairScheduler, current_game, get_scheduler
+
+# 预估token数时假设的每token字符数（中英文混合的粗略值）
+_CHARS_PER_TOKEN = 2
+
+# 无法得知 max_tokens 时预估的输出token数
+_DEFAULT_OUTPUT_TOKENS = 500
+
+# 各提供商累计的实际用量（提供商 -> 计数）
+_usage: Dict[str, Dict[str, int]] = {}
+
+
+def _record_usage(provider: str, usage: Optional[UsageMetadata]):
+    """累计一次调用的用量（含提示词缓存的命中和写入token数）"""
+    stats = _usage.setdefault(provider, {
+        "calls": 0, "calls_with_usage": 0, "input_tokens": 0, "output_tokens": 0,
+        "cache_read_tokens": 0, "cache_creation_tokens": 0,
+    })
+    stats["calls"] += 1
+    if not usage:
+        return
+    details = usage.get("input_token_details") or {}
+    stats["calls_with_usage"] += 1
+    stats["input_tokens"] += usage.get("input_tokens", 0)
+    stats["output_tokens"] += usage.get("output_tokens", 0)
+    stats["cache_read_tokens"] += details.get("cache_read") or 0
+    stats["cache_creation_tokens"] += details.get("cache_creation") or 0
+
+
+def usage_stats() -> Dict[str, Any]:
+    """各提供商的用量统计（cache_hit_rate 为输入token中命中提示词缓存的比例）"""
+    return {
+        provider: {
+            **stats,
+            "cache_hit_rate": round(stats["cache_read_tokens"] / stats["input_tokens"], 3) if stats["input_tokens"] else 0.0,
+        }
+        for provider, stats in _usage.items()
+    }
+
+
+class ScheduledChatModel(BaseChatModel):
+    """经过调度器的LLM"""
+
+    llm: BaseChatModel                  # 实际的LLM实例（可在多局游戏间共享）
+    provider: str                       # 提供商（限额按提供商计算）
+    game_id: Optional[str] = None       # 固定的所属游戏（None 表示取自调用上下文）
+    scheduler: Optional[FairScheduler] = None  # 调度器（None 表示使用全局调度器）
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.llm._llm_type}"
+
+    @property
+    def _scheduler_key(self) -> str:
+        return f"llm:{self.provider}"
+
+    @property
+    def _game_id(self) -> Optional[str]:
+        return self.game_id or current_game.get()
+
+    def _get_scheduler(self) -> FairScheduler:
+        return self.scheduler or get_scheduler()
+
+    def _estimate_tokens(self, messages: List[BaseMessage], **kwargs: Any) -> int:
+        """预估本次调用的token数（提示词 + 最大输出）"""
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        max_tokens = kwargs.get("max_tokens") or getattr(self.llm, "max_tokens", None) or _DEFAULT_OUTPUT_TOKENS
+        return prompt_chars // _CHARS_PER_TOKEN + max_tokens
+
+    # ==================== BaseChatModel 接口 ====================
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # 同步调用不经过调度器（Web 服务只使用异步接口）
+        return self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        yield from self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._estimate_tokens(messages, **kwargs)
+        async with self._get_scheduler().slot(self._scheduler_key, self._game_id, tokens=tokens) as slot:
+            result = await self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            usage = _result_usage(result)
+            _record_usage(self.provider, usage)
+            slot.record_tokens(usage.get("total_tokens", 0) if usage else 0)
+            return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._estimate_tokens(messages, **kwargs)
+        async with self._get_scheduler().slot(self._scheduler_key, self._game_id, tokens=tokens) as slot:
+            usage: Optional[UsageMetadata] = None
+            try:
+                async for chunk in self.llm._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    chunk_usage = getattr(chunk.message, "usage_metadata", None)
+                    if chunk_usage:
+                        usage = add_usage(usage, chunk_usage)
+                    yield chunk
+            finally:
+                # 调用方提前停止（投票解析到编号、发言达到句数）时也计入
+                _record_usage(self.provider, usage)
+                slot.record_tokens(usage.get("total_tokens", 0) if usage else 0)
+
+
+def _result_usage(result: ChatResult) -> Optional[UsageMetadata]:
+    """从调用结果中读取实际用量（没有用量信息时返回None）"""
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None) if hasattr(generation, "message") else None
+        if usage:
+            return usage
+
+    token_usage = (result.llm_output or {}).get("token_usage") or {}
+    if not token_usage:
+        return None
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    return {
+        "input_tokens": token_usage.get("prompt_tokens", 0),
+        "output_tokens": token_usage.get("completion_tokens", 0),
+        "total_tokens": token_usage.get("total_tokens", 0),
+        "input_token_details": {"cache_read": cached},
+    }
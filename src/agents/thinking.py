@@ -0,0 +1,44 @@
+"""
+回合开始时的并发思考
+所有存活Agent在回合开始时同时进行私下思考，结果写入各自的记忆，发言时作为预先准备的上下文
+
+思考与回合开始、阶段切换等事件帧的推送并行进行，使用后台优先级，
+不会占用实时发言的调用名额；发言时只使用已经完成的思考，不会增加串行发言的耗时。
+首位发言者的思考不可能在其发言前完成，因此不为其启动思考。
+"""
+
+import asyncio
+from typing import List
+
+from .base_agent import BaseAgent
+from src.core.models import GameState
+from src.utils.rate_limiter import PRIORITY_BACKGROUND, scheduling_priority
+
+
+def start_round_thinking(agents: List[BaseAgent], game_state: GameState) -> List[asyncio.Task]:
+    """
+    为首位发言者之外的存活Agent在后台启动本轮思考
+
+    Args:
+        agents: Agent列表（按发言顺序）
+        game_state: 游戏状态
+
+    Returns:
+        思考任务列表（回合结束或中断时应调用 cancel_round_thinking）
+    """
+    tasks = []
+    alive = [agent for agent in agents if agent.player.is_alive]
+    # 在后台优先级下创建任务，任务内的LLM调用继承该优先级
+    with scheduling_priority(PRIORITY_BACKGROUND):
+        for agent in alive[1:]:
+            task = agent.start_thinking(game_state)
+            if task is not None:
+                tasks.append(task)
+    return tasks
+
+
+def cancel_round_thinking(tasks: List[asyncio.Task]):
+    """取消尚未完成的思考任务"""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
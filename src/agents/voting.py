@@ -0,0 +1,52 @@
+"""
+投票阶段
+并发收集所有存活Agent的投票，按座位顺序公布结果
+"""
+
+import asyncio
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from .base_agent import BaseAgent
+from src.core.models import GameState
+
+
+async def collect_votes(
+    agents: List[BaseAgent],
+    game_state: GameState,
+    max_concurrency: Optional[int] = None
+) -> AsyncGenerator[Tuple[BaseAgent, int], None]:
+    """
+    并发收集投票
+
+    所有存活玩家的投票请求同时发出（受 max_concurrency 限制），
+    结果按座位顺序依次产出：前面的玩家投票完成即可公布，
+    不必等待全部完成。整体耗时约等于最慢的单次调用。
+
+    Args:
+        agents: Agent列表（按座位顺序）
+        game_state: 游戏状态
+        max_concurrency: 单局游戏的最大并发投票数（None 表示不限制）
+
+    Yields:
+        (投票的Agent, 被投票的玩家ID)
+    """
+    voters = [agent for agent in agents if agent.player.is_alive]
+    if not voters:
+        return
+
+    semaphore = asyncio.Semaphore(max_concurrency or len(voters))
+
+    async def _vote(agent: BaseAgent) -> int:
+        async with semaphore:
+            return await agent.avote(game_state)
+
+    tasks = [asyncio.ensure_future(_vote(agent)) for agent in voters]
+
+    try:
+        for agent, task in zip(voters, tasks):
+            yield agent, await task
+    finally:
+        # 消费方提前退出时，取消尚未完成的投票
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,49 @@
+"""
+游戏时钟
+游戏事件的时间戳来自时钟，而不是直接调用 datetime.now()
+
+加速或无停顿运行时，展示节奏中的停顿被跳过，但事件时间戳仍按
+"正常节奏下会发生的时间"推进，回放和视频剪辑可以照常使用这些时间戳。
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class Clock:
+    """真实时钟"""
+
+    def now(self) -> datetime:
+        """当前时间"""
+        return datetime.now()
+
+
+class VirtualClock(Clock):
+    """虚拟时钟：真实流逝的时间 + 被跳过的停顿时间"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        """
+        初始化虚拟时钟
+
+        Args:
+            start: 起始时间（默认: 当前时间）
+        """
+        self._start = start or datetime.now()
+        self._started = time.monotonic()
+        self._skipped = 0.0
+
+    @property
+    def skipped_seconds(self) -> float:
+        """累计跳过的停顿时间（秒）"""
+        return self._skipped
+
+    def advance(self, seconds: float):
+        """推进时钟（用于被跳过或缩短的停顿）"""
+        if seconds > 0:
+            self._skipped += seconds
+
+    def now(self) -> datetime:
+        """当前虚拟时间"""
+        elapsed = time.monotonic() - self._started + self._skipped
+        return self._start + timedelta(seconds=elapsed)
@@ -86,13 +86,15 @@ class EventSystem:
                 except Exception as e:
                     print(f"Event callback error: {e}")
     
-    def get_history(self, event_type: Optional[EventType] = None, limit: int = 100) -> List[GameEvent]:
-        """获取事件历史"""
+    def get_history(self, event_type: Optional[EventType] = None, limit: Optional[int] = 100) -> List[GameEvent]:
+        """获取事件历史（limit 为 None 时返回全部）"""
         events = self._event_history
         
         if event_type:
             events = [e for e in events if e.type == event_type]
         
+        if limit is None:
+            return list(events)
         return events[-limit:]
     
     def clear_history(self):
@@ -3,20 +3,21 @@
 """
 
 import uuid
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
 
 from .models import Player, Role, GameState, GamePhase, Camp
 from .event_system import EventSystem, GameEvent, EventType
+from .clock import Clock
 
 
 class WerewolfGame:
     """狼人杀游戏引擎"""
     
-    def __init__(self, event_system: Optional[EventSystem] = None):
+    def __init__(self, event_system: Optional[EventSystem] = None, clock: Optional[Clock] = None):
         self.game_id = str(uuid.uuid4())
         self.state: Optional[GameState] = None
         self.event_system = event_system or EventSystem()
+        self.clock = clock or Clock()
         
     def setup_game(self, num_players: int = 6, roles: Optional[List[Role]] = None):
         """初始化游戏"""
@@ -43,13 +44,14 @@ class WerewolfGame:
             game_id=self.game_id,
             players=players,
             round=0,
-            phase=GamePhase.DISCUSSION
+            phase=GamePhase.DISCUSSION,
+            clock=self.clock
         )
         
         # 发布游戏开始事件
         self.event_system.emit(GameEvent(
             type=EventType.GAME_START,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "game_id": self.game_id,
                 "num_players": num_players,
@@ -69,10 +71,11 @@ class WerewolfGame:
         
         self.state.round += 1
         self.state.phase = GamePhase.DISCUSSION
+        self.state.bump_version()
         
         self.event_system.emit(GameEvent(
             type=EventType.ROUND_START,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={"round": self.state.round},
             need_effect=True,
             effect_type="round_start_transition",
@@ -86,10 +89,11 @@ class WerewolfGame:
         
         old_phase = self.state.phase
         self.state.phase = new_phase
+        self.state.bump_version()
         
         self.event_system.emit(GameEvent(
             type=EventType.PHASE_CHANGE,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "old_phase": old_phase.value,
                 "new_phase": new_phase.value,
@@ -110,11 +114,12 @@ class WerewolfGame:
             return
         
         player.is_alive = False
+        self.state.bump_version()
         self.state.add_event(f"{player.name}（{player.role_name_cn}）被{reason}淘汰")
         
         self.event_system.emit(GameEvent(
             type=EventType.PLAYER_DIED,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "player_id": player_id,
                 "player_name": player.name,
@@ -137,10 +142,11 @@ class WerewolfGame:
             return
         
         self.state.add_event(f"{player.name} 发言")
+        self.state.add_speech(player_id, speech)
         
         self.event_system.emit(GameEvent(
             type=EventType.PLAYER_SPEAK,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "player_id": player_id,
                 "player_name": player.name,
@@ -158,7 +164,7 @@ class WerewolfGame:
         
         self.event_system.emit(GameEvent(
             type=EventType.PLAYER_VOTE,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "voter_id": voter_id,
                 "target_id": target_id,
@@ -169,6 +175,26 @@ class WerewolfGame:
             priority=4
         ))
     
+    @staticmethod
+    def tally_votes(votes: Dict[int, int]) -> Optional[int]:
+        """
+        统计投票
+        
+        Args:
+            votes: 投票者ID -> 被投票者ID
+        
+        Returns:
+            得票最多的玩家ID（平票时取最先获得该票数的玩家），无投票时返回None
+        """
+        if not votes:
+            return None
+        
+        vote_count: Dict[int, int] = {}
+        for vote_to in votes.values():
+            vote_count[vote_to] = vote_count.get(vote_to, 0) + 1
+        
+        return max(vote_count, key=vote_count.get)
+    
     def use_skill(self, player_id: int, skill_name: str, target_id: Optional[int] = None):
         """使用技能"""
         if not self.state:
@@ -180,7 +206,7 @@ class WerewolfGame:
         
         self.event_system.emit(GameEvent(
             type=EventType.PLAYER_SKILL,
-            timestamp=datetime.now(),
+            timestamp=self.clock.now(),
             data={
                 "player_id": player_id,
                 "player_name": player.name,
@@ -203,10 +229,11 @@ class WerewolfGame:
         
         if winner:
             self.state.phase = GamePhase.ENDED
+            self.state.bump_version()
             
             self.event_system.emit(GameEvent(
                 type=EventType.GAME_END,
-                timestamp=datetime.now(),
+                timestamp=self.clock.now(),
                 data={
                     "winner": winner.value,
                     "total_rounds": self.state.round,
@@ -4,7 +4,7 @@
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Callable
 from datetime import datetime
 
 
@@ -102,6 +102,7 @@ class GameState:
     phase: GamePhase = GamePhase.DISCUSSION
     players: List[Player] = field(default_factory=list)
     events: List[str] = field(default_factory=list)
+    speeches: List[Tuple[int, int, str]] = field(default_factory=list)  # (回合, 玩家ID, 发言内容)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     
@@ -109,6 +110,15 @@ class GameState:
     max_rounds: int = 10
     enable_special_roles: bool = True
     
+    # 事件时间戳的时钟（None 表示使用真实时间）
+    clock: Optional[Any] = field(default=None, repr=False, compare=False)
+    
+    # 状态版本号：每次修改（事件、发言、淘汰、回合和阶段变化）加一
+    version: int = field(default=0, compare=False)
+    
+    # 提示词片段的渲染缓存：键 -> (版本号, 文本)，所有Agent共享
+    _render_cache: Dict[str, Tuple[int, str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
     def get_alive_players(self, camp: Optional[Camp] = None) -> List[Player]:
         """获取存活玩家"""
         players = [p for p in self.players if p.is_alive]
@@ -125,9 +135,42 @@ class GameState:
     
     def add_event(self, event: str):
         """添加事件"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.events.append(f"[{timestamp}] {event}")
-        self.updated_at = datetime.now()
+        now = self.clock.now() if self.clock else datetime.now()
+        self.events.append(f"[{now.strftime('%H:%M:%S')}] {event}")
+        self.updated_at = now
+        self.bump_version()
+    
+    def add_speech(self, player_id: int, speech: str):
+        """记录发言内容"""
+        self.speeches.append((self.round, player_id, speech))
+        self.bump_version()
+    
+    def get_round_speeches(self, round_num: Optional[int] = None) -> List[Tuple[int, str]]:
+        """获取某一轮的发言（默认当前轮），按发言顺序返回 (玩家ID, 发言内容)"""
+        round_num = self.round if round_num is None else round_num
+        return [(player_id, speech) for r, player_id, speech in self.speeches if r == round_num]
+    
+    def bump_version(self):
+        """标记状态已修改（直接修改回合、阶段或玩家存活状态后调用）"""
+        self.version += 1
+    
+    def render(self, key: str, renderer: Callable[["GameState"], str]) -> str:
+        """
+        渲染提示词片段，同一版本内的结果被缓存并在所有Agent之间共享
+        
+        Args:
+            key: 片段名称
+            renderer: 渲染函数（只能依赖游戏状态，不能依赖调用者）
+        
+        Returns:
+            渲染后的文本
+        """
+        cached = self._render_cache.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        text = renderer(self)
+        self._render_cache[key] = (self.version, text)
+        return text
     
     def check_game_over(self) -> Optional[Camp]:
         """检查游戏是否结束，返回获胜阵营"""
@@ -171,6 +214,12 @@ class AgentMemory:
         if len(self.observations) > 50:  # 保留最近50条
             self.observations = self.observations[-50:]
     
+    def add_strategy(self, strategy: str):
+        """添加策略（每轮思考的结论）"""
+        self.strategies.append(strategy)
+        if len(self.strategies) > 10:  # 保留最近10条
+            self.strategies = self.strategies[-10:]
+    
     def update_belief(self, target_id: int, belief: str):
         """更新对某玩家的判断"""
         self.beliefs[target_id] = belief
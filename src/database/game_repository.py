@@ -62,28 +62,39 @@ class GameRepository:
         return games[:limit]
     
     def delete_game(self, game_id: str) -> bool:
-        """删除游戏记录"""
+        """删除游戏记录（含回放）"""
         try:
-            game_file = self.games_dir / f"{game_id}.json"
-            if game_file.exists():
-                game_file.unlink()
+            for game_file in (self.games_dir / f"{game_id}.json", self.data_dir / "replays" / f"{game_id}.json"):
+                if game_file.exists():
+                    game_file.unlink()
             return True
         except Exception as e:
             print(f"[ERROR] Delete game error: {e}")
             return False
     
-    def save_game_replay(self, game_id: str, events: List[Dict]):
-        """保存游戏回放"""
+    def save_game_replay(self, game_id: str, events: List[Dict], game_data: Optional[Dict] = None):
+        """
+        保存游戏回放
+        
+        Args:
+            game_id: 游戏ID
+            events: 事件列表
+            game_data: Web 端的游戏数据（用于回收后重新加载，可选）
+        """
         try:
             replay_file = self.data_dir / "replays" / f"{game_id}.json"
             replay_file.parent.mkdir(parents=True, exist_ok=True)
             
+            replay = {
+                "game_id": game_id,
+                "events": events,
+                "saved_at": datetime.now().isoformat()
+            }
+            if game_data is not None:
+                replay["game_data"] = game_data
+            
             with open(replay_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "game_id": game_id,
-                    "events": events,
-                    "saved_at": datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
+                json.dump(replay, f, ensure_ascii=False, indent=2)
             return True
         except Exception as e:
             print(f"[ERROR] Save replay error: {e}")
@@ -91,12 +102,16 @@ class GameRepository:
     
     def load_game_replay(self, game_id: str) -> Optional[List[Dict]]:
         """加载游戏回放"""
+        data = self.load_replay_file(game_id)
+        return data.get("events", []) if data is not None else None
+    
+    def load_replay_file(self, game_id: str) -> Optional[Dict]:
+        """加载回放文件的全部内容（含 game_data）"""
         try:
             replay_file = self.data_dir / "replays" / f"{game_id}.json"
             if replay_file.exists():
                 with open(replay_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get("events", [])
+                    return json.load(f)
             return None
         except Exception as e:
             print(f"[ERROR] Load replay error: {e}")
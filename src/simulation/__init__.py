@@ -0,0 +1,12 @@
+"""
+批量模拟模块
+无界面运行大量对局，用于评估提示词和模型
+"""
+
+from .runner import SimulationRunner, SimulationOptions, play_game
+
+__all__ = [
+    'SimulationRunner',
+    'SimulationOptions',
+    'play_game',
+]
@@ -0,0 +1,305 @@
+"""
+无界面批量模拟
+不经过Web服务和SSE节奏控制，直接运行完整对局，用于评估提示词和模型改动
+
+- 多进程：每个工作进程运行自己的 asyncio 事件循环
+- 每个事件循环内并发运行多局游戏
+- 每局结果写入一行 JSONL（胜者、回合数、投票、淘汰、耗时），每局结束立即写入，
+  工作进程崩溃只丢失其正在运行的对局
+"""
+
+import asyncio
+import json
+import queue
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from multiprocessing import Manager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.agents import AgentFactory, collect_votes, start_round_thinking, cancel_round_thinking, start_history_summaries
+from src.agents.agent_factory import LLMFactory
+from src.core.event_system import EventSystem
+from src.core.game_engine import WerewolfGame
+from src.core.models import Role
+from src.utils.config import get_config
+from src.utils.rate_limiter import game_context
+
+
+@dataclass
+class SimulationOptions:
+    """模拟参数"""
+    num_players: int = 6
+    roles: Optional[Dict[str, int]] = None  # 角色 -> 人数（None 见 build_roles），总人数须等于 num_players
+    provider: Optional[str] = None
+    max_rounds: int = 10
+    concurrency: int = 8          # 每个工作进程内同时运行的对局数
+    vote_concurrency: int = 9     # 单局投票的最大并发数
+    round_thinking: bool = True   # 回合开始时所有Agent并发思考
+
+
+def default_roles(num_players: int) -> Dict[str, int]:
+    """
+    按玩家数生成默认角色配置（约三分之一狼人；6人起有女巫，9人起有猎人，其余为村民）
+
+    Args:
+        num_players: 玩家数
+
+    Returns:
+        角色 -> 人数
+
+    Raises:
+        ValueError: 玩家数少于4人
+    """
+    if num_players < 4:
+        raise ValueError(f"玩家数至少为4人: {num_players}")
+
+    roles = {"werewolf": num_players // 3, "seer": 1}
+    if num_players >= 6:
+        roles["witch"] = 1
+    if num_players >= 9:
+        roles["hunter"] = 1
+    roles["villager"] = num_players - sum(roles.values())
+    return roles
+
+
+def build_roles(roles: Optional[Dict[str, int]], num_players: int) -> List[Role]:
+    """
+    按角色配置展开角色列表
+
+    Args:
+        roles: 角色 -> 人数（None 时使用配置 game.roles；其总人数与玩家数不同时按玩家数生成默认配置）
+        num_players: 玩家数
+
+    Returns:
+        角色列表
+
+    Raises:
+        ValueError: 角色总人数与玩家数不一致，或角色名称无效
+    """
+    if roles is None:
+        roles = get_config().game_roles
+        if sum(roles.values()) != num_players:
+            roles = default_roles(num_players)
+    invalid = [role for role in roles if role not in Role._value2member_map_]
+    if invalid:
+        raise ValueError(f"未知角色: {', '.join(invalid)}（可选: {', '.join(r.value for r in Role)}）")
+    role_list = [Role(role) for role, count in roles.items() for _ in range(count)]
+    if len(role_list) != num_players:
+        raise ValueError(f"角色配置共 {len(role_list)} 人，与玩家数 {num_players} 不一致: {roles}")
+    return role_list
+
+
+async def play_game(game_index: int, options: SimulationOptions) -> Dict:
+    """
+    运行一局完整游戏
+
+    Args:
+        game_index: 对局编号
+        options: 模拟参数
+
+    Returns:
+        对局结果
+    """
+    started = time.perf_counter()
+    game = WerewolfGame(EventSystem())
+    game.setup_game(num_players=options.num_players, roles=build_roles(options.roles, options.num_players))
+
+    result = {
+        "game_index": game_index,
+        "game_id": game.game_id,
+        "roles": {p.id: p.role.value for p in game.state.players},
+        "winner": None,
+        "rounds": 0,
+        "votes": [],
+        "eliminations": [],
+        "timings": {"rounds": []},
+    }
+
+    # 本局的LLM调用（含思考、投票等子任务）都归属本局，调度器据此在各局之间轮转
+    with game_context(game.game_id):
+        try:
+            # 与Web对局一样经过调度器、连接池、路由和用量统计；创建失败只影响本局
+            llm = LLMFactory.get_game_llm(options.provider)
+            agents = AgentFactory.create_batch_agents(game.state.players, llm)
+
+            winner = None
+            while winner is None and game.state.round < options.max_rounds:
+                game.start_round()
+                round_no = game.state.round
+                thinking = start_round_thinking(agents, game.state) if options.round_thinking else []
+
+                # 讨论阶段：按座位顺序发言
+                speech_started = time.perf_counter()
+                for agent in agents:
+                    if not agent.player.is_alive:
+                        continue
+                    speech = ""
+                    async for chunk in agent.speak_stream(game.state):
+                        speech += chunk
+                    game.record_speech(agent.player.id, speech)
+                speech_seconds = time.perf_counter() - speech_started
+                cancel_round_thinking(thinking)
+
+                # 投票阶段：并发投票
+                vote_started = time.perf_counter()
+                votes = {}
+                async for agent, vote_to in collect_votes(agents, game.state, options.vote_concurrency):
+                    votes[agent.player.id] = vote_to
+                    game.record_vote(agent.player.id, vote_to)
+                    result["votes"].append({"round": round_no, "voter": agent.player.id, "target": vote_to})
+                vote_seconds = time.perf_counter() - vote_started
+
+                eliminated_id = game.tally_votes(votes)
+                if eliminated_id is not None:
+                    eliminated = game.state.get_player_by_id(eliminated_id)
+                    game.eliminate_player(eliminated_id, "投票")
+                    result["eliminations"].append({
+                        "round": round_no,
+                        "player_id": eliminated_id,
+                        "role": eliminated.role.value,
+                    })
+
+                result["timings"]["rounds"].append({
+                    "round": round_no,
+                    "speech_seconds": round(speech_seconds, 3),
+                    "vote_seconds": round(vote_seconds, 3),
+                })
+
+                start_history_summaries(agents)
+                winner = game.check_game_over()
+
+            result["winner"] = winner.value if winner else None
+            result["rounds"] = game.state.round
+
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+
+    result["timings"]["total_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def _play_batch(
+    game_indices: List[int],
+    options: SimulationOptions,
+    on_result: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    """
+    在一个事件循环中运行一批对局（同时最多 concurrency 局，一局结束立即开始下一局）
+
+    Args:
+        game_indices: 对局编号
+        options: 模拟参数
+        on_result: 每局结束时的回调（用于把结果立即交给主进程）
+    """
+    semaphore = asyncio.Semaphore(options.concurrency)
+
+    async def _play(index: int) -> Dict:
+        async with semaphore:
+            result = await play_game(index, options)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return await asyncio.gather(*(_play(index) for index in game_indices))
+
+
+def _run_batch(game_indices: List[int], options: SimulationOptions, results: queue.Queue) -> int:
+    """工作进程入口（每局结果放入结果队列，返回完成的对局数）"""
+    return len(asyncio.run(_play_batch(game_indices, options, results.put)))
+
+
+class SimulationRunner:
+    """批量模拟运行器"""
+
+    def __init__(
+        self,
+        num_games: int,
+        workers: int = 4,
+        output: Optional[str] = None,
+        options: Optional[SimulationOptions] = None
+    ):
+        """
+        初始化运行器
+
+        Args:
+            num_games: 对局总数
+            workers: 工作进程数
+            output: 结果文件路径（JSONL，默认 data/simulations/sim_<时间>.jsonl）
+            options: 模拟参数
+        """
+        self.num_games = num_games
+        self.workers = max(1, workers)
+        self.options = options or SimulationOptions()
+        # 在启动工作进程前检查角色配置
+        build_roles(self.options.roles, self.options.num_players)
+
+        if output is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output = f"data/simulations/sim_{timestamp}.jsonl"
+        self.output = Path(output)
+
+    def _batches(self) -> List[List[int]]:
+        """把对局平均分给各工作进程（每个进程一份，进程内由信号量保持 concurrency 局同时运行）"""
+        indices = list(range(self.num_games))
+        return [indices[i::self.workers] for i in range(min(self.workers, self.num_games))]
+
+    def run(self) -> Dict:
+        """
+        运行全部对局，每局结束立即写入 JSONL
+
+        Returns:
+            汇总统计（lost 为工作进程崩溃而没有结果的对局数）
+        """
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        summary = {"games": 0, "errors": 0, "lost": 0, "winners": {}}
+
+        print(f"🎲 开始模拟: {self.num_games} 局, {self.workers} 个进程, 每进程并发 {self.options.concurrency} 局")
+        print(f"   参数: {asdict(self.options)}")
+
+        def write(result: Dict):
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            f.flush()
+
+            summary["games"] += 1
+            if "error" in result:
+                summary["errors"] += 1
+            winner = result.get("winner") or "none"
+            summary["winners"][winner] = summary["winners"].get(winner, 0) + 1
+            print(f"   已完成 {summary['games']}/{self.num_games} 局")
+
+        with open(self.output, 'w', encoding='utf-8') as f, \
+                Manager() as manager, \
+                ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = manager.Queue()
+            futures = [pool.submit(_run_batch, batch, self.options, results) for batch in self._batches()]
+
+            while summary["games"] < self.num_games:
+                try:
+                    write(results.get(timeout=1.0))
+                except queue.Empty:
+                    if all(future.done() for future in futures):
+                        break
+
+            # 工作进程结束前放入队列的结果
+            while True:
+                try:
+                    write(results.get_nowait())
+                except queue.Empty:
+                    break
+
+            for future in futures:
+                error = future.exception()
+                if error is not None:
+                    print(f"❌ 工作进程异常退出: {type(error).__name__}: {error}")
+
+        summary["lost"] = self.num_games - summary["games"]
+        summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        summary["output"] = str(self.output)
+        print(f"✅ 模拟完成: {summary}")
+        return summary
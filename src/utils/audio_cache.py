@@ -0,0 +1,262 @@
+"""
+TTS音频缓存
+按内容寻址的持久化音频缓存
+
+- 缓存键是 (文本, 模型, 音色, 语速, 音高, 格式) 的稳定摘要（SHA-256），
+  进程重启后依然有效，不同文本也不会互相覆盖
+- 磁盘索引保存在缓存目录的 index.json 中；命中时更新的访问时间最多每 INDEX_SAVE_INTERVAL 秒写盘一次，
+  关闭时（flush）写入剩余的更新，重启后仍按访问顺序淘汰
+- 总大小超过上限时按最近最少使用（LRU）淘汰
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class AudioCache:
+    """持久化TTS音频缓存"""
+
+    INDEX_FILE = "index.json"
+    INDEX_SAVE_INTERVAL = 30.0  # 命中后保存索引的最短间隔（秒）
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（默认: assets/audio/cache）
+            max_bytes: 缓存总大小上限（字节）
+        """
+        if cache_dir is None:
+            cache_dir = Path(__file__).parent.parent.parent / "assets" / "audio" / "cache"
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        # TTS 在线程池中运行，索引需要加锁
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    # ==================== 缓存键 ====================
+
+    @staticmethod
+    def make_key(
+        text: str,
+        model: str,
+        voice: str,
+        speed: float = 1.0,
+        pitch: float = 1.0,
+        format: str = "wav"
+    ) -> str:
+        """
+        计算缓存键
+
+        Returns:
+            稳定的十六进制摘要
+        """
+        payload = json.dumps(
+            [text, model, voice, float(speed), float(pitch), format],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ==================== 索引 ====================
+
+    def _load_index(self):
+        """加载磁盘索引（丢弃文件已不存在的条目）"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 音频缓存索引损坏，重新建立: {e}")
+            return
+
+        # 按最近访问时间排序，恢复LRU顺序
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_access", 0)):
+            if (self.cache_dir / entry["file"]).exists():
+                self._index[key] = entry
+                self._total_bytes += entry.get("size", 0)
+
+    def _save_index(self):
+        """保存磁盘索引（调用方需持有锁）"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+
+    def flush(self):
+        """写入尚未保存的访问时间（服务关闭时调用）"""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def _evict(self):
+        """淘汰最近最少使用的条目直到低于上限（调用方需持有锁）"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, entry = self._index.popitem(last=False)
+            self._total_bytes -= entry.get("size", 0)
+            try:
+                (self.cache_dir / entry["file"]).unlink()
+            except FileNotFoundError:
+                pass
+
+    # ==================== 读写 ====================
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """
+        查找缓存文件
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            音频文件路径，未命中返回None
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            path = self.cache_dir / entry["file"]
+            if not path.exists():
+                del self._index[key]
+                self._total_bytes -= entry.get("size", 0)
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self._index.move_to_end(key)
+            self.hits += 1
+
+            # 访问顺序也要持久化，但不必每次命中都写盘
+            self._index_dirty = True
+            if time.monotonic() - self._index_saved_at >= self.INDEX_SAVE_INTERVAL:
+                try:
+                    self._save_index()
+                except OSError as e:
+                    print(f"⚠️ 音频缓存索引保存失败: {e}")
+            return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存的音频数据
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            音频数据，未命中返回None
+        """
+        path = self.get_path(key)
+        if path is None:
+            return None
+
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes, format: str = "wav") -> Path:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            data: 音频数据
+            format: 音频格式（用作文件扩展名）
+
+        Returns:
+            缓存文件路径
+        """
+        file_name = f"{key}.{format}"
+        path = self.cache_dir / file_name
+
+        # 每次写入使用独立的临时文件，并发写同一个键时不会互相踩踏
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            f.write(data)
+            tmp_path = f.name
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old.get("size", 0)
+
+            now = time.time()
+            self._index[key] = {
+                "file": file_name,
+                "size": len(data),
+                "created": now,
+                "last_access": now,
+            }
+            self._total_bytes += len(data)
+
+            self._evict()
+            self._save_index()
+
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# ==================== 全局实例 ====================
+
+_audio_cache: Optional[AudioCache] = None
+
+
+def flush_audio_cache():
+    """保存全局音频缓存的索引（缓存未创建时不做任何事）"""
+    if _audio_cache is not None:
+        _audio_cache.flush()
+
+
+def get_audio_cache() -> AudioCache:
+    """
+    获取全局音频缓存（单例模式）
+
+    Returns:
+        AudioCache 实例
+    """
+    global _audio_cache
+
+    if _audio_cache is None:
+        from src.utils.config import get_config
+        config = get_config()
+        _audio_cache = AudioCache(max_bytes=config.tts_cache_max_mb * 1024 * 1024)
+
+    return _audio_cache
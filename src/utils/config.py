@@ -67,7 +67,8 @@ class Config:
                 "num_players": 6,
                 "language": "zh",
                 "debug_mode": False,
-                "max_rounds": 10
+                "max_rounds": 10,
+                "vote_concurrency": 9
             },
             "llm": {
                 "provider": "modelscope",
@@ -78,11 +79,18 @@ class Config:
             },
             "tts": {
                 "enabled": True,
-                "provider": "dashscope"
+                "provider": "dashscope",
+                "max_workers": 8,
+                "cache_enabled": True,
+                "cache_max_mb": 512
             },
             "web": {
                 "host": "0.0.0.0",
-                "port": 8000
+                "port": 8000,
+                "stream_flush_ms": 250,
+                "stream_flush_bytes": 512,
+                "ws_queue_size": 256,
+                "ws_slow_consumer_policy": "drop_oldest"
             }
         }
     
@@ -99,6 +107,9 @@ class Config:
         if "DEBUG_MODE" in os.environ:
             self._config.setdefault("game", {})["debug_mode"] = os.getenv("DEBUG_MODE", "false").lower() == "true"
         
+        if "GAME_VOTE_CONCURRENCY" in os.environ:
+            self._config.setdefault("game", {})["vote_concurrency"] = int(os.getenv("GAME_VOTE_CONCURRENCY"))
+        
         # ============== LLM配置 ==============
         if "LLM_PROVIDER" in os.environ:
             self._config.setdefault("llm", {})["provider"] = os.getenv("LLM_PROVIDER")
@@ -156,6 +167,15 @@ class Config:
         if "TTS_PROVIDER" in os.environ:
             self._config.setdefault("tts", {})["provider"] = os.getenv("TTS_PROVIDER")
         
+        if "TTS_MAX_WORKERS" in os.environ:
+            self._config.setdefault("tts", {})["max_workers"] = int(os.getenv("TTS_MAX_WORKERS"))
+        
+        if "TTS_CACHE_ENABLED" in os.environ:
+            self._config.setdefault("tts", {})["cache_enabled"] = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+        
+        if "TTS_CACHE_MAX_MB" in os.environ:
+            self._config.setdefault("tts", {})["cache_max_mb"] = int(os.getenv("TTS_CACHE_MAX_MB"))
+        
         tts_providers = self._config.setdefault("tts", {}).setdefault("providers", {})
         
         # DashScope TTS
@@ -187,6 +207,35 @@ class Config:
         if "WEB_PORT" in os.environ:
             self._config.setdefault("web", {})["port"] = int(os.getenv("WEB_PORT"))
         
+        if "WEB_STREAM_FLUSH_MS" in os.environ:
+            self._config.setdefault("web", {})["stream_flush_ms"] = int(os.getenv("WEB_STREAM_FLUSH_MS"))
+        
+        if "WEB_STREAM_FLUSH_BYTES" in os.environ:
+            self._config.setdefault("web", {})["stream_flush_bytes"] = int(os.getenv("WEB_STREAM_FLUSH_BYTES"))
+        
+        if "WEB_WS_QUEUE_SIZE" in os.environ:
+            self._config.setdefault("web", {})["ws_queue_size"] = int(os.getenv("WEB_WS_QUEUE_SIZE"))
+        
+        if "WEB_WS_SLOW_CONSUMER_POLICY" in os.environ:
+            self._config.setdefault("web", {})["ws_slow_consumer_policy"] = os.getenv("WEB_WS_SLOW_CONSUMER_POLICY")
+        
+        if "WEB_GAME_IDLE_TTL" in os.environ:
+            self._config.setdefault("web", {})["game_idle_ttl"] = float(os.getenv("WEB_GAME_IDLE_TTL"))
+        
+        if "WEB_GAME_SWEEP_INTERVAL" in os.environ:
+            self._config.setdefault("web", {})["game_sweep_interval"] = float(os.getenv("WEB_GAME_SWEEP_INTERVAL"))
+        
+        if "LLM_ROUTING_ENABLED" in os.environ:
+            routing = self._config.setdefault("llm", {}).setdefault("routing", {})
+            routing["enabled"] = os.getenv("LLM_ROUTING_ENABLED").lower() == "true"
+        
+        if "LLM_ROUTING_BACKENDS" in os.environ:
+            routing = self._config.setdefault("llm", {}).setdefault("routing", {})
+            routing["backends"] = [b.strip() for b in os.getenv("LLM_ROUTING_BACKENDS").split(",") if b.strip()]
+        
+        if "SCHEDULER_ENABLED" in os.environ:
+            self._config.setdefault("scheduler", {})["enabled"] = os.getenv("SCHEDULER_ENABLED").lower() == "true"
+        
         if "CORS_ORIGINS" in os.environ:
             origins = os.getenv("CORS_ORIGINS", "*").split(",")
             self._config.setdefault("web", {})["cors_origins"] = origins
@@ -198,6 +247,19 @@ class Config:
         if "CACHE_TTL" in os.environ:
             self._config.setdefault("database", {})["cache_ttl"] = int(os.getenv("CACHE_TTL"))
         
+        # ============== Agent配置 ==============
+        if "AGENT_TURN_MODE" in os.environ:
+            self._config.setdefault("agent", {})["turn_mode"] = os.getenv("AGENT_TURN_MODE").lower() == "true"
+        
+        if "AGENT_HISTORY_MAX_TOKENS" in os.environ:
+            self._config.setdefault("agent", {}).setdefault("history", {})["max_tokens"] = int(os.getenv("AGENT_HISTORY_MAX_TOKENS"))
+        
+        if "AGENT_HISTORY_KEEP_TURNS" in os.environ:
+            self._config.setdefault("agent", {}).setdefault("history", {})["keep_turns"] = int(os.getenv("AGENT_HISTORY_KEEP_TURNS"))
+        
+        if "AGENT_ROUND_THINKING" in os.environ:
+            self._config.setdefault("agent", {})["round_thinking"] = os.getenv("AGENT_ROUND_THINKING").lower() == "true"
+        
         # ============== 日志配置 ==============
         if "LOG_LEVEL" in os.environ:
             self._config.setdefault("logging", {})["level"] = os.getenv("LOG_LEVEL")
@@ -234,6 +296,21 @@ class Config:
         """获取TTS提供商"""
         return self._config.get("tts", {}).get("provider", "dashscope")
     
+    @property
+    def tts_max_workers(self) -> int:
+        """获取TTS线程池大小（进程内TTS并发上限）"""
+        return self._config.get("tts", {}).get("max_workers", 8)
+    
+    @property
+    def tts_cache_enabled(self) -> bool:
+        """是否启用TTS音频缓存"""
+        return self._config.get("tts", {}).get("cache_enabled", True)
+    
+    @property
+    def tts_cache_max_mb(self) -> int:
+        """获取TTS音频缓存大小上限（MB）"""
+        return self._config.get("tts", {}).get("cache_max_mb", 512)
+    
     @property
     def web_host(self) -> str:
         """获取Web服务器主机"""
@@ -249,16 +326,90 @@ class Config:
         """获取CORS允许的源"""
         return self._config.get("web", {}).get("cors_origins", ["*"])
     
+    @property
+    def web_stream_flush_ms(self) -> int:
+        """获取发言帧合并的最长缓冲时间（毫秒）"""
+        return self._config.get("web", {}).get("stream_flush_ms", 250)
+    
+    @property
+    def web_stream_flush_bytes(self) -> int:
+        """获取发言帧合并的最大缓冲字节数"""
+        return self._config.get("web", {}).get("stream_flush_bytes", 512)
+    
+    @property
+    def web_ws_queue_size(self) -> int:
+        """获取每个WebSocket连接的发送队列上限（帧数）"""
+        return self._config.get("web", {}).get("ws_queue_size", 256)
+    
+    @property
+    def web_ws_slow_consumer_policy(self) -> str:
+        """获取WebSocket慢消费者策略（drop_oldest, disconnect）"""
+        return self._config.get("web", {}).get("ws_slow_consumer_policy", "drop_oldest")
+    
+    @property
+    def web_game_idle_ttl(self) -> float:
+        """获取游戏空闲回收时间（秒，超过后持久化到磁盘并释放内存，0 表示不回收）"""
+        return self._config.get("web", {}).get("game_idle_ttl", 1800)
+    
+    @property
+    def web_game_sweep_interval(self) -> float:
+        """获取空闲游戏扫描间隔（秒）"""
+        return self._config.get("web", {}).get("game_sweep_interval", 60)
+    
+    @property
+    def llm_routing(self) -> Dict[str, Any]:
+        """获取多提供商路由配置"""
+        return self._config.get("llm", {}).get("routing", {})
+    
+    @property
+    def scheduler_enabled(self) -> bool:
+        """是否启用提供商限流与公平调度"""
+        return self._config.get("scheduler", {}).get("enabled", True)
+    
+    @property
+    def agent_turn_mode(self) -> bool:
+        """是否启用回合模式（每轮一次调用同时生成思考、发言和预投票）"""
+        return self._config.get("agent", {}).get("turn_mode", False)
+    
+    @property
+    def agent_round_thinking(self) -> bool:
+        """是否在回合开始时为所有Agent并发进行后台思考"""
+        return self._config.get("agent", {}).get("round_thinking", True)
+    
+    @property
+    def agent_history(self) -> Dict[str, Any]:
+        """对话历史的token预算（max_tokens）和原样保留的轮数（keep_turns）"""
+        history = self._config.get("agent", {}).get("history", {})
+        return {
+            "max_tokens": history.get("max_tokens", 1500),
+            "keep_turns": history.get("keep_turns", 6),
+        }
+    
     @property
     def game_num_players(self) -> int:
         """获取游戏玩家数"""
         return self._config.get("game", {}).get("num_players", 6)
     
+    @property
+    def game_roles(self) -> Dict[str, int]:
+        """获取角色配置（角色 -> 人数）"""
+        return self._config.get("game", {}).get("roles", {
+            "werewolf": 2,
+            "villager": 2,
+            "seer": 1,
+            "witch": 1
+        })
+    
     @property
     def game_language(self) -> str:
         """获取游戏语言"""
         return self._config.get("game", {}).get("language", "zh")
     
+    @property
+    def game_vote_concurrency(self) -> int:
+        """获取单局游戏投票阶段的最大并发LLM调用数"""
+        return self._config.get("game", {}).get("vote_concurrency", 9)
+    
     @property
     def debug_mode(self) -> bool:
         """是否为调试模式"""
@@ -321,6 +472,34 @@ class Config:
         
         return config
     
+    def get_rate_limit(self, kind: str, provider: str) -> Dict[str, Any]:
+        """
+        获取提供商的限额配置
+        
+        Args:
+            kind: llm 或 tts
+            provider: 提供商名称
+        
+        Returns:
+            限额配置（requests_per_minute, tokens_per_minute, max_concurrency；
+            TTS 的 tokens_per_minute 按字符计），未配置时为空字典（不限流）
+        """
+        providers_config = self._config.get(kind, {}).get("providers", {})
+        return dict(providers_config.get(provider, {}).get("rate_limit") or {})
+    
+    def get_agent_profile(self, action: str) -> Dict[str, Any]:
+        """
+        获取Agent动作的生成参数
+        
+        Args:
+            action: 动作（think, speak, vote, turn）
+        
+        Returns:
+            生成参数（max_tokens, temperature, stop；speak 另有 max_sentences），未配置时为空字典
+        """
+        profiles = self._config.get("agent", {}).get("profiles", {})
+        return dict(profiles.get(action) or {})
+    
     def get_game_config(self) -> Dict[str, Any]:
         """获取游戏配置"""
         return self._config.get("game", {})
@@ -350,11 +529,11 @@ class Config:
         
         # 验证LLM配置
         llm_config = self.get_llm_config()
-        if not llm_config.get("api_key"):
+        if self.llm_provider != "fake" and not llm_config.get("api_key"):
             errors.append(f"LLM提供商 {self.llm_provider} 缺少 API Key")
         
         # 验证TTS配置（如果启用）
-        if self.tts_enabled:
+        if self.tts_enabled and self.tts_provider not in ("fake", "local"):
             tts_config = self.get_tts_config()
             if not tts_config.get("api_key"):
                 errors.append(f"TTS提供商 {self.tts_provider} 缺少 API Key")
@@ -0,0 +1,381 @@
+"""
+提供商限流与公平调度
+进程内所有 Agent 的 LLM 调用和 TTS 调用都经过同一个调度器
+
+- 每个提供商一组令牌桶：请求数/分钟、token数/分钟（TTS 按字符计），可选并发上限，配置见 rate_limit
+- 同一提供商的等待请求按优先级排队：实时发言 > 普通调用（投票） > 后台任务（思考、摘要）
+- 同一优先级内在各局游戏之间轮转，一局游戏的大量请求不会饿死其他游戏
+  （所属游戏取自调用上下文，见 game_context）
+- 令牌不足时排队等待而不是立即发出后被 429 拒绝，吞吐稳定在配额上限
+
+调用方式：
+    async with get_scheduler().slot("llm:modelscope", game_id, tokens=600) as slot:
+        ...
+        slot.record_tokens(actual_tokens)  # 可选：按实际用量修正
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Optional
+
+# 优先级（数值越小越优先）
+PRIORITY_LIVE = 0          # 实时发言（LLM 流式发言、TTS）
+PRIORITY_NORMAL = 1        # 普通调用（投票等）
+PRIORITY_BACKGROUND = 2    # 后台任务（思考、摘要）
+
+# 当前调用的优先级（由发起调用的任务设置，子任务继承）
+current_priority: ContextVar[int] = ContextVar("current_priority", default=PRIORITY_NORMAL)
+
+
+# 当前调用所属的游戏（由每局游戏的回合任务设置，子任务继承；用于各局游戏之间的公平轮转）
+current_game: ContextVar[Optional[str]] = ContextVar("current_game", default=None)
+
+
+@contextmanager
+def game_context(game_id: Optional[str]) -> Iterator[None]:
+    """
+    在代码块内设置调用所属的游戏
+
+    与 scheduling_priority 相同，只应包裹普通协程代码，代码块内创建的任务会继承该游戏。
+    """
+    token = current_game.set(game_id)
+    try:
+        yield
+    finally:
+        current_game.reset(token)
+
+
+@contextmanager
+def scheduling_priority(priority: int) -> Iterator[None]:
+    """
+    在代码块内设置调用优先级
+
+    只应包裹普通协程代码（不要跨越异步生成器的 yield），
+    代码块内创建的任务会继承该优先级。
+    """
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class TokenBucket:
+    """令牌桶"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        """
+        初始化令牌桶
+
+        Args:
+            rate_per_minute: 每分钟补充的令牌数
+            burst_seconds: 桶容量对应的时长（允许的突发量）
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """
+        取出 amount 个令牌需要等待的时间（秒）
+
+        请求量超过桶容量时，桶满即可放行（令牌数变为负值，由后续请求偿还）
+        """
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float):
+        """取出令牌（允许透支）"""
+        self._refill(now)
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        """修正用量（amount 为负数时追加扣除）"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Waiter:
+    """等待调度的请求"""
+
+    def __init__(self, game_id: str, priority: int, tokens: float):
+        self.game_id = game_id
+        self.priority = priority
+        self.tokens = tokens
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+
+
+class _Lane:
+    """单个提供商的令牌桶和等待队列"""
+
+    def __init__(self, key: str, limits: Dict[str, Any]):
+        self.key = key
+        rpm = limits.get("requests_per_minute")
+        tpm = limits.get("tokens_per_minute")
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = limits.get("max_concurrency") or None
+
+        # 优先级 -> (游戏ID -> 请求队列)，游戏按轮转顺序排列
+        self.queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {}
+        self.active = 0
+        self.wakeup = asyncio.Event()
+        self.dispatcher: Optional[asyncio.Task] = None
+
+        # 统计
+        self.granted = 0
+        self.waited_seconds = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.requests is None and self.tokens is None and self.max_concurrency is None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for games in self.queues.values() for q in games.values())
+
+    def push(self, waiter: _Waiter):
+        games = self.queues.setdefault(waiter.priority, OrderedDict())
+        games.setdefault(waiter.game_id, deque()).append(waiter)
+        self.wakeup.set()
+
+    def peek(self) -> Optional[_Waiter]:
+        """下一个应当放行的请求：最高优先级中，轮转到的游戏的最早请求"""
+        for priority in sorted(self.queues):
+            games = self.queues[priority]
+            for game_id in list(games):
+                queue = games[game_id]
+                while queue and queue[0].future.done():
+                    queue.popleft()  # 已取消
+                if queue:
+                    return queue[0]
+                del games[game_id]
+        return None
+
+    def pop(self, waiter: _Waiter):
+        """放行请求，并把该游戏移到本优先级的队尾"""
+        games = self.queues[waiter.priority]
+        queue = games[waiter.game_id]
+        queue.popleft()
+        if queue:
+            games.move_to_end(waiter.game_id)
+        else:
+            del games[waiter.game_id]
+
+    def delay(self, waiter: _Waiter, now: float) -> float:
+        delays = [0.0]
+        if self.requests is not None:
+            delays.append(self.requests.delay(1, now))
+        if self.tokens is not None:
+            delays.append(self.tokens.delay(waiter.tokens, now))
+        return max(delays)
+
+    def take(self, waiter: _Waiter, now: float):
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(waiter.tokens, now)
+
+
+class Slot:
+    """已获得的调用名额"""
+
+    def __init__(self, scheduler: "FairScheduler", lane: Optional[_Lane], tokens: float):
+        self._scheduler = scheduler
+        self._lane = lane
+        self._tokens = tokens
+
+    def record_tokens(self, actual: float):
+        """按实际用量修正令牌桶（预估偏高时退回，偏低时追加扣除）"""
+        if self._lane is not None and self._lane.tokens is not None and actual:
+            self._lane.tokens.give_back(self._tokens - actual)
+            self._tokens = actual
+
+    def release(self):
+        """释放名额（只释放一次）"""
+        if self._scheduler is not None:
+            self._scheduler._release(self._lane)
+            self._scheduler = None
+
+
+class FairScheduler:
+    """进程级公平调度器"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None, enabled: bool = True):
+        """
+        初始化调度器
+
+        Args:
+            limits: 提供商键（llm:<provider>, tts:<provider>）-> 限额配置；
+                    为None时从配置文件读取各提供商的 rate_limit
+            enabled: 是否启用（关闭时所有调用直接放行）
+        """
+        self.enabled = enabled
+        self._limits = limits
+        self._lanes: Dict[str, _Lane] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_limits(self, key: str) -> Dict[str, Any]:
+        if self._limits is not None:
+            return self._limits.get(key, {})
+        from src.utils.config import get_config
+        kind, _, provider = key.partition(":")
+        return get_config().get_rate_limit(kind, provider)
+
+    def _get_lane(self, key: str) -> Optional[_Lane]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 新的事件循环（例如再次 asyncio.run），旧的等待队列已失效
+            self._lanes.clear()
+            self._loop = loop
+
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = _Lane(key, self._get_limits(key))
+            self._lanes[key] = lane
+        return None if lane.unlimited else lane
+
+    async def acquire(
+        self,
+        key: str,
+        game_id: Optional[str] = None,
+        priority: Optional[int] = None,
+        tokens: float = 0
+    ) -> Slot:
+        """
+        等待调用名额
+
+        Args:
+            key: 提供商键（llm:<provider>, tts:<provider>）
+            game_id: 发起调用的游戏（用于公平轮转）
+            priority: 优先级（None 表示使用当前上下文的优先级）
+            tokens: 预估用量（LLM 为 token 数，TTS 为字符数）
+
+        Returns:
+            调用名额（调用结束后必须 release，推荐使用 slot() 的 async with 写法）
+        """
+        lane = self._get_lane(key) if self.enabled else None
+        if lane is None:
+            return Slot(self, None, tokens)
+
+        waiter = _Waiter(game_id or "", current_priority.get() if priority is None else priority, tokens)
+        lane.push(waiter)
+        if lane.dispatcher is None or lane.dispatcher.done():
+            lane.dispatcher = asyncio.create_task(self._dispatch(lane))
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已被放行但调用方被取消：归还并发名额
+                self._release(lane)
+            raise
+
+        return Slot(self, lane, tokens)
+
+    def slot(self, key: str, game_id: Optional[str] = None, priority: Optional[int] = None, tokens: float = 0):
+        """acquire 的 async with 写法"""
+        return _SlotContext(self, key, game_id, priority, tokens)
+
+    def _release(self, lane: Optional[_Lane]):
+        if lane is not None:
+            lane.active -= 1
+            lane.wakeup.set()
+
+    async def _dispatch(self, lane: _Lane):
+        """按优先级和游戏轮转依次放行请求，令牌不足时等待补充"""
+        while True:
+            lane.wakeup.clear()
+            waiter = lane.peek()
+            if waiter is None:
+                lane.dispatcher = None
+                return
+
+            if lane.max_concurrency is not None and lane.active >= lane.max_concurrency:
+                await lane.wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            delay = lane.delay(waiter, now)
+            if delay > 0:
+                # 等待令牌补充；期间有新请求（可能优先级更高）到达时重新选择
+                try:
+                    await asyncio.wait_for(lane.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            lane.pop(waiter)
+            lane.take(waiter, now)
+            lane.active += 1
+            waited = now - waiter.enqueued
+            lane.granted += 1
+            lane.waited_seconds += waited
+            lane.max_wait = max(lane.max_wait, waited)
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "enabled": self.enabled,
+            "lanes": {
+                key: {
+                    "queued": lane.queued,
+                    "active": lane.active,
+                    "granted": lane.granted,
+                    "avg_wait": round(lane.waited_seconds / lane.granted, 3) if lane.granted else 0.0,
+                    "max_wait": round(lane.max_wait, 3),
+                }
+                for key, lane in self._lanes.items()
+                if not lane.unlimited
+            },
+        }
+
+
+class _SlotContext:
+    """async with scheduler.slot(...) 的上下文"""
+
+    def __init__(self, scheduler: FairScheduler, key: str, game_id: Optional[str], priority: Optional[int], tokens: float):
+        self._scheduler = scheduler
+        self._args = (key, game_id, priority, tokens)
+        self._slot: Optional[Slot] = None
+
+    async def __aenter__(self) -> Slot:
+        self._slot = await self._scheduler.acquire(*self._args)
+        return self._slot
+
+    async def __aexit__(self, *exc_info):
+        self._slot.release()
+
+
+# ==================== 全局实例 ====================
+
+_scheduler: Optional[FairScheduler] = None
+
+
+def get_scheduler() -> FairScheduler:
+    """
+    获取全局调度器（单例模式）
+
+    Returns:
+        FairScheduler 实例
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        from src.utils.config import get_config
+        _scheduler = FairScheduler(enabled=get_config().scheduler_enabled)
+
+    return _scheduler
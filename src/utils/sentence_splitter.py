@@ -0,0 +1,146 @@
+"""
+增量分句工具
+在LLM流式输出的同时识别句子边界，用于边生成边合成语音
+"""
+
+from typing import List
+
+# 句末标点
+SENTENCE_ENDINGS = "。！？.!?"
+
+# 可以跟在句末标点后面、仍属于同一句的字符（连续标点、右引号/括号）
+TRAILING_CHARS = SENTENCE_ENDINGS + "”’\"'）)」』…"
+
+
+class SentenceSplitter:
+    """
+    增量分句器
+
+    逐块输入文本，一旦确认某句已完整就立即返回。
+    句末标点位于缓冲区末尾时暂不切分，等待后续文本确认
+    （避免把 "！！" 或 "3.5" 这类情况切断）。
+    """
+
+    def __init__(self, min_length: int = 4):
+        """
+        初始化分句器
+
+        Args:
+            min_length: 最短句子长度，过短的句子与下一句合并，减少TTS请求次数
+        """
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        输入一段文本
+
+        Args:
+            text: 新到达的文本块
+
+        Returns:
+            本次确认完整的句子列表
+        """
+        self._buffer += text
+        buffer = self._buffer
+        sentences = []
+        start = 0
+        i = 0
+
+        while i < len(buffer):
+            if buffer[i] not in SENTENCE_ENDINGS:
+                i += 1
+                continue
+
+            end = i + 1
+            while end < len(buffer) and buffer[end] in TRAILING_CHARS:
+                end += 1
+
+            # 标点在末尾，等待后续文本
+            if end == len(buffer):
+                break
+
+            # 小数点（如 3.5）不是句子边界
+            if buffer[i] == "." and i > 0 and buffer[i - 1].isdigit() and buffer[end].isdigit():
+                i = end
+                continue
+
+            sentence = buffer[start:end].strip()
+            if len(sentence) >= self.min_length:
+                sentences.append(sentence)
+                start = end
+            i = end
+
+        self._buffer = buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """
+        结束输入，返回缓冲区中剩余的文本
+
+        Returns:
+            剩余文本（可能为空字符串）
+        """
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest
+
+
+def split_sentences(text: str, min_length: int = 1) -> List[str]:
+    """
+    将完整文本按句子切分
+
+    Args:
+        text: 文本
+        min_length: 最短句子长度
+
+    Returns:
+        句子列表
+    """
+    splitter = SentenceSplitter(min_length=min_length)
+    sentences = splitter.feed(text)
+    rest = splitter.flush()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+def find_sentence_end(text: str, count: int) -> int:
+    """
+    查找第 count 句结束的位置（用于按句数截断流式输出）
+
+    与 SentenceSplitter 相同：句末标点后必须已经出现后续文本才算确认，
+    连续标点和右引号/括号属于同一句，小数点不是句子边界。
+
+    Args:
+        text: 已生成的文本
+        count: 句子数
+
+    Returns:
+        第 count 句（含句末标点）之后的下标，尚未确认时返回 -1
+    """
+    found = 0
+    i = 0
+
+    while i < len(text):
+        if text[i] not in SENTENCE_ENDINGS:
+            i += 1
+            continue
+
+        end = i + 1
+        while end < len(text) and text[end] in TRAILING_CHARS:
+            end += 1
+
+        if end == len(text):
+            return -1
+
+        if text[i] == "." and i > 0 and text[i - 1].isdigit() and text[end].isdigit():
+            i = end
+            continue
+
+        found += 1
+        if found >= count:
+            return end
+        i = end
+
+    return -1
@@ -0,0 +1,182 @@
+"""
+TTS执行器
+DashScope SDK 的调用都是同步阻塞的，直接在协程中调用会阻塞整个事件循环。
+
+TTSExecutor 把这些调用放到有界线程池中执行：
+- 线程数即进程级的TTS并发上限
+- 流式调用在工作线程中迭代，音频块通过 asyncio.Queue 回传给协程
+- 提供排队深度等指标，用于评估线程池大小
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, Optional
+
+# 工作线程回传的消息类型
+_ITEM = "item"
+_DONE = "done"
+_ERROR = "error"
+
+
+class TTSExecutor:
+    """有界TTS线程池"""
+
+    def __init__(self, max_workers: int = 8):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 工作线程数（进程内同时进行的TTS调用上限）
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._peak_queued = 0
+
+    # ==================== 指标 ====================
+
+    def _on_submit(self):
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+    def _on_start(self):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+
+    def _on_finish(self, failed: bool):
+        with self._lock:
+            self._active -= 1
+            self._completed += 1
+            if failed:
+                self._failed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """等待空闲线程的任务数"""
+        return self._queued
+
+    def stats(self) -> Dict[str, int]:
+        """获取执行器指标"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "peak_queued": self._peak_queued,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    # ==================== 执行 ====================
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在线程池中执行阻塞调用
+
+        Args:
+            fn: 同步函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        call = functools.partial(fn, *args, **kwargs)
+
+        def job():
+            self._on_start()
+            failed = True
+            try:
+                result = call()
+                failed = False
+                return result
+            finally:
+                self._on_finish(failed)
+
+        self._on_submit()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, job)
+
+    async def iterate(self, fn: Callable[..., Iterable[Any]], *args, **kwargs) -> AsyncGenerator[Any, None]:
+        """
+        在线程池中迭代阻塞的流式调用，逐项异步产出
+
+        Args:
+            fn: 返回同步迭代器的函数（在工作线程中调用）
+            *args, **kwargs: 函数参数
+
+        Yields:
+            迭代器产出的每一项
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(kind: str, value: Any = None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+            except RuntimeError:
+                # 事件循环已关闭
+                stopped.set()
+
+        def job():
+            self._on_start()
+            failed = True
+            try:
+                for item in fn(*args, **kwargs):
+                    if stopped.is_set():
+                        break
+                    put(_ITEM, item)
+                failed = False
+                put(_DONE)
+            except BaseException as e:
+                put(_ERROR, e)
+            finally:
+                self._on_finish(failed)
+
+        self._on_submit()
+        loop.run_in_executor(self._executor, job)
+
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == _DONE:
+                    break
+                if kind == _ERROR:
+                    raise value
+                yield value
+        finally:
+            # 消费方提前退出时通知工作线程停止
+            stopped.set()
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+
+# ==================== 全局实例 ====================
+
+_tts_executor: Optional[TTSExecutor] = None
+
+
+def get_tts_executor() -> TTSExecutor:
+    """
+    获取全局 TTS 执行器（单例模式）
+
+    Returns:
+        TTSExecutor 实例
+    """
+    global _tts_executor
+
+    if _tts_executor is None:
+        from src.utils.config import get_config
+        _tts_executor = TTSExecutor(max_workers=get_config().tts_max_workers)
+
+    return _tts_executor
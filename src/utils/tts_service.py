@@ -10,6 +10,10 @@ from typing import Optional
 import httpx
 from pathlib import Path
 
+from .sentence_splitter import split_sentences
+from .audio_cache import AudioCache, get_audio_cache
+from .config import get_config
+
 
 class TTSService:
     """语音合成服务类"""
@@ -35,7 +39,10 @@ class TTSService:
         # 音频输出目录
         self.output_dir = Path(__file__).parent.parent.parent / "assets" / "audio"
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        # 按内容寻址的缓存：同样的文本和音色只合成一次
+        self.cache = get_audio_cache() if get_config().tts_cache_enabled else None
+
         print(f"🔊 TTS服务初始化: 模型={self.model}, 音色={self.voice}")
         print(f"   API 端点: {self.api_base}")
     
@@ -53,6 +60,12 @@ class TTSService:
         if not text or not self.api_key:
             return None
         
+        cache_key = AudioCache.make_key(text, self.model, self.voice, format="wav")
+        if self.cache is not None:
+            cached_path = self.cache.get_path(cache_key)
+            if cached_path is not None:
+                return str(cached_path)
+        
         try:
             # 准备请求
             headers = {
@@ -103,13 +116,9 @@ class TTSService:
                         audio_response = await client.get(audio_url)
                         
                         if audio_response.status_code == 200:
-                            file_name = f"speech_{player_id}_{hash(text) % 100000}.wav"
-                            file_path = self.output_dir / file_name
+                            file_path = self._save_audio(cache_key, audio_response.content, player_id)
                             
-                            with open(file_path, "wb") as f:
-                                f.write(audio_response.content)
-                            
-                            print(f"✅ 语音生成成功: {file_name}")
+                            print(f"✅ 语音生成成功: {file_path.name}")
                             return str(file_path)
                     
                     # 方式2: 返回 base64 编码的音频
@@ -120,13 +129,9 @@ class TTSService:
                         else:
                             audio_bytes = audio_data
                         
-                        file_name = f"speech_{player_id}_{hash(text) % 100000}.wav"
-                        file_path = self.output_dir / file_name
-                        
-                        with open(file_path, "wb") as f:
-                            f.write(audio_bytes)
+                        file_path = self._save_audio(cache_key, audio_bytes, player_id)
                         
-                        print(f"✅ 语音生成成功: {file_name}")
+                        print(f"✅ 语音生成成功: {file_path.name}")
                         return str(file_path)
                 
                 print(f"⚠️ TTS 响应中没有音频数据")
@@ -137,6 +142,16 @@ class TTSService:
             print(f"❌ TTS 生成失败: {e}")
             return None
     
+    def _save_audio(self, cache_key: str, audio_data: bytes, player_id: Optional[int] = None) -> Path:
+        """保存音频（启用缓存时写入缓存，否则写入输出目录）"""
+        if self.cache is not None:
+            return self.cache.put(cache_key, audio_data, "wav")
+        
+        file_path = self.output_dir / f"speech_{player_id}_{cache_key[:16]}.wav"
+        with open(file_path, 'wb') as f:
+            f.write(audio_data)
+        return file_path
+    
     async def text_to_speech_stream(self, text: str, player_id: Optional[int] = None):
         """
         流式文本转语音（当文本较长时分段处理）
@@ -149,16 +164,7 @@ class TTSService:
             音频文件路径
         """
         # 将长文本分段（按句子分）
-        import re
-        sentences = re.split(r'([。！？.!?])', text)
-        
-        # 重新组合句子和标点
-        segments = []
-        for i in range(0, len(sentences) - 1, 2):
-            if i + 1 < len(sentences):
-                segments.append(sentences[i] + sentences[i + 1])
-            else:
-                segments.append(sentences[i])
+        segments = split_sentences(text)
         
         # 如果没有分段，直接处理整个文本
         if not segments:
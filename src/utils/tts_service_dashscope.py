@@ -8,9 +8,22 @@
 import os
 import asyncio
 import base64
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from pathlib import Path
 
+from src.utils.tts_executor import get_tts_executor
+from src.utils.audio_cache import AudioCache, get_audio_cache
+
+# 旧模型（非流式，作为回退）
+LEGACY_TTS_MODEL = "sambert-zhichu-v1"
+
+# 音色映射（新模型音色 -> 旧模型音色）
+LEGACY_VOICE_MAPPING = {
+    "Cherry": "zhixiaobai",
+    "Bella": "zhixiaoxia",
+    "Amy": "zhiyan",
+}
+
 try:
     import dashscope
     from dashscope.audio.tts import SpeechSynthesizer
@@ -51,8 +64,10 @@ class DashScopeTTSService:
             from src.utils.config import get_config
             config = get_config()
             tts_config = config.get_tts_config("dashscope")
+            cache_enabled = config.tts_cache_enabled
         else:
             tts_config = {}
+            cache_enabled = False
         
         # 参数优先级：传入参数 > 配置文件 > 默认值
         self.api_key = api_key or tts_config.get("api_key", "")
@@ -77,6 +92,9 @@ class DashScopeTTSService:
         self.output_dir = Path(__file__).parent.parent.parent / "assets" / "audio"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # 持久化音频缓存（相同文本和音色只合成一次）
+        self.cache: Optional[AudioCache] = get_audio_cache() if cache_enabled else None
+        
         print(f"🔊 DashScope TTS服务初始化:")
         print(f"   模型: {self.model}")
         print(f"   音色: {self.voice}")
@@ -109,39 +127,32 @@ class DashScopeTTSService:
         
         # 使用传入的参数或默认参数
         voice = voice or self.voice
-        speed = speed if speed is not None else self.speed
-        pitch = pitch if pitch is not None else self.pitch
         
+        # SDK 调用是阻塞的，放到TTS线程池中执行
+        return await get_tts_executor().run(self._text_to_speech_sync, text, player_id, voice)
+    
+    def _text_to_speech_sync(self, text: str, player_id: Optional[int], voice: str) -> Optional[str]:
+        """同步生成语音文件（在TTS线程池中运行）"""
         try:
-            # 生成文件名
-            file_name = f"speech_{player_id}_{hash(text) % 100000}.{self.format}"
-            file_path = self.output_dir / file_name
+            cache_key = self._cache_key(text, self.model, voice)
+            cached_path = self._cached_path(cache_key)
+            if cached_path is not None:
+                print(f"✅ 语音缓存命中: {cached_path.name}")
+                return str(cached_path)
             
             # 使用配置的 TTS 模型
             try:
-                response = dashscope.MultiModalConversation.call(
-                    api_key=self.api_key,
-                    model=self.model,
-                    text=text,
-                    voice=voice,
-                    language_type="Chinese",
-                    stream=True
-                )
-                
                 # 收集所有音频数据
-                audio_chunks = []
-                for chunk in response:
-                    if hasattr(chunk.output, 'audio') and chunk.output.audio.data is not None:
-                        wav_bytes = base64.b64decode(chunk.output.audio.data)
-                        audio_chunks.append(wav_bytes)
+                audio_chunks = [
+                    base64.b64decode(audio_data)
+                    for audio_data in self._iter_stream_audio(text, voice)
+                ]
                 
                 if audio_chunks:
                     # 合并并保存音频
-                    complete_audio = b''.join(audio_chunks)
-                    with open(file_path, 'wb') as f:
-                        f.write(complete_audio)
+                    file_path = self._save_audio(cache_key, b''.join(audio_chunks), player_id)
                     
-                    print(f"✅ 语音生成成功 ({self.model}): {file_name}")
+                    print(f"✅ 语音生成成功 ({self.model}): {file_path.name}")
                     return str(file_path)
                 else:
                     print(f"⚠️ {self.model} 生成失败，尝试旧模型")
@@ -151,36 +162,99 @@ class DashScopeTTSService:
                 # 如果新 API 失败，回退到旧模型 (SpeechSynthesizer)
                 print(f"⚠️ {self.model} 失败 ({e})，使用旧模型")
                 
-                # 音色映射（新模型音色 -> 旧模型音色）
-                voice_mapping = {
-                    "Cherry": "zhixiaobai",
-                    "Bella": "zhixiaoxia",
-                    "Amy": "zhiyan",
-                }
-                old_voice = voice_mapping.get(voice, "zhixiaobai")
+                legacy_voice = LEGACY_VOICE_MAPPING.get(voice, "zhixiaobai")
+                legacy_key = self._cache_key(text, LEGACY_TTS_MODEL, legacy_voice)
+                cached_path = self._cached_path(legacy_key)
+                if cached_path is not None:
+                    return str(cached_path)
                 
-                result = SpeechSynthesizer.call(
-                    model='sambert-zhichu-v1',
-                    text=text,
-                    sample_rate=self.sample_rate,
-                    format=self.format,
-                    voice=old_voice
-                )
-                
-                if result.get_audio_data() is not None:
-                    with open(file_path, 'wb') as f:
-                        f.write(result.get_audio_data())
-                    
-                    print(f"✅ 语音生成成功 (旧模型): {file_name}")
-                    return str(file_path)
-                else:
-                    print(f"⚠️ TTS 生成失败: {result}")
+                audio_data = self._call_legacy_model(text, legacy_voice)
+                if audio_data is None:
                     return None
+                
+                file_path = self._save_audio(legacy_key, audio_data, player_id)
+                print(f"✅ 语音生成成功 (旧模型): {file_path.name}")
+                return str(file_path)
         
         except Exception as e:
             print(f"❌ TTS 生成失败: {e}")
             return None
     
+    def _cache_key(self, text: str, model: str, voice: str) -> str:
+        """计算音频的内容摘要（稳定，不随进程变化）"""
+        return AudioCache.make_key(text, model, voice, self.speed, self.pitch, self.format)
+    
+    def _cached_path(self, cache_key: str) -> Optional[Path]:
+        """查找缓存的音频文件"""
+        if self.cache is None:
+            return None
+        return self.cache.get_path(cache_key)
+    
+    def _cached_bytes(self, cache_key: str) -> Optional[bytes]:
+        """读取缓存的音频数据"""
+        if self.cache is None:
+            return None
+        return self.cache.get_bytes(cache_key)
+    
+    def _save_audio(self, cache_key: str, audio_data: bytes, player_id: Optional[int] = None) -> Path:
+        """保存音频（启用缓存时写入缓存，否则写入输出目录）"""
+        if self.cache is not None:
+            return self.cache.put(cache_key, audio_data, self.format)
+        
+        file_path = self.output_dir / f"speech_{player_id}_{cache_key[:16]}.{self.format}"
+        with open(file_path, 'wb') as f:
+            f.write(audio_data)
+        return file_path
+    
+    async def _save_to_cache(self, cache_key: str, audio_data: bytes, player_id: Optional[int] = None):
+        """在后台线程写入缓存（写入失败只记录日志，不影响已经发出的音频）"""
+        if self.cache is None:
+            return
+        try:
+            await asyncio.to_thread(self._save_audio, cache_key, audio_data, player_id)
+        except Exception as e:
+            print(f"⚠️ 音频缓存写入失败: {e}")
+    
+    def _iter_stream_audio(self, text: str, voice: str) -> Iterator[str]:
+        """
+        调用流式 TTS 模型（阻塞，需在TTS线程池中迭代）
+        
+        Yields:
+            音频数据块（base64编码的字符串）
+        """
+        response = dashscope.MultiModalConversation.call(
+            api_key=self.api_key,
+            model=self.model,
+            text=text,
+            voice=voice,
+            language_type="Chinese",
+            stream=True
+        )
+        
+        for chunk in response:
+            if hasattr(chunk.output, 'audio') and chunk.output.audio.data is not None:
+                yield chunk.output.audio.data
+    
+    def _call_legacy_model(self, text: str, legacy_voice: str) -> Optional[bytes]:
+        """
+        调用旧模型 SpeechSynthesizer（阻塞，非流式）
+        
+        Returns:
+            完整音频数据，失败返回None
+        """
+        result = SpeechSynthesizer.call(
+            model=LEGACY_TTS_MODEL,
+            text=text,
+            sample_rate=self.sample_rate,
+            format=self.format,
+            voice=legacy_voice
+        )
+        
+        audio_data = result.get_audio_data()
+        if audio_data is None:
+            print(f"⚠️ TTS 生成失败: {result}")
+        return audio_data
+    
     async def text_to_speech_stream(
         self, 
         text: str, 
@@ -190,7 +264,7 @@ class DashScopeTTSService:
         pitch: Optional[float] = None
     ):
         """
-        流式生成语音（生成完整音频后返回）
+        流式生成语音
         
         Args:
             text: 要转换的文本
@@ -202,96 +276,110 @@ class DashScopeTTSService:
         Yields:
             音频数据块（base64编码的字符串）
         """
+        async for audio_bytes in self.audio_stream(text, player_id, voice, speed, pitch):
+            yield base64.b64encode(audio_bytes).decode('utf-8')
+    
+    async def audio_stream(
+        self, 
+        text: str, 
+        player_id: Optional[int] = None,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        pitch: Optional[float] = None
+    ):
+        """
+        流式生成语音（原始音频数据）
+        
+        SDK 调用在TTS线程池中进行，音频块通过队列逐块返回，不阻塞事件循环。
+        已合成过的文本直接从缓存返回完整音频，不调用API。
+        
+        Args:
+            text: 要转换的文本
+            player_id: 玩家ID
+            voice: 音色（可选，覆盖默认音色）
+            speed: 语速（可选，覆盖默认语速）
+            pitch: 音高（可选，覆盖默认音高）
+        
+        Yields:
+            音频数据块（bytes）
+        """
         if not text or not self.api_key:
             return
         
         # 使用传入的参数或默认参数
         voice = voice or self.voice
-        speed = speed if speed is not None else self.speed
-        pitch = pitch if pitch is not None else self.pitch
+        
+        executor = get_tts_executor()
         
         try:
+            cache_key = self._cache_key(text, self.model, voice)
+            cached_audio = await asyncio.to_thread(self._cached_bytes, cache_key)
+            if cached_audio is not None:
+                print(f"✅ 语音缓存命中: 玩家{player_id}, {len(cached_audio)} bytes")
+                yield cached_audio
+                return
+            
             print(f"🎵 开始TTS生成: 玩家{player_id}, 文本长度={len(text)}, 音色={voice}")
             
             # 使用配置的 TTS 模型
+            chunk_count = 0
+            total_bytes = 0
+            first_chunk = True
+            audio_parts = []
             try:
-                response = dashscope.MultiModalConversation.call(
-                    api_key=self.api_key,
-                    model=self.model,
-                    text=text,
-                    voice=voice,
-                    language_type="Chinese",
-                    stream=True
-                )
-                
                 # 真正的流式：逐块返回音频数据（不等待全部完成）
-                chunk_count = 0
-                total_bytes = 0
-                first_chunk = True
-                
-                for chunk in response:
-                    if hasattr(chunk.output, 'audio') and chunk.output.audio.data is not None:
-                        # 直接返回每个音频块（已经是 base64 编码）
-                        audio_chunk_base64 = chunk.output.audio.data
-                        audio_bytes = base64.b64decode(audio_chunk_base64)
+                async for audio_chunk_base64 in executor.iterate(self._iter_stream_audio, text, voice):
+                    # API 返回 base64，只在这里解码一次
+                    audio_bytes = base64.b64decode(audio_chunk_base64)
+                    
+                    # 检测第一个块的音频格式
+                    if first_chunk and len(audio_bytes) >= 8:
+                        magic_bytes = ' '.join([f'{b:02x}' for b in audio_bytes[:8]])
+                        print(f"🔍 音频格式检测 (玩家{player_id}): 前8字节={magic_bytes}")
                         
-                        # 检测第一个块的音频格式
-                        if first_chunk and len(audio_bytes) >= 8:
-                            magic_bytes = ' '.join([f'{b:02x}' for b in audio_bytes[:8]])
-                            print(f"🔍 音频格式检测 (玩家{player_id}): 前8字节={magic_bytes}")
-                            
-                            # 检测格式
-                            if audio_bytes[:4] == b'RIFF':
-                                print(f"✅ 检测到 WAV 格式")
-                            elif audio_bytes[:3] == b'ID3' or (audio_bytes[0] == 0xFF and (audio_bytes[1] & 0xE0) == 0xE0):
-                                print(f"✅ 检测到 MP3 格式")
-                            elif audio_bytes[:4] == b'OggS':
-                                print(f"✅ 检测到 OGG 格式")
-                            else:
-                                print(f"⚠️ 未知音频格式")
-                            
-                            first_chunk = False
+                        # 检测格式
+                        if audio_bytes[:4] == b'RIFF':
+                            print(f"✅ 检测到 WAV 格式")
+                        elif audio_bytes[:3] == b'ID3' or (audio_bytes[0] == 0xFF and (audio_bytes[1] & 0xE0) == 0xE0):
+                            print(f"✅ 检测到 MP3 格式")
+                        elif audio_bytes[:4] == b'OggS':
+                            print(f"✅ 检测到 OGG 格式")
+                        else:
+                            print(f"⚠️ 未知音频格式")
                         
-                        chunk_count += 1
-                        total_bytes += len(audio_bytes)
-                        yield audio_chunk_base64
-                        print(f"📦 发送音频块 #{chunk_count} (玩家{player_id}): {len(audio_bytes)} bytes")
-                        await asyncio.sleep(0)  # 让出控制权
-                
-                if chunk_count > 0:
-                    print(f"✅ TTS生成完成 ({self.model}): 玩家{player_id}, 共{chunk_count}块, 总大小={total_bytes} bytes")
-                else:
-                    print(f"⚠️ {self.model} 生成失败，尝试旧模型")
-                    raise Exception("No audio data")
-            
+                        first_chunk = False
+                    
+                    chunk_count += 1
+                    total_bytes += len(audio_bytes)
+                    audio_parts.append(audio_bytes)
+                    yield audio_bytes
+                    print(f"📦 发送音频块 #{chunk_count} (玩家{player_id}): {len(audio_bytes)} bytes")
             except Exception as e:
-                # 如果新 API 失败，回退到旧模型（非流式）
+                if chunk_count > 0:
+                    # 已经发出部分音频，不能再整段回退（否则客户端会收到两份音频），也不写入缓存
+                    print(f"⚠️ {self.model} 流式中断 ({e})，已发送{chunk_count}块")
+                    return
                 print(f"⚠️ {self.model}失败 ({e})，使用旧模型")
-                
-                # 音色映射
-                voice_mapping = {
-                    "Cherry": "zhixiaobai",
-                    "Bella": "zhixiaoxia",
-                    "Amy": "zhiyan",
-                }
-                old_voice = voice_mapping.get(voice, "zhixiaobai")
-                
-                result = SpeechSynthesizer.call(
-                    model='sambert-zhichu-v1',
-                    text=text,
-                    sample_rate=self.sample_rate,
-                    format=self.format,
-                    voice=old_voice
-                )
-                
-                if result.get_audio_data() is not None:
-                    # 旧模型不支持流式，直接返回完整音频的base64
-                    audio_data = result.get_audio_data()
-                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                    yield audio_base64
-                    print(f"✅ 语音生成成功 (旧模型): 玩家{player_id}")
-                else:
-                    print(f"⚠️ TTS 生成失败: {result}")
+            
+            if chunk_count > 0:
+                print(f"✅ TTS生成完成 ({self.model}): 玩家{player_id}, 共{chunk_count}块, 总大小={total_bytes} bytes")
+                await self._save_to_cache(cache_key, b''.join(audio_parts), player_id)
+                return
+            
+            # 新模型没有返回任何音频，回退到旧模型（非流式）
+            legacy_voice = LEGACY_VOICE_MAPPING.get(voice, "zhixiaobai")
+            legacy_key = self._cache_key(text, LEGACY_TTS_MODEL, legacy_voice)
+            audio_data = await asyncio.to_thread(self._cached_bytes, legacy_key)
+            
+            if audio_data is None:
+                audio_data = await executor.run(self._call_legacy_model, text, legacy_voice)
+                if audio_data is not None:
+                    await self._save_to_cache(legacy_key, audio_data, player_id)
+            
+            if audio_data is not None:
+                # 旧模型不支持流式，直接返回完整音频
+                yield audio_data
+                print(f"✅ 语音生成成功 (旧模型): 玩家{player_id}")
         
         except Exception as e:
             print(f"❌ TTS生成失败: {e}")
@@ -355,7 +443,7 @@ class TTSFactory:
         创建TTS服务实例
         
         Args:
-            provider: TTS提供商（dashscope, azure, elevenlabs）
+            provider: TTS提供商（dashscope, fake/local, azure, elevenlabs）
                      如果为None，使用配置文件中的默认提供商
             **kwargs: 额外的TTS参数
         
@@ -373,6 +461,10 @@ class TTSFactory:
         if provider == "dashscope":
             return DashScopeTTSService(**kwargs)
         
+        elif provider in ("fake", "local"):
+            from src.utils.tts_service_fake import FakeTTSService
+            return FakeTTSService(**kwargs)
+        
         elif provider == "azure":
             raise NotImplementedError("Azure TTS 暂未实现")
         
@@ -394,3 +486,30 @@ def create_tts_from_config(provider: Optional[str] = None):
         TTS服务实例
     """
     return TTSFactory.create_tts(provider)
+
+
+_tts_instance = None
+
+
+def get_tts_service(reload: bool = False):
+    """
+    获取全局 TTS 服务实例（按配置中的提供商创建，单例模式）
+    
+    Args:
+        reload: 是否重新加载实例
+    
+    Returns:
+        TTS服务实例
+    """
+    global _tts_instance
+    
+    if _tts_instance is None or reload:
+        from src.utils.config import get_config
+        provider = get_config().tts_provider
+        if provider == "dashscope":
+            # 与 get_dashscope_tts_service 共享同一实例
+            _tts_instance = get_dashscope_tts_service(reload=reload)
+        else:
+            _tts_instance = TTSFactory.create_tts(provider)
+    
+    return _tts_instance
@@ -0,0 +1,228 @@
+"""
+离线模拟语音合成服务
+不访问网络，生成确定性的合成音频（正弦音），用于音频链路的压测和长时间运行测试
+
+- 与 DashScopeTTSService 接口一致：text_to_speech / text_to_speech_stream / audio_stream
+- 音频时长与文本长度成正比，同样的文本总是生成同样的音频
+- 可配置首块延迟和合成速度（相对实时的倍数）
+"""
+
+import asyncio
+import base64
+import hashlib
+import math
+import struct
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from src.utils.audio_cache import AudioCache
+
+
+@lru_cache(maxsize=64)
+def _tone_block(frequency: int, sample_rate: int, num_samples: int) -> bytes:
+    """生成一段 16bit 单声道正弦音 PCM（按频率缓存，避免重复计算）"""
+    samples = array('h', (
+        int(8000 * math.sin(2 * math.pi * frequency * i / sample_rate))
+        for i in range(num_samples)
+    ))
+    return samples.tobytes()
+
+
+def _wav_header(num_data_bytes: int, sample_rate: int) -> bytes:
+    """生成 16bit 单声道 WAV 文件头"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + num_data_bytes, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b'data', num_data_bytes
+    )
+
+
+class FakeTTSService:
+    """离线模拟 TTS 服务类"""
+
+    def __init__(
+        self,
+        sample_rate: Optional[int] = None,
+        seconds_per_char: Optional[float] = None,
+        first_chunk_latency: Optional[float] = None,
+        throughput: Optional[float] = None,
+        chunk_seconds: Optional[float] = None,
+        format: Optional[str] = None,
+        use_config: bool = True
+    ):
+        """
+        初始化模拟 TTS 服务
+
+        Args:
+            sample_rate: 采样率
+            seconds_per_char: 每个字符对应的音频时长（秒）
+            first_chunk_latency: 首个音频块的延迟（秒）
+            throughput: 合成速度（生成的音频秒数 / 实际耗时秒数，0 表示不限速）
+            chunk_seconds: 每个音频块的时长（秒）
+            format: 输出格式（wav: 首块带WAV文件头，pcm: 裸PCM）
+            use_config: 是否使用配置文件（默认: True）
+        """
+        if use_config:
+            from src.utils.config import get_config
+            tts_config = get_config().get_tts_config("fake")
+        else:
+            tts_config = {}
+
+        # 参数优先级：传入参数 > 配置文件 > 默认值
+        self.sample_rate = sample_rate or tts_config.get("sample_rate", 16000)
+        self.seconds_per_char = seconds_per_char if seconds_per_char is not None else tts_config.get("seconds_per_char", 0.2)
+        self.first_chunk_latency = first_chunk_latency if first_chunk_latency is not None else tts_config.get("first_chunk_latency", 0.3)
+        self.throughput = throughput if throughput is not None else tts_config.get("throughput", 4.0)
+        self.chunk_seconds = chunk_seconds or tts_config.get("chunk_seconds", 0.5)
+        self.format = format or tts_config.get("format", "wav")
+
+        # 兼容其他服务的属性
+        self.model = "fake-tts"
+        self.voice = "fake"
+        self.speed = 1.0
+        self.pitch = 1.0
+
+        self.output_dir = Path(__file__).parent.parent.parent / "assets" / "audio"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        print(f"🔊 模拟TTS服务初始化: 首块延迟={self.first_chunk_latency}s, 速度={self.throughput}x实时")
+
+    # ==================== 音频生成 ====================
+
+    def _frequency(self, text: str) -> int:
+        """由文本确定音调（确定性）"""
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        return 220 + (digest[0] % 8) * 55
+
+    def _num_samples(self, text: str) -> int:
+        """音频总采样数（与文本长度成正比）"""
+        duration = max(len(text.strip()), 1) * self.seconds_per_char
+        return int(duration * self.sample_rate)
+
+    def _iter_pcm_chunks(self, text: str):
+        """按块生成PCM数据"""
+        frequency = self._frequency(text)
+        total_samples = self._num_samples(text)
+        samples_per_chunk = max(1, int(self.chunk_seconds * self.sample_rate))
+        block = _tone_block(frequency, self.sample_rate, samples_per_chunk)
+
+        remaining = total_samples
+        while remaining > 0:
+            count = min(remaining, samples_per_chunk)
+            yield block[:count * 2]
+            remaining -= count
+
+    def synthesize(self, text: str) -> bytes:
+        """同步生成完整音频"""
+        pcm = b''.join(self._iter_pcm_chunks(text))
+        if self.format == "wav":
+            return _wav_header(len(pcm), self.sample_rate) + pcm
+        return pcm
+
+    # ==================== 服务接口 ====================
+
+    async def text_to_speech(
+        self,
+        text: str,
+        player_id: Optional[int] = None,
+        **kwargs
+    ) -> Optional[str]:
+        """
+        将文本转换为语音文件
+
+        Args:
+            text: 要转换的文本
+            player_id: 玩家ID（用于生成文件名）
+
+        Returns:
+            音频文件的路径，如果失败则返回None
+        """
+        if not text:
+            return None
+
+        await asyncio.sleep(self.first_chunk_latency)
+
+        cache_key = AudioCache.make_key(text, self.model, self.voice, format=self.format)
+        file_path = self.output_dir / f"speech_{player_id}_{cache_key[:16]}.{self.format}"
+        if not file_path.exists():
+            audio_data = self.synthesize(text)
+            if self.throughput > 0:
+                await asyncio.sleep(len(audio_data) / (2 * self.sample_rate) / self.throughput)
+            file_path.write_bytes(audio_data)
+
+        return str(file_path)
+
+    async def text_to_speech_stream(
+        self,
+        text: str,
+        player_id: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        流式生成语音
+
+        Args:
+            text: 要转换的文本
+            player_id: 玩家ID
+
+        Yields:
+            音频数据块（base64编码的字符串）
+        """
+        async for audio_bytes in self.audio_stream(text, player_id):
+            yield base64.b64encode(audio_bytes).decode('utf-8')
+
+    async def audio_stream(
+        self,
+        text: str,
+        player_id: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        流式生成语音（原始音频数据）
+
+        Args:
+            text: 要转换的文本
+            player_id: 玩家ID
+
+        Yields:
+            音频数据块（bytes）
+        """
+        if not text:
+            return
+
+        await asyncio.sleep(self.first_chunk_latency)
+
+        total_bytes = self._num_samples(text) * 2
+        first_chunk = True
+
+        for pcm in self._iter_pcm_chunks(text):
+            if not first_chunk and self.throughput > 0:
+                # 按配置速度生成下一块
+                await asyncio.sleep(len(pcm) / (2 * self.sample_rate) / self.throughput)
+
+            audio_bytes = pcm
+            if first_chunk and self.format == "wav":
+                audio_bytes = _wav_header(total_bytes, self.sample_rate) + pcm
+            first_chunk = False
+
+            yield audio_bytes
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        获取当前配置
+
+        Returns:
+            配置字典
+        """
+        return {
+            "model": self.model,
+            "sample_rate": self.sample_rate,
+            "seconds_per_char": self.seconds_per_char,
+            "first_chunk_latency": self.first_chunk_latency,
+            "throughput": self.throughput,
+            "chunk_seconds": self.chunk_seconds,
+            "format": self.format,
+        }
@@ -3,27 +3,51 @@ FastAPI Web服务
 提供REST API接口
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import List, Optional, Dict, AsyncGenerator
-import uuid
+from typing import List, Optional, Dict, Any, AsyncGenerator
 import asyncio
+import uuid
 import json
 from pathlib import Path
 
 # 导入游戏引擎
 from src.core.game_engine import WerewolfGame
 from src.core.event_system import EventSystem
-from src.agents import AgentFactory
+from src.core.clock import VirtualClock
+from src.agents import AgentFactory, collect_votes, start_round_thinking, cancel_round_thinking, start_history_summaries
+from src.agents.agent_factory import LLMFactory, SUPPORTED_PROVIDERS
+from src.agents.routed_llm import routing_stats
+from src.agents.scheduled_llm import usage_stats
 from src.utils.config import get_config
-from src.utils.tts_service_dashscope import get_dashscope_tts_service
+from src.utils.tts_service_dashscope import get_tts_service
+from src.utils.tts_executor import get_tts_executor
+from src.utils.audio_cache import flush_audio_cache, get_audio_cache
+from src.utils.rate_limiter import PRIORITY_LIVE, get_scheduler
+from src.web.game_runner import GameRunner
+from src.web.speech_pipeline import run_speech_pipeline
+from src.web.frame_coalescer import coalesce_speech_chunks
+from src.web.pacing import PACING_POLICIES, create_pacing_policy
+from src.web.websocket import WebSocketManager
+from src.web.game_registry import GameRegistry
+from src.web.game_lifecycle import GameLifecycleManager
 from langchain_openai import ChatOpenAI
 
-games_cache = {}
+game_registry = GameRegistry()
 game_engines = {}  # 存储实际的游戏引擎实例
+game_runners = {}  # 每局游戏的后台回合执行器
+ws_manager = WebSocketManager()  # WebSocket 观众连接
+game_lifecycle = GameLifecycleManager(game_registry, game_engines, game_runners, ws_manager)  # 空闲游戏回收
+
+# 发言事件输出后的停顿（秒，正常节奏），实际停顿由游戏的节奏策略决定
+# 发言文本块不再逐个停顿，合并后由客户端按打字速度展示
+SPEECH_FRAME_DELAYS = {
+    'speech_start': 0.3,
+    'speech_end': 0.3,
+}
 
 
 def create_app() -> FastAPI:
@@ -47,11 +71,25 @@ def create_app() -> FastAPI:
     audio_dir.mkdir(parents=True, exist_ok=True)
     app.mount("/audio", StaticFiles(directory=str(audio_dir)), name="audio")
     
+    @app.on_event("startup")
+    async def start_lifecycle():
+        """启动空闲游戏回收"""
+        game_lifecycle.start()
+    
+    @app.on_event("shutdown")
+    async def stop_lifecycle():
+        """停止空闲游戏回收，关闭共享的LLM连接，保存音频缓存的访问记录"""
+        await game_lifecycle.stop()
+        await LLMFactory.aclose_pool()
+        await asyncio.to_thread(flush_audio_cache)
+    
     class GameCreateRequest(BaseModel):
         """创建游戏请求"""
         num_players: int = 6
-        llm_provider: str = "modelscope"
+        llm_provider: Optional[str] = None    # None 表示使用配置文件中的默认提供商
         model_name: Optional[str] = None
+        pacing: str = "live"                  # 展示节奏：live, accelerated, turbo
+        pacing_scale: Optional[float] = None  # accelerated 模式的停顿缩放比例（0-1）
     
     class GameResponse(BaseModel):
         """游戏响应"""
@@ -79,6 +117,19 @@ def create_app() -> FastAPI:
     @app.post("/api/games", response_model=Dict)
     async def create_game(request: GameCreateRequest):
         """创建新游戏"""
+        if request.pacing not in PACING_POLICIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的节奏模式: {request.pacing}（可选: {', '.join(PACING_POLICIES)}）"
+            )
+        if request.pacing_scale is not None and not 0 <= request.pacing_scale <= 1:
+            raise HTTPException(status_code=400, detail="pacing_scale 必须在 0 到 1 之间")
+        if request.llm_provider and request.llm_provider not in SUPPORTED_PROVIDERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的LLM提供商: {request.llm_provider}（可选: {', '.join(SUPPORTED_PROVIDERS)}）"
+            )
+        
         try:
             game_id = str(uuid.uuid4())
             
@@ -88,12 +139,16 @@ def create_app() -> FastAPI:
                 "round": 0,
                 "phase": "waiting",
                 "num_players": request.num_players,
-                "llm_provider": request.llm_provider,
+                "llm_provider": request.llm_provider or get_config().llm_provider,
+                "model_name": request.model_name or None,
+                "pacing": request.pacing,
+                "pacing_scale": request.pacing_scale,
                 "players": [],
                 "events": []
             }
             
-            games_cache[game_id] = game_data
+            game_registry.add(game_data)
+            game_lifecycle.touch(game_id)
             
             return {
                 "success": True,
@@ -107,11 +162,10 @@ def create_app() -> FastAPI:
     @app.get("/api/games/{game_id}")
     async def get_game(game_id: str):
         """获取游戏状态"""
-        if game_id not in games_cache:
+        game = game_lifecycle.get(game_id)
+        if game is None:
             raise HTTPException(status_code=404, detail="游戏不存在")
         
-        game = games_cache[game_id]
-        
         # 确保返回包含所需字段
         if 'players' not in game:
             game['players'] = []
@@ -120,131 +174,103 @@ def create_app() -> FastAPI:
         
         return game
     
-    def create_llm():
-        """创建LLM实例（使用新的LLM工厂）"""
-        from src.agents.agent_factory import LLMFactory
-        return LLMFactory.create_llm()
-    
-    async def stream_game_round(game_id: str) -> AsyncGenerator[str, None]:
-        """流式运行游戏回合"""
+    async def run_game_round(game_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """运行一个游戏回合，逐个产出事件（由 GameRunner 在后台驱动）"""
+        thinking = []
         try:
-            if game_id not in games_cache or game_id not in game_engines:
-                yield f"data: {json.dumps({'type': 'error', 'message': '游戏不存在'})}\n\n"
+            if game_id not in game_registry or game_id not in game_engines:
+                yield {'type': 'error', 'message': '游戏不存在'}
                 return
             
-            game_data = games_cache[game_id]
+            game_data = game_registry[game_id]
             game_engine = game_engines[game_id]
             agents = game_engine['agents']
             game = game_engine['game']
+            pacing = game_engine['pacing']
             
             # 增加轮次
             game.start_round()
             game_data['round'] = game.state.round
             
-            yield f"data: {json.dumps({'type': 'round_start', 'round': game.state.round})}\n\n"
-            await asyncio.sleep(0.1)
+            # 所有玩家在后台并发思考，与下面的事件帧推送并行
+            config = get_config()
+            if config.agent_round_thinking:
+                thinking = start_round_thinking(agents, game.state)
+            
+            yield {'type': 'round_start', 'round': game.state.round}
+            await pacing.pause(0.1)
             
             # 讨论阶段
             game_data['phase'] = 'discussion'
-            yield f"data: {json.dumps({'type': 'phase_change', 'phase': 'discussion'})}\n\n"
-            await asyncio.sleep(0.3)
+            yield {'type': 'phase_change', 'phase': 'discussion'}
+            await pacing.pause(0.3)
+            
+            # 每个玩家发言（流水线：上一位的TTS与下一位的LLM生成并行）
+            def record_speech(agent, full_speech: str):
+                game.record_speech(agent.player.id, full_speech)
+                event_text = f"[{agent.player.name}] {full_speech}"
+                game_data['events'].append(event_text)
             
-            # 每个玩家发言
-            for agent in agents:
-                if agent.player.is_alive:
-                    # 发送玩家开始发言的通知
-                    yield f"data: {json.dumps({'type': 'speech_start', 'player_id': agent.player.id, 'player_name': agent.player.name, 'role': agent.player.role_name_cn})}\n\n"
-                    await asyncio.sleep(0.3)
-                    
-                    # 获取发言（流式）
-                    full_speech = ""
-                    
-                    # 流式输出文字
-                    async for chunk in agent.speak_stream(game.state):
-                        full_speech += chunk
-                        yield f"data: {json.dumps({'type': 'speech_chunk', 'player_id': agent.player.id, 'chunk': chunk})}\n\n"
-                        await asyncio.sleep(0.05)  # 控制打字速度
-                    
-                    # 文字输出完成后，生成并发送音频
-                    config = get_config()
-                    if config.tts_enabled and full_speech:
-                        try:
-                            print(f"[TTS] Starting audio generation for player {agent.player.id}, text length: {len(full_speech)}")
-                            tts_service = get_dashscope_tts_service()
-                            
-                            # 生成音频并发送
-                            audio_chunks_sent = 0
-                            async for audio_chunk in tts_service.text_to_speech_stream(full_speech, agent.player.id):
-                                if audio_chunk:
-                                    audio_chunks_sent += 1
-                                    yield f"data: {json.dumps({'type': 'audio_chunk', 'player_id': agent.player.id, 'audio_data': audio_chunk})}\n\n"
-                                    print(f"[TTS] Sent audio chunk {audio_chunks_sent} for player {agent.player.id}, size: {len(audio_chunk)} bytes")
-                                    await asyncio.sleep(0)
-                                else:
-                                    print(f"[TTS] Warning: Empty audio chunk for player {agent.player.id}")
-                            
-                            yield f"data: {json.dumps({'type': 'audio_end', 'player_id': agent.player.id})}\n\n"
-                            print(f"[TTS] Audio generation completed for player {agent.player.id}, total chunks: {audio_chunks_sent}")
-                        except Exception as e:
-                            print(f"[TTS] Failed to generate audio for player {agent.player.id}: {e}")
-                            import traceback
-                            traceback.print_exc()
-                            # 发送错误事件
-                            yield f"data: {json.dumps({'type': 'error', 'message': f'TTS generation failed: {str(e)}'})}\n\n"
-                    
-                    # 发言结束，记录事件
-                    game.record_speech(agent.player.id, full_speech)
-                    event_text = f"[{agent.player.name}] {full_speech}"
-                    game_data['events'].append(event_text)
-                    
-                    # 发送发言结束事件
-                    yield f"data: {json.dumps({'type': 'speech_end', 'player_id': agent.player.id, 'speech': full_speech})}\n\n"
-                    await asyncio.sleep(0.3)
+            synthesize = None
+            if config.tts_enabled:
+                async def synthesize(text: str, player_id: int):
+                    # TTS 同样按提供商限额排队（按字符计），实时优先级
+                    async with get_scheduler().slot(f"tts:{config.tts_provider}", game_id, PRIORITY_LIVE, tokens=len(text)):
+                        async for audio_chunk in get_tts_service().audio_stream(text, player_id):
+                            yield audio_chunk
+            
+            frames = coalesce_speech_chunks(
+                run_speech_pipeline(agents, game.state, record_speech, synthesize),
+                flush_interval=config.web_stream_flush_ms / 1000,
+                max_bytes=config.web_stream_flush_bytes
+            )
+            async for frame in frames:
+                yield frame
+                await pacing.pause(SPEECH_FRAME_DELAYS.get(frame['type'], 0))
             
             # 投票阶段
             game_data['phase'] = 'voting'
-            yield f"data: {json.dumps({'type': 'phase_change', 'phase': 'voting'})}\n\n"
-            await asyncio.sleep(0.5)
+            yield {'type': 'phase_change', 'phase': 'voting'}
+            await pacing.pause(0.5)
             
+            # 所有玩家同时投票（异步并发），按座位顺序公布
             votes = {}
-            for agent in agents:
-                if agent.player.is_alive:
-                    vote_to = agent.vote(game.state)
-                    votes[agent.player.id] = vote_to
-                    game.record_vote(agent.player.id, vote_to)
-                    
-                    event_text = f"[{agent.player.name}] 投票给 玩家{vote_to}"
-                    game_data['events'].append(event_text)
-                    
-                    yield f"data: {json.dumps({'type': 'vote', 'player_id': agent.player.id, 'vote_to': vote_to, 'player_name': agent.player.name})}\n\n"
-                    await asyncio.sleep(0.3)
+            vote_concurrency = config.game_vote_concurrency
+            async for agent, vote_to in collect_votes(agents, game.state, vote_concurrency):
+                votes[agent.player.id] = vote_to
+                game.record_vote(agent.player.id, vote_to)
+                
+                event_text = f"[{agent.player.name}] 投票给 玩家{vote_to}"
+                game_data['events'].append(event_text)
+                
+                yield {'type': 'vote', 'player_id': agent.player.id, 'vote_to': vote_to, 'player_name': agent.player.name}
+                await pacing.pause(0.3)
             
             # 统计投票并淘汰
-            if votes:
-                vote_count = {}
-                for vote_to in votes.values():
-                    vote_count[vote_to] = vote_count.get(vote_to, 0) + 1
-                
-                eliminated_id = max(vote_count, key=vote_count.get)
+            eliminated_id = game.tally_votes(votes)
+            if eliminated_id is not None:
                 eliminated_player = next(p for p in game.state.players if p.id == eliminated_id)
                 game.eliminate_player(eliminated_id, "投票")
                 
                 event_text = f"玩家{eliminated_id}({eliminated_player.name}-{eliminated_player.role_name_cn}) 被投票淘汰"
                 game_data['events'].append(event_text)
                 
-                yield f"data: {json.dumps({'type': 'elimination', 'player_id': eliminated_id, 'player_name': eliminated_player.name, 'role': eliminated_player.role_name_cn})}\n\n"
-                await asyncio.sleep(0.5)
+                yield {'type': 'elimination', 'player_id': eliminated_id, 'player_name': eliminated_player.name, 'role': eliminated_player.role_name_cn}
+                await pacing.pause(0.5)
+            
+            # 回合之间在后台整理各玩家的对话历史（不等待完成）
+            start_history_summaries(agents)
             
             # 检查游戏是否结束
             winner = game.check_game_over()
             if winner:
-                game_data['status'] = 'finished'
+                game_registry.set_status(game_id, 'finished')
                 game_data['phase'] = 'ended'
                 game_data['winner'] = winner
                 event_text = f"游戏结束！{winner}胜利！"
                 game_data['events'].append(event_text)
                 
-                yield f"data: {json.dumps({'type': 'game_end', 'winner': winner})}\n\n"
+                yield {'type': 'game_end', 'winner': winner}
             
             # 更新玩家状态
             game_data['players'] = [
@@ -258,41 +284,52 @@ def create_app() -> FastAPI:
             ]
             
             # 发送完成事件（使用自定义事件类型）
-            yield f"event: complete\ndata: {json.dumps({'type': 'complete', 'game_data': game_data})}\n\n"
+            yield {'type': 'complete', 'game_data': game_data}
             
         except Exception as e:
             print(f"Game round error: {e}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield {'type': 'error', 'message': str(e)}
+        
+        finally:
+            cancel_round_thinking(thinking)
     
     @app.post("/api/games/{game_id}/start")
     async def start_game(game_id: str):
         """开始游戏"""
-        if game_id not in games_cache:
+        game_data = game_lifecycle.get(game_id)
+        if game_data is None:
             raise HTTPException(status_code=404, detail="游戏不存在")
         
-        game_data = games_cache[game_id]
-        
         # 创建游戏引擎
         try:
             event_system = EventSystem()
-            game = WerewolfGame(event_system)
+            clock = VirtualClock()
+            game = WerewolfGame(event_system, clock=clock)
+            # 引擎使用与Web相同的游戏ID，回收时写入的游戏记录在删除游戏时一并删除
+            game.game_id = game_id
             game.setup_game(num_players=game_data['num_players'])
+            pacing = create_pacing_policy(
+                game_data.get('pacing', 'live'),
+                game_data.get('pacing_scale'),
+                clock=clock
+            )
             
-            # 创建LLM和Agents
-            llm = create_llm()
+            # 共享的LLM实例（相同配置的游戏共用实例、已编译的链和HTTP连接池），经过进程级调度器，可选多提供商路由
+            llm = LLMFactory.get_game_llm(game_data.get('llm_provider'), game_data.get('model_name'))
             agents = AgentFactory.create_batch_agents(game.state.players, llm)
             
             # 保存游戏引擎
             game_engines[game_id] = {
                 'game': game,
                 'agents': agents,
-                'event_system': event_system
+                'event_system': event_system,
+                'pacing': pacing
             }
             
             # 更新游戏状态
-            game_data["status"] = "running"
+            game_registry.set_status(game_id, "running")
             game_data["phase"] = "discussion"
             game_data["round"] = 0
             game_data["events"] = ["游戏开始！"]
@@ -319,19 +356,61 @@ def create_app() -> FastAPI:
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"启动游戏失败: {str(e)}")
     
+    def publish_frame(game_id: str, frame):
+        """推送回合事件帧给 WebSocket 观众（回合进行中视为游戏被访问）"""
+        game_lifecycle.touch(game_id)
+        ws_manager.broadcast_frame(game_id, frame)
+    
+    def get_runner(game_id: str) -> GameRunner:
+        """获取（或创建）游戏的回合执行器"""
+        if game_id not in game_runners:
+            game_runners[game_id] = GameRunner(
+                game_id,
+                lambda: run_game_round(game_id),
+                on_frame=lambda frame: publish_frame(game_id, frame)
+            )
+        return game_runners[game_id]
+    
+    async def stream_frames(runner: GameRunner, after_id: Optional[int]) -> AsyncGenerator[str, None]:
+        """把回合日志转为SSE流（客户端断开只影响本订阅，不影响回合执行）"""
+        async for frame in runner.log.subscribe(after_id):
+            yield frame.to_sse()
+    
     @app.get("/api/games/{game_id}/stream-round")
-    async def stream_round(game_id: str):
-        """流式进行下一轮游戏"""
-        if game_id not in games_cache:
+    async def stream_round(game_id: str, request: Request):
+        """
+        流式进行下一轮游戏
+        
+        回合在后台运行，多个观众共享同一次执行；
+        携带 Last-Event-ID 重连时从断点续传，不会重新开始回合。
+        """
+        game_data = game_lifecycle.get(game_id)
+        if game_data is None:
             raise HTTPException(status_code=404, detail="游戏不存在")
         
-        game_data = games_cache[game_id]
+        last_event_id = request.headers.get("last-event-id")
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        
+        runner = game_runners.get(game_id)
         
-        if game_data['status'] != 'running':
-            raise HTTPException(status_code=400, detail="游戏未在运行中")
+        if runner is not None and runner.can_resume(last_event_id):
+            # 断线重连：从断点续传
+            after_id = last_event_id
+        elif runner is not None and runner.is_running:
+            # 回合进行中：新观众从本回合开头观看
+            after_id = None
+        else:
+            if game_data['status'] != 'running' or game_id not in game_engines:
+                raise HTTPException(status_code=400, detail="游戏未在运行中")
+            runner = get_runner(game_id)
+            runner.start_round()
+            after_id = None
         
         return StreamingResponse(
-            stream_game_round(game_id),
+            stream_frames(runner, after_id),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -340,14 +419,72 @@ def create_app() -> FastAPI:
             }
         )
     
+    @app.websocket("/ws/games/{game_id}")
+    async def game_websocket(websocket: WebSocket, game_id: str):
+        """
+        游戏实时连接（JSON控制帧 + 二进制音频帧）
+        
+        查询参数 last_event_id 用于断线续传；
+        客户端发送 {"type": "start_round"} 开始下一回合，同一局的所有连接都会收到回合事件。
+        """
+        if game_lifecycle.get(game_id) is None:
+            await websocket.close(code=4404)
+            return
+        
+        last_event_id = websocket.query_params.get("last_event_id")
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        
+        def backlog():
+            """断线续传或中途加入时需要补发的帧"""
+            runner = game_runners.get(game_id)
+            if runner is None or runner.log is None:
+                return []
+            if runner.can_resume(last_event_id):
+                return runner.log.frames_after(last_event_id)
+            if runner.is_running:
+                return runner.log.frames_after(None)
+            return []
+        
+        await ws_manager.connect(websocket, game_id, backlog)
+        try:
+            while True:
+                try:
+                    message = json.loads(await websocket.receive_text())
+                    if not isinstance(message, dict):
+                        raise ValueError("message must be an object")
+                except ValueError:
+                    await ws_manager.send_to_player(websocket, {'type': 'error', 'message': '消息格式错误'})
+                    continue
+                
+                if message.get('type') != 'start_round':
+                    await ws_manager.send_to_player(websocket, {'type': 'error', 'message': f"未知消息类型: {message.get('type')}"})
+                    continue
+                
+                runner = game_runners.get(game_id)
+                if runner is not None and runner.is_running:
+                    # 回合已在进行中，本连接已在接收
+                    continue
+                elif game_id not in game_registry or game_registry[game_id]['status'] != 'running' or game_id not in game_engines:
+                    await ws_manager.send_to_player(websocket, {'type': 'error', 'message': '游戏未在运行中'})
+                else:
+                    # 回合事件会推送给本局的所有连接
+                    get_runner(game_id).start_round()
+        
+        except WebSocketDisconnect:
+            pass
+        finally:
+            ws_manager.disconnect(websocket, game_id)
+    
     @app.post("/api/games/{game_id}/next-round")
     async def next_round(game_id: str):
         """触发下一轮游戏（非流式，用于兼容）"""
-        if game_id not in games_cache:
+        game_data = game_lifecycle.get(game_id)
+        if game_data is None:
             raise HTTPException(status_code=404, detail="游戏不存在")
         
-        game_data = games_cache[game_id]
-        
         if game_data['status'] != 'running':
             raise HTTPException(status_code=400, detail="游戏未在运行中")
         
@@ -359,7 +496,7 @@ def create_app() -> FastAPI:
     @app.post("/api/games/{game_id}/action")
     async def game_action(game_id: str, action: Dict):
         """执行游戏操作"""
-        if game_id not in games_cache:
+        if game_lifecycle.get(game_id) is None:
             raise HTTPException(status_code=404, detail="游戏不存在")
         
         return {
@@ -368,18 +505,36 @@ def create_app() -> FastAPI:
         }
     
     @app.get("/api/games")
-    async def list_games():
-        """列出所有游戏"""
+    async def list_games(status: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50):
+        """
+        列出游戏（按创建时间倒序，游标分页）
+        
+        只返回摘要，不含事件和玩家列表；完整状态通过 /api/games/{game_id} 获取
+        """
+        limit = max(1, min(limit, 200))
+        try:
+            games, next_cursor = game_registry.list(status=status, cursor=cursor, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         return {
-            "games": list(games_cache.values()),
-            "total": len(games_cache)
+            "games": games,
+            "total": game_registry.count(status),
+            "next_cursor": next_cursor
         }
     
     @app.delete("/api/games/{game_id}")
     async def delete_game(game_id: str):
         """删除游戏"""
-        if game_id in games_cache:
-            del games_cache[game_id]
+        game_registry.remove(game_id)
+        await game_lifecycle.forget(game_id)
+        
+        # 停止后台回合
+        runner = game_runners.pop(game_id, None)
+        if runner is not None:
+            await runner.cancel()
+        game_engines.pop(game_id, None)
+        await ws_manager.close_game(game_id)
         
         return {
             "success": True,
@@ -390,8 +545,17 @@ def create_app() -> FastAPI:
     async def get_stats():
         """获取统计信息"""
         return {
-            "total_games": len(games_cache),
-            "active_games": sum(1 for g in games_cache.values() if g.get("status") == "running")
+            "total_games": game_registry.count(),
+            "active_games": game_registry.count("running"),
+            "games_by_status": game_registry.counts_by_status(),
+            "websocket": ws_manager.stats(),
+            "lifecycle": game_lifecycle.stats(),
+            "llm_pool": LLMFactory.pool_stats(),
+            "scheduler": get_scheduler().stats(),
+            "llm_routing": routing_stats(),
+            "llm_usage": usage_stats(),
+            "tts_executor": get_tts_executor().stats(),
+            "tts_cache": get_audio_cache().stats() if get_config().tts_cache_enabled else {"enabled": False}
         }
     
     return app
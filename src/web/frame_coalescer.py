@@ -0,0 +1,91 @@
+"""
+发言帧合并
+LLM 每输出一个 token 就产生一个 speech_chunk 帧，观众多时意味着大量细碎的
+JSON 编码和网络写入。这里把同一玩家连续的 speech_chunk 合并成一帧：
+
+- 缓冲中的文本每隔 flush_interval 秒或超过 max_bytes 字节时输出一次
+- 遇到其他类型的帧（或换了玩家）时先输出缓冲，保证事件顺序不变
+- 合并后的文本与逐 token 输出完全一致，打字效果由客户端负责
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
+
+
+async def coalesce_speech_chunks(
+    frames: AsyncIterator[Dict[str, Any]],
+    flush_interval: float = 0.1,
+    max_bytes: int = 256
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    合并连续的 speech_chunk 帧
+
+    Args:
+        frames: 原始事件帧
+        flush_interval: 最长缓冲时间（秒）
+        max_bytes: 最大缓冲字节数（UTF-8）
+
+    Yields:
+        事件帧（speech_chunk 已合并）
+    """
+    loop = asyncio.get_running_loop()
+    iterator = frames.__aiter__()
+    pending: Optional[asyncio.Future] = None
+
+    buffer: Optional[Dict[str, Any]] = None
+    buffered_bytes = 0
+    deadline = 0.0
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            # 有缓冲时最多等到截止时间，超时先输出缓冲再继续等待同一帧
+            timeout = None if buffer is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield buffer
+                buffer = None
+                continue
+
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                pending = None
+                break
+            pending = None
+
+            if frame.get('type') == 'speech_chunk':
+                if buffer is not None and buffer['player_id'] != frame['player_id']:
+                    yield buffer
+                    buffer = None
+
+                if buffer is None:
+                    buffer = dict(frame)
+                    buffered_bytes = 0
+                    deadline = loop.time() + flush_interval
+                else:
+                    buffer['chunk'] += frame['chunk']
+                buffered_bytes += len(frame['chunk'].encode('utf-8'))
+
+                if buffered_bytes >= max_bytes:
+                    yield buffer
+                    buffer = None
+                continue
+
+            if buffer is not None:
+                yield buffer
+                buffer = None
+            yield frame
+
+        if buffer is not None:
+            yield buffer
+
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,228 @@
+"""
+游戏生命周期管理
+回收空闲游戏，避免内存随游戏数量无限增长
+
+- 记录每局游戏的最后访问时间（API 请求、WebSocket 连接、回合事件帧）
+- 后台定期扫描：空闲超过 TTL 的游戏写入磁盘（GameRepository），
+  然后释放全部内存状态（游戏数据、引擎、Agent、LLM、回合执行器、WebSocket 连接），
+  注册表中只保留摘要，游戏列表和按状态统计不受回收影响
+- 正在运行回合或仍有 WebSocket 观众的游戏不会被回收
+- 访问已回收的游戏时从磁盘透明加载；未结束的游戏无法恢复引擎，加载后状态为 expired
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set
+
+from src.database.game_repository import GameRepository
+from src.web.game_registry import GameRegistry
+from src.web.websocket import WebSocketManager
+
+# 从磁盘加载的未结束游戏的状态（引擎和 Agent 记忆无法恢复）
+EXPIRED_STATUS = "expired"
+
+
+class GameLifecycleManager:
+    """游戏生命周期管理器"""
+
+    def __init__(
+        self,
+        registry: GameRegistry,
+        engines: Dict[str, Dict[str, Any]],
+        runners: Dict[str, Any],
+        ws_manager: WebSocketManager,
+        repository: Optional[GameRepository] = None,
+        idle_ttl: Optional[float] = None,
+        sweep_interval: Optional[float] = None
+    ):
+        """
+        初始化管理器
+
+        Args:
+            registry: 游戏注册表
+            engines: 游戏引擎字典（游戏ID -> 引擎、Agent等）
+            runners: 回合执行器字典（游戏ID -> GameRunner）
+            ws_manager: WebSocket连接管理器
+            repository: 游戏数据仓库（默认 data/ 目录）
+            idle_ttl: 空闲回收时间（秒，0 表示不回收）
+            sweep_interval: 扫描间隔（秒）
+        """
+        if idle_ttl is None or sweep_interval is None:
+            from src.utils.config import get_config
+            config = get_config()
+            idle_ttl = config.web_game_idle_ttl if idle_ttl is None else idle_ttl
+            sweep_interval = config.web_game_sweep_interval if sweep_interval is None else sweep_interval
+
+        self.registry = registry
+        self.engines = engines
+        self.runners = runners
+        self.ws_manager = ws_manager
+        self.repository = repository or GameRepository()
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = max(1.0, sweep_interval)
+
+        self._last_access: Dict[str, float] = {}
+        self._evicted: Set[str] = set()  # 注册表中只剩摘要的游戏
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # 统计
+        self.evicted = 0
+        self.reloaded = 0
+
+    # ==================== 访问 ====================
+
+    def touch(self, game_id: str):
+        """记录一次访问"""
+        self._last_access[game_id] = time.monotonic()
+
+    def get(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取游戏数据并记录访问（已回收的游戏从磁盘加载）
+
+        Returns:
+            游戏数据，游戏不存在时返回None
+        """
+        game_data = self.registry.get(game_id)
+        if game_data is None or game_id in self._evicted:
+            game_data = self._reload(game_id)
+            if game_data is None:
+                return None
+
+        self.touch(game_id)
+        return game_data
+
+    async def forget(self, game_id: str):
+        """游戏被删除时清除访问记录和磁盘记录（删除文件在线程中进行，不阻塞事件循环）"""
+        self._last_access.pop(game_id, None)
+        self._evicted.discard(game_id)
+        await asyncio.to_thread(self.repository.delete_game, game_id)
+
+    def _reload(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """从磁盘加载已回收的游戏"""
+        replay = self.repository.load_replay_file(game_id)
+        if not replay or not replay.get("game_data"):
+            return None
+
+        game_data = replay["game_data"]
+        if game_data.get("status") not in ("created", "finished"):
+            game_data["status"] = EXPIRED_STATUS
+
+        self.registry.replace(game_id, game_data)
+        self._evicted.discard(game_id)
+        self.reloaded += 1
+        print(f"♻️ 已从磁盘加载游戏: {game_id}")
+        return game_data
+
+    # ==================== 回收 ====================
+
+    def is_idle(self, game_id: str, now: Optional[float] = None) -> bool:
+        """游戏是否可以回收"""
+        if self.idle_ttl <= 0 or game_id in self._evicted:
+            return False
+
+        now = time.monotonic() if now is None else now
+        last_access = self._last_access.setdefault(game_id, now)
+        if now - last_access < self.idle_ttl:
+            return False
+
+        runner = self.runners.get(game_id)
+        if runner is not None and runner.is_running:
+            return False
+        return self.ws_manager.connection_count(game_id) == 0
+
+    async def evict(self, game_id: str) -> bool:
+        """
+        持久化并释放一局游戏的内存状态
+
+        Returns:
+            是否成功回收（写入磁盘失败时保留在内存中）
+        """
+        game_data = self.registry.get(game_id)
+        if game_data is None:
+            return False
+
+        engine = self.engines.get(game_id)
+        events = []
+        if engine is not None:
+            game = engine["game"]
+            if game.state is not None and not await asyncio.to_thread(self.repository.save_game, game.state):
+                return False
+            events = [e.to_dict() for e in engine["event_system"].get_history(limit=None)]
+
+        if not await asyncio.to_thread(self.repository.save_game_replay, game_id, events, game_data=game_data):
+            return False
+
+        # 写盘期间游戏可能又被访问
+        if not self.is_idle(game_id):
+            return False
+
+        runner = self.runners.pop(game_id, None)
+        if runner is not None:
+            await runner.cancel()
+        self.engines.pop(game_id, None)
+        self._last_access.pop(game_id, None)
+        await self.ws_manager.close_game(game_id)
+
+        # 只保留摘要：游戏仍出现在列表和统计中，访问时从磁盘加载
+        summary = GameRegistry.summary(game_data)
+        if summary["status"] not in ("created", "finished"):
+            summary["status"] = EXPIRED_STATUS
+        self.registry.replace(game_id, summary)
+        self._evicted.add(game_id)
+
+        self.evicted += 1
+        return True
+
+    async def sweep(self) -> int:
+        """
+        回收所有空闲游戏
+
+        Returns:
+            回收的游戏数量
+        """
+        now = time.monotonic()
+        idle = [game_id for game_id in list(self.registry) if self.is_idle(game_id, now)]
+
+        evicted = 0
+        for game_id in idle:
+            if await self.evict(game_id):
+                evicted += 1
+
+        if evicted:
+            print(f"🧹 已回收 {evicted} 局空闲游戏（内存中剩余 {len(self.registry) - len(self._evicted)} 局）")
+        return evicted
+
+    # ==================== 后台任务 ====================
+
+    def start(self):
+        """启动后台扫描任务"""
+        if self.idle_ttl > 0 and self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """停止后台扫描任务"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Game sweep error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "idle_ttl": self.idle_ttl,
+            "in_memory": len(self.registry) - len(self._evicted),
+            "engines": len(self.engines),
+            "evicted": self.evicted,
+            "reloaded": self.reloaded,
+        }
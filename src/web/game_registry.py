@@ -0,0 +1,192 @@
+"""
+游戏注册表
+保存所有游戏的状态数据，并按状态和创建顺序建立索引
+
+- 按状态计数为 O(1)，统计接口不再遍历所有游戏
+- 列表接口按创建时间倒序、基于游标分页，只返回摘要（不含事件和玩家列表）
+- 状态变化必须通过 set_status 进行，索引才能保持一致
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 列表接口返回的摘要字段
+SUMMARY_FIELDS = (
+    "game_id", "status", "round", "phase", "num_players",
+    "llm_provider", "pacing", "winner", "created_at",
+)
+
+
+class GameRegistry:
+    """游戏注册表"""
+
+    def __init__(self):
+        self._games: Dict[str, Dict[str, Any]] = {}
+        self._seq_by_id: Dict[str, int] = {}
+        self._id_by_seq: Dict[int, str] = {}
+        self._next_seq = 1
+
+        # 创建顺序（升序序号），以及每种状态下的序号
+        self._order: List[int] = []
+        self._status_index: Dict[str, List[int]] = {}
+
+    # ==================== 字典接口 ====================
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._games
+
+    def __getitem__(self, game_id: str) -> Dict[str, Any]:
+        return self._games[game_id]
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._games)
+
+    def get(self, game_id: str, default: Any = None) -> Any:
+        return self._games.get(game_id, default)
+
+    def values(self):
+        return self._games.values()
+
+    # ==================== 增删改 ====================
+
+    def add(self, game_data: Dict[str, Any]):
+        """
+        注册游戏
+
+        Args:
+            game_data: 游戏状态数据（必须包含 game_id 和 status）
+        """
+        game_id = game_data["game_id"]
+        if game_id in self._games:
+            self.remove(game_id)
+
+        game_data.setdefault("created_at", datetime.now().isoformat())
+
+        seq = self._next_seq
+        self._next_seq += 1
+
+        self._games[game_id] = game_data
+        self._seq_by_id[game_id] = seq
+        self._id_by_seq[seq] = game_id
+        self._order.append(seq)
+        self._status_index.setdefault(game_data["status"], []).append(seq)
+
+    def remove(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        移除游戏
+
+        Returns:
+            被移除的游戏数据，不存在时返回None
+        """
+        game_data = self._games.pop(game_id, None)
+        if game_data is None:
+            return None
+
+        seq = self._seq_by_id.pop(game_id)
+        del self._id_by_seq[seq]
+        _remove_sorted(self._order, seq)
+        _remove_sorted(self._status_index.get(game_data["status"], []), seq)
+        return game_data
+
+    def replace(self, game_id: str, game_data: Dict[str, Any]):
+        """
+        替换游戏数据（保留创建顺序；游戏不存在时注册）
+
+        Args:
+            game_id: 游戏ID
+            game_data: 新的游戏数据（必须包含 status）
+        """
+        old = self._games.get(game_id)
+        if old is None:
+            game_data["game_id"] = game_id
+            self.add(game_data)
+            return
+
+        game_data.setdefault("created_at", old.get("created_at"))
+        self._games[game_id] = dict(game_data, status=old["status"])
+        self.set_status(game_id, game_data["status"])
+
+    def set_status(self, game_id: str, status: str):
+        """更新游戏状态（同时更新索引；游戏已被移除时忽略）"""
+        game_data = self._games.get(game_id)
+        if game_data is None:
+            return
+        old_status = game_data["status"]
+        if old_status == status:
+            return
+
+        seq = self._seq_by_id[game_id]
+        _remove_sorted(self._status_index.get(old_status, []), seq)
+        insort(self._status_index.setdefault(status, []), seq)
+        game_data["status"] = status
+
+    # ==================== 查询 ====================
+
+    def count(self, status: Optional[str] = None) -> int:
+        """游戏数量（可按状态）"""
+        if status is None:
+            return len(self._games)
+        return len(self._status_index.get(status, []))
+
+    def counts_by_status(self) -> Dict[str, int]:
+        """每种状态的游戏数量"""
+        return {status: len(seqs) for status, seqs in self._status_index.items() if seqs}
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按创建时间倒序分页列出游戏摘要
+
+        Args:
+            status: 只列出该状态的游戏
+            cursor: 上一页返回的游标（None 表示第一页）
+            limit: 每页数量
+
+        Returns:
+            (游戏摘要列表, 下一页游标；没有更多时为None)
+
+        Raises:
+            ValueError: 如果游标无效
+        """
+        seqs = self._order if status is None else self._status_index.get(status, [])
+
+        end = len(seqs)
+        if cursor:
+            try:
+                end = bisect_left(seqs, int(cursor))
+            except ValueError:
+                raise ValueError(f"无效的游标: {cursor}")
+
+        start = max(0, end - max(1, limit))
+        page = seqs[start:end][::-1]
+
+        games = [self.summary(self._games[self._id_by_seq[seq]]) for seq in page]
+        next_cursor = str(page[-1]) if page and start > 0 else None
+        return games, next_cursor
+
+    @staticmethod
+    def summary(game_data: Dict[str, Any]) -> Dict[str, Any]:
+        """游戏摘要（不含事件和玩家列表）"""
+        summary = {field: game_data.get(field) for field in SUMMARY_FIELDS}
+        players = game_data.get("players")
+        if players is None:
+            # 已回收游戏只保留摘要
+            summary["alive_players"] = game_data.get("alive_players", 0)
+        else:
+            summary["alive_players"] = sum(1 for p in players if p.get("is_alive"))
+        return summary
+
+
+def _remove_sorted(seqs: List[int], seq: int):
+    """从升序列表中删除一个序号"""
+    index = bisect_left(seqs, seq)
+    if index < len(seqs) and seqs[index] == seq:
+        del seqs[index]
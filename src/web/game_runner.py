@@ -0,0 +1,233 @@
+"""
+游戏回合后台执行器
+回合在后台任务中运行，与SSE / WebSocket 连接解耦
+
+- 每局游戏一个 GameRunner，同一时间最多运行一个回合
+- 回合产生的事件帧按序编号写入 RoundLog
+- 任意数量的观众订阅同一份日志，可通过 Last-Event-ID 断线续传
+- 客户端断开不会中断回合，游戏状态始终保持一致
+- 音频帧保存原始字节，SSE 需要时才编码为 base64，WebSocket 直接发送二进制
+"""
+
+import asyncio
+import base64
+import json
+import struct
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from src.utils.rate_limiter import game_context
+
+# WebSocket 二进制音频帧头（网络字节序）：事件编号 uint32、玩家ID uint16、音频块序号 uint32
+AUDIO_FRAME_HEADER = struct.Struct("!IHI")
+
+
+@dataclass
+class StreamFrame:
+    """带编号的事件帧"""
+    id: int
+    payload: Dict[str, Any]
+    event: Optional[str] = None
+    audio: Optional[bytes] = field(default=None, repr=False)
+    _sse: Optional[str] = field(default=None, repr=False)
+    _ws: Optional[Union[str, bytes]] = field(default=None, repr=False)
+
+    def to_sse(self) -> str:
+        """序列化为SSE文本（只序列化一次，所有订阅者共享）"""
+        if self._sse is None:
+            payload = self.payload
+            if self.audio is not None:
+                payload = {**payload, 'audio_data': base64.b64encode(self.audio).decode('ascii')}
+
+            lines = [f"id: {self.id}"]
+            if self.event:
+                lines.append(f"event: {self.event}")
+            lines.append(f"data: {json.dumps(payload)}")
+            self._sse = "\n".join(lines) + "\n\n"
+        return self._sse
+
+    def to_ws(self) -> Union[str, bytes]:
+        """
+        序列化为WebSocket消息（只序列化一次，所有订阅者共享）
+
+        Returns:
+            音频帧为二进制（帧头 + 原始音频），其他帧为JSON文本
+        """
+        if self._ws is None:
+            if self.audio is not None:
+                header = AUDIO_FRAME_HEADER.pack(
+                    self.id, self.payload.get('player_id', 0), self.payload.get('seq', 0)
+                )
+                self._ws = header + self.audio
+            else:
+                self._ws = json.dumps({'id': self.id, **self.payload})
+        return self._ws
+
+
+class RoundLog:
+    """单个回合的事件日志（只追加）"""
+
+    def __init__(self, first_id: int = 1):
+        self.first_id = first_id
+        self.closed = False
+        self._frames: List[StreamFrame] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def next_id(self) -> int:
+        """下一帧的编号"""
+        return self.first_id + len(self._frames)
+
+    @property
+    def last_id(self) -> int:
+        """最后一帧的编号（日志为空时为 first_id - 1）"""
+        return self.next_id - 1
+
+    def contains(self, event_id: int) -> bool:
+        """事件编号是否属于本回合（含回合开始前的位置）"""
+        return self.first_id - 1 <= event_id <= self.last_id
+
+    def append(self, payload: Dict[str, Any], event: Optional[str] = None) -> StreamFrame:
+        """追加一帧并唤醒订阅者（payload 中的 audio 字段作为原始音频单独保存）"""
+        audio = None
+        if 'audio' in payload:
+            payload = dict(payload)
+            audio = payload.pop('audio')
+        frame = StreamFrame(id=self.next_id, payload=payload, event=event, audio=audio)
+        self._frames.append(frame)
+        self._notify()
+        return frame
+
+    def close(self):
+        """标记回合结束"""
+        self.closed = True
+        self._notify()
+
+    def _notify(self):
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def _start_index(self, after_id: Optional[int]) -> int:
+        return 0 if after_id is None else max(0, after_id - self.first_id + 1)
+
+    def frames_after(self, after_id: Optional[int] = None) -> List[StreamFrame]:
+        """
+        已产生的事件帧
+
+        Args:
+            after_id: 从该编号之后开始（None 表示从回合开头开始）
+        """
+        return self._frames[self._start_index(after_id):]
+
+    async def subscribe(self, after_id: Optional[int] = None) -> AsyncGenerator[StreamFrame, None]:
+        """
+        订阅事件帧
+
+        Args:
+            after_id: 从该编号之后开始（None 表示从回合开头开始）
+
+        Yields:
+            事件帧，回合结束后停止
+        """
+        index = self._start_index(after_id)
+
+        while True:
+            waiter = self._wakeup
+
+            while index < len(self._frames):
+                yield self._frames[index]
+                index += 1
+
+            if self.closed:
+                return
+
+            await waiter.wait()
+
+
+class GameRunner:
+    """单局游戏的回合执行器"""
+
+    def __init__(
+        self,
+        game_id: str,
+        round_factory: Callable[[], AsyncIterator[Dict[str, Any]]],
+        on_frame: Optional[Callable[[StreamFrame], None]] = None
+    ):
+        """
+        初始化执行器
+
+        Args:
+            game_id: 游戏ID
+            round_factory: 创建回合事件流的函数（每次调用运行一个回合）
+            on_frame: 每写入一帧后的回调（用于推送给 WebSocket 观众）
+        """
+        self.game_id = game_id
+        self._round_factory = round_factory
+        self._on_frame = on_frame
+        self._next_id = 1
+        self._task: Optional[asyncio.Task] = None
+        self.log: Optional[RoundLog] = None
+
+    @property
+    def is_running(self) -> bool:
+        """是否有回合正在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start_round(self) -> RoundLog:
+        """
+        在后台启动下一回合（已有回合在运行时直接返回其日志）
+
+        Returns:
+            当前回合的事件日志
+        """
+        if self.is_running:
+            return self.log
+
+        self.log = RoundLog(first_id=self._next_id)
+        # 回合内的LLM调用（含子任务）都归属本局游戏，调度器据此在各局之间轮转
+        with game_context(self.game_id):
+            self._task = asyncio.create_task(self._run_round(self.log))
+        return self.log
+
+    async def _run_round(self, log: RoundLog):
+        """运行回合并把事件写入日志"""
+        try:
+            async for payload in self._round_factory():
+                event = "complete" if payload.get("type") == "complete" else None
+                self._publish(log.append(payload, event=event))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Game round error: {e}")
+            traceback.print_exc()
+            self._publish(log.append({"type": "error", "message": str(e)}))
+        finally:
+            self._next_id = log.next_id
+            log.close()
+
+    def _publish(self, frame: StreamFrame):
+        """把新帧交给推送回调（回调不阻塞，回调出错不影响回合）"""
+        if self._on_frame is None:
+            return
+        try:
+            self._on_frame(frame)
+        except Exception as e:
+            print(f"Frame publish error: {e}")
+
+    def can_resume(self, last_event_id: Optional[int]) -> bool:
+        """Last-Event-ID 是否指向当前（或刚结束但尚未读完的）回合"""
+        if last_event_id is None or self.log is None:
+            return False
+        if not self.log.contains(last_event_id):
+            return False
+        return not self.log.closed or last_event_id < self.log.last_id
+
+    async def cancel(self):
+        """取消正在运行的回合"""
+        if self.is_running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,131 @@
+"""
+展示节奏策略
+回合事件之间的停顿只是为了观看体验，不同的使用场景需要不同的节奏：
+
+- live：保持现有的观看节奏
+- accelerated：所有停顿按比例缩短
+- turbo：不停顿，按 LLM 的速度运行（批量任务、回放、机器人对战）
+
+被缩短或跳过的停顿会推进游戏的虚拟时钟，事件时间戳仍然按正常节奏计算。
+"""
+
+import asyncio
+from typing import Dict, Optional, Type
+
+from src.core.clock import VirtualClock
+
+
+class PacingPolicy:
+    """节奏策略基类"""
+
+    name = "live"
+
+    def __init__(self, clock: Optional[VirtualClock] = None):
+        """
+        初始化节奏策略
+
+        Args:
+            clock: 游戏的虚拟时钟（被跳过的停顿会计入时钟）
+        """
+        self.clock = clock
+
+    @property
+    def scale(self) -> float:
+        """实际停顿时间与正常节奏的比例"""
+        return 1.0
+
+    async def pause(self, seconds: float):
+        """
+        事件之间的停顿
+
+        Args:
+            seconds: 正常节奏下的停顿时间（秒）
+        """
+        if seconds <= 0:
+            return
+
+        actual = seconds * self.scale
+        if self.clock is not None:
+            self.clock.advance(seconds - actual)
+        if actual > 0:
+            await asyncio.sleep(actual)
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {"mode": self.name, "scale": self.scale}
+
+
+class LivePacing(PacingPolicy):
+    """正常节奏"""
+
+    name = "live"
+
+
+class AcceleratedPacing(PacingPolicy):
+    """加速节奏：所有停顿按比例缩短"""
+
+    name = "accelerated"
+
+    def __init__(self, scale: float = 0.25, clock: Optional[VirtualClock] = None):
+        """
+        初始化加速节奏
+
+        Args:
+            scale: 停顿缩放比例（0-1，例如 0.25 表示四倍速）
+            clock: 游戏的虚拟时钟
+        """
+        super().__init__(clock)
+        if not 0 <= scale <= 1:
+            raise ValueError(f"加速比例必须在 0 到 1 之间: {scale}")
+        self._scale = scale
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+
+class TurboPacing(PacingPolicy):
+    """无停顿：按 LLM 的速度运行"""
+
+    name = "turbo"
+
+    @property
+    def scale(self) -> float:
+        return 0.0
+
+
+PACING_POLICIES: Dict[str, Type[PacingPolicy]] = {
+    LivePacing.name: LivePacing,
+    AcceleratedPacing.name: AcceleratedPacing,
+    TurboPacing.name: TurboPacing,
+}
+
+
+def create_pacing_policy(
+    mode: str = "live",
+    scale: Optional[float] = None,
+    clock: Optional[VirtualClock] = None
+) -> PacingPolicy:
+    """
+    创建节奏策略
+
+    Args:
+        mode: 节奏模式（live, accelerated, turbo）
+        scale: 加速模式的停顿缩放比例
+        clock: 游戏的虚拟时钟
+
+    Returns:
+        节奏策略实例
+
+    Raises:
+        ValueError: 如果模式不支持
+    """
+    if mode not in PACING_POLICIES:
+        raise ValueError(f"不支持的节奏模式: {mode}（可选: {', '.join(PACING_POLICIES)}）")
+
+    if mode == AcceleratedPacing.name:
+        if scale is None:
+            return AcceleratedPacing(clock=clock)
+        return AcceleratedPacing(scale=scale, clock=clock)
+
+    return PACING_POLICIES[mode](clock=clock)
@@ -0,0 +1,194 @@
+"""
+发言流水线
+讨论阶段按座位顺序发言：下一位玩家只依赖上一位的发言文本，不依赖音频。
+
+因此第N位玩家的TTS在后台进行，同时第N+1位玩家立即开始LLM流式生成；
+每位玩家的事件帧写入各自的分段队列，输出端按座位顺序依次排空，
+保证客户端看到的事件顺序与串行执行完全一致。
+
+TTS按句增量进行：LLM仍在输出时，每识别出一个完整句子就提交合成，
+首段音频的等待时间从"LLM全部完成 + TTS首块"降到"首句完成 + TTS首块"。
+"""
+
+import asyncio
+import traceback
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+
+from src.agents.base_agent import BaseAgent
+from src.core.models import GameState
+from src.utils.rate_limiter import PRIORITY_LIVE, current_priority
+from src.utils.sentence_splitter import SentenceSplitter
+
+# 分段结束标记
+_END = object()
+
+# 合成函数：(文本, 玩家ID) -> 原始音频块异步迭代器
+SynthesizeFn = Callable[[str, int], AsyncIterator[bytes]]
+
+
+async def run_speech_pipeline(
+    agents: List[BaseAgent],
+    game_state: GameState,
+    record_speech: Callable[[BaseAgent, str], None],
+    synthesize: Optional[SynthesizeFn] = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    运行讨论阶段的发言流水线
+
+    Args:
+        agents: Agent列表（按座位顺序）
+        game_state: 游戏状态
+        record_speech: 发言文本生成完毕后的回调（写入游戏状态，供下一位玩家使用）
+        synthesize: 语音合成函数（None 表示不生成音频）
+
+    Yields:
+        事件帧：speech_start / speech_chunk / audio_chunk / audio_end / speech_end
+        （audio_chunk 的 audio 字段是原始音频数据，由传输层决定编码方式）
+    """
+    segments: asyncio.Queue = asyncio.Queue()
+    producer = asyncio.create_task(
+        _produce_segments(agents, game_state, record_speech, synthesize, segments)
+    )
+
+    try:
+        while True:
+            segment = await segments.get()
+            if segment is _END:
+                break
+
+            while True:
+                frame = await segment.get()
+                if frame is _END:
+                    break
+                yield frame
+
+        # 传播生产端的异常
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+
+
+async def _produce_segments(
+    agents: List[BaseAgent],
+    game_state: GameState,
+    record_speech: Callable[[BaseAgent, str], None],
+    synthesize: Optional[SynthesizeFn],
+    segments: asyncio.Queue
+):
+    """依次生成每位玩家的发言文本，逐句交给后台TTS任务"""
+    # 本任务（及其创建的TTS任务）的LLM/TTS调用使用实时优先级
+    current_priority.set(PRIORITY_LIVE)
+    
+    tts_tasks: List[asyncio.Task] = []
+    segment: Optional[asyncio.Queue] = None
+
+    try:
+        for agent in agents:
+            if not agent.player.is_alive:
+                continue
+
+            segment = asyncio.Queue()
+            segments.put_nowait(segment)
+
+            player = agent.player
+            segment.put_nowait({'type': 'speech_start', 'player_id': player.id, 'player_name': player.name, 'role': player.role_name_cn})
+
+            # 句子队列：文本流中每出现一个完整句子就交给TTS任务
+            sentences: Optional[asyncio.Queue] = None
+            splitter = SentenceSplitter()
+            tts_task = None
+            if synthesize:
+                sentences = asyncio.Queue()
+                tts_task = asyncio.create_task(
+                    _synthesize_sentences(segment, player.id, sentences, synthesize)
+                )
+                tts_tasks.append(tts_task)
+
+            full_speech = ""
+            async for chunk in agent.speak_stream(game_state):
+                full_speech += chunk
+                segment.put_nowait({'type': 'speech_chunk', 'player_id': player.id, 'chunk': chunk})
+                if sentences is not None:
+                    for sentence in splitter.feed(chunk):
+                        sentences.put_nowait(sentence)
+
+            if sentences is not None:
+                rest = splitter.flush()
+                if rest:
+                    sentences.put_nowait(rest)
+                sentences.put_nowait(_END)
+
+            # 文本完成即记录，下一位玩家可以立即开始
+            record_speech(agent, full_speech)
+
+            tts_tasks.append(asyncio.create_task(
+                _finish_segment(segment, player.id, full_speech, tts_task)
+            ))
+            segment = None
+
+        segments.put_nowait(_END)
+        await asyncio.gather(*tts_tasks)
+
+    except BaseException:
+        # 让输出端退出等待，异常由输出端重新抛出
+        if segment is not None:
+            segment.put_nowait(_END)
+        segments.put_nowait(_END)
+        raise
+
+    finally:
+        for task in tts_tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _synthesize_sentences(
+    segment: asyncio.Queue,
+    player_id: int,
+    sentences: asyncio.Queue,
+    synthesize: SynthesizeFn
+):
+    """逐句合成语音，音频块按句子顺序写入分段"""
+    audio_chunks_sent = 0
+    started = False
+
+    try:
+        while True:
+            sentence = await sentences.get()
+            if sentence is _END:
+                break
+
+            if not started:
+                print(f"[TTS] Starting incremental audio generation for player {player_id}")
+                started = True
+
+            async for audio_chunk in synthesize(sentence, player_id):
+                if audio_chunk:
+                    segment.put_nowait({'type': 'audio_chunk', 'player_id': player_id, 'seq': audio_chunks_sent, 'audio': audio_chunk})
+                    audio_chunks_sent += 1
+                else:
+                    print(f"[TTS] Warning: Empty audio chunk for player {player_id}")
+
+        if started:
+            segment.put_nowait({'type': 'audio_end', 'player_id': player_id})
+            print(f"[TTS] Audio generation completed for player {player_id}, total chunks: {audio_chunks_sent}")
+    except Exception as e:
+        print(f"[TTS] Failed to generate audio for player {player_id}: {e}")
+        traceback.print_exc()
+        segment.put_nowait({'type': 'error', 'message': f'TTS generation failed: {str(e)}'})
+
+
+async def _finish_segment(
+    segment: asyncio.Queue,
+    player_id: int,
+    full_speech: str,
+    tts_task: Optional[asyncio.Task]
+):
+    """等待该玩家的音频合成完成，然后结束分段"""
+    try:
+        if tts_task is not None:
+            await tts_task
+        segment.put_nowait({'type': 'speech_end', 'player_id': player_id, 'speech': full_speech})
+    finally:
+        segment.put_nowait(_END)
@@ -1,43 +1,258 @@
 """
 WebSocket管理
 实时推送游戏状态更新
+
+/ws/games/{game_id} 在一条连接上复用两种消息：
+- 文本消息：JSON 控制帧（与 SSE 的事件帧相同，额外带 id 字段）
+- 二进制消息：音频帧，10 字节帧头 + 原始音频（TTS 输出的 WAV/PCM/MP3 字节，不做再编码）
+  帧头为网络字节序的 事件编号 uint32、玩家ID uint16、音频块序号 uint32
+
+客户端发送 {"type": "start_round"} 开始下一回合；同一局的所有连接都会收到该回合的事件。
+
+广播不等待任何连接：每帧只序列化一次，放入每个连接自己的有界队列，
+由该连接的写任务发送。队列满时按慢消费者策略处理：
+- drop_oldest：丢弃最早的非关键帧（发言文本块）；没有可丢弃的帧时断开。
+  音频块不丢弃：丢掉单个块会破坏整段音频的播放
+- disconnect：直接断开，客户端可携带 last_event_id 重连续传
+
+新连接补发的回合帧不受队列上限限制（上限只作用于补发之后的实时帧），
+中途加入的观众不会因为补发而被当作慢消费者断开。
 """
 
-from typing import Dict, List
+import asyncio
+import json
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
 from fastapi import WebSocket
 
+from src.web.game_runner import StreamFrame
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+
+# 可以丢弃的帧类型（丢失后客户端仍能从 speech_end 等关键帧恢复完整文本）
+NON_CRITICAL_FRAME_TYPES = {"speech_chunk"}
+
+# 慢消费者被断开时的关闭码（1013: Try Again Later）
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+Message = Union[str, bytes]
+
+
+class _Connection:
+    """单个连接的发送队列"""
+
+    def __init__(self, websocket: WebSocket, game_id: str):
+        self.websocket = websocket
+        self.game_id = game_id
+        self.queue: Deque[Tuple[Message, bool]] = deque()  # (消息, 是否关键帧)
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.backlog = 0  # 队列头部尚未发送的补发帧数（不计入队列上限）
+        self.writer: Optional[asyncio.Task] = None
+
 
 class WebSocketManager:
     """WebSocket连接管理器"""
-    
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, game_id: str):
-        """接受新连接"""
+
+    def __init__(self, max_queue: Optional[int] = None, slow_consumer_policy: Optional[str] = None):
+        """
+        初始化管理器
+
+        Args:
+            max_queue: 每个连接的发送队列上限（帧数）
+            slow_consumer_policy: 慢消费者策略（drop_oldest, disconnect）
+        """
+        if max_queue is None or slow_consumer_policy is None:
+            from src.utils.config import get_config
+            config = get_config()
+            max_queue = max_queue or config.web_ws_queue_size
+            slow_consumer_policy = slow_consumer_policy or config.web_ws_slow_consumer_policy
+
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"不支持的慢消费者策略: {slow_consumer_policy}（可选: {', '.join(SLOW_CONSUMER_POLICIES)}）")
+
+        self.max_queue = max(1, max_queue)
+        self.slow_consumer_policy = slow_consumer_policy
+        self._connections: Dict[str, Dict[WebSocket, _Connection]] = {}
+
+        # 统计
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.slow_consumer_disconnects = 0
+        self.peak_queue_depth = 0
+
+    @property
+    def active_connections(self) -> Dict[str, List[WebSocket]]:
+        """每局游戏的连接列表"""
+        return {game_id: list(connections) for game_id, connections in self._connections.items()}
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        game_id: str,
+        backlog: Optional[Callable[[], Iterable[StreamFrame]]] = None
+    ):
+        """
+        接受新连接
+
+        Args:
+            websocket: 连接
+            game_id: 游戏ID
+            backlog: 返回需要补发的事件帧（例如当前回合已产生的帧）；
+                     补发和加入广播之间没有等待，不会漏帧或重复
+        """
         await websocket.accept()
-        if game_id not in self.active_connections:
-            self.active_connections[game_id] = []
-        self.active_connections[game_id].append(websocket)
-    
+
+        # 先注册再补发：补发帧直接放入队列，不受队列上限限制
+        connection = _Connection(websocket, game_id)
+        connections = self._connections.setdefault(game_id, {})
+        connections[websocket] = connection
+        for frame in backlog() if backlog else ():
+            connection.queue.append((frame.to_ws(), _is_critical(frame)))
+        connection.backlog = len(connection.queue)
+        self.peak_queue_depth = max(self.peak_queue_depth, connection.backlog)
+
+        # 补发期间连接已被断开时不再启动写任务
+        if self._connections.get(game_id, {}).get(websocket) is not connection:
+            return
+        connection.writer = asyncio.create_task(self._write(connection))
+
     def disconnect(self, websocket: WebSocket, game_id: str):
         """断开连接"""
-        if game_id in self.active_connections:
-            self.active_connections[game_id].remove(websocket)
-    
+        connections = self._connections.get(game_id)
+        if not connections:
+            return
+
+        connection = connections.pop(websocket, None)
+        if not connections:
+            del self._connections[game_id]
+
+        if connection is not None and connection.writer is not None:
+            connection.writer.cancel()
+
+    def connection_count(self, game_id: Optional[str] = None) -> int:
+        """连接数（不指定游戏时为全部连接数）"""
+        if game_id is not None:
+            return len(self._connections.get(game_id, {}))
+        return sum(len(connections) for connections in self._connections.values())
+
+    # ==================== 发送 ====================
+
+    def broadcast_frame(self, game_id: str, frame: StreamFrame):
+        """
+        广播事件帧（不等待发送完成）
+
+        音频帧为二进制（帧头 + 原始音频），其他为JSON文本；所有连接共享同一份序列化结果
+        """
+        connections = self._connections.get(game_id)
+        if not connections:
+            return
+
+        message = frame.to_ws()
+        critical = _is_critical(frame)
+        for connection in list(connections.values()):
+            self._enqueue(connection, message, critical)
+
     async def broadcast(self, game_id: str, message: dict):
         """广播消息到所有连接"""
-        if game_id in self.active_connections:
-            for connection in self.active_connections[game_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"WebSocket send error: {e}")
-    
+        text = json.dumps(message)
+        for connection in list(self._connections.get(game_id, {}).values()):
+            self._enqueue(connection, text, True)
+
     async def send_to_player(self, websocket: WebSocket, message: dict):
         """发送消息给特定玩家"""
+        for connections in self._connections.values():
+            connection = connections.get(websocket)
+            if connection is not None:
+                self._enqueue(connection, json.dumps(message), True)
+                return
+
+    def _enqueue(self, connection: _Connection, message: Message, critical: bool):
+        """放入连接的发送队列（队列满时按慢消费者策略处理）"""
+        if len(connection.queue) >= self.max_queue + connection.backlog and not self._make_room(connection):
+            return
+
+        connection.queue.append((message, critical))
+        connection.wakeup.set()
+        self.peak_queue_depth = max(self.peak_queue_depth, len(connection.queue))
+
+    def _make_room(self, connection: _Connection) -> bool:
+        """队列已满：丢弃最早的非关键帧，无法丢弃时断开连接"""
+        if self.slow_consumer_policy == "drop_oldest":
+            for index, (_, critical) in enumerate(connection.queue):
+                if not critical:
+                    del connection.queue[index]
+                    if index < connection.backlog:
+                        connection.backlog -= 1
+                    connection.dropped += 1
+                    self.frames_dropped += 1
+                    return True
+
+        self._close_slow_consumer(connection)
+        return False
+
+    def _close_slow_consumer(self, connection: _Connection):
+        """断开慢消费者"""
+        print(f"⚠️ WebSocket 客户端消费过慢，断开连接: 游戏{connection.game_id}")
+        self.slow_consumer_disconnects += 1
+        self.disconnect(connection.websocket, connection.game_id)
+        connection.queue.clear()
+        asyncio.create_task(_close_quietly(connection.websocket, SLOW_CONSUMER_CLOSE_CODE))
+
+    async def _write(self, connection: _Connection):
+        """连接的写任务：依次发送队列中的消息"""
+        websocket = connection.websocket
         try:
-            await websocket.send_json(message)
+            while True:
+                while not connection.queue:
+                    connection.wakeup.clear()
+                    await connection.wakeup.wait()
+
+                message, _ = connection.queue.popleft()
+                if connection.backlog:
+                    connection.backlog -= 1
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"WebSocket send error: {e}")
+            self.disconnect(websocket, connection.game_id)
+
+    async def close_game(self, game_id: str):
+        """关闭一局游戏的所有连接"""
+        for websocket in list(self._connections.get(game_id, {})):
+            self.disconnect(websocket, game_id)
+            await _close_quietly(websocket)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        depths = [len(c.queue) for connections in self._connections.values() for c in connections.values()]
+        return {
+            "connections": len(depths),
+            "queued_frames": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "peak_queue_depth": self.peak_queue_depth,
+            "max_queue": self.max_queue,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+        }
+
+
+def _is_critical(frame: StreamFrame) -> bool:
+    """是否为关键帧（不可丢弃）"""
+    return frame.payload.get("type") not in NON_CRITICAL_FRAME_TYPES
+
 
+async def _close_quietly(websocket: WebSocket, code: int = 1000):
+    """关闭连接（忽略已断开等错误）"""
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass